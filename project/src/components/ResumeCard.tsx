@@ -1,5 +1,5 @@
 import { useState } from 'react';
-import { Resume, deleteResume, downloadResume } from '../services/api';
+import { Resume, deleteResume, downloadResume, getResumeAnalysis } from '../services/api';
 import AnalysisModal from './AnalysisModal';
 import ConfirmModal from './ConfirmModal';
 import { Download, FileText, Trash2 } from 'lucide-react';
@@ -16,6 +16,8 @@ export default function ResumeCard({ resume, onUpdate }: ResumeCardProps) {
   const [isDeleting, setIsDeleting] = useState(false);
   const [showDeleteConfirm, setShowDeleteConfirm] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  const [analysis, setAnalysis] = useState<string | null>(resume.analysis ?? null);
+  const [isLoadingAnalysis, setIsLoadingAnalysis] = useState(false);
 
   const handleDownload = async (resumeId: string, jobTitle: string) => {
     try {
@@ -44,16 +46,29 @@ export default function ResumeCard({ resume, onUpdate }: ResumeCardProps) {
     }
   };
 
-  const handleViewAnalysis = () => {
-    if (!resume.analysis) return;
-    
-    // Clean up the analysis text before opening modal
-    const cleanedAnalysis = resume.analysis
-      .split('FINAL CHECK - VERIFY:')[0] // Remove the final check section
-      .replace(/\*\*/g, '')  // Remove ** markers
-      .trim();
-      
-    setIsAnalysisOpen(true);
+  const handleViewAnalysis = async () => {
+    if (analysis) {
+      setIsAnalysisOpen(true);
+      return;
+    }
+
+    // The resume list leaves the analysis out; fetch it the first time it is opened
+    try {
+      setIsLoadingAnalysis(true);
+      setError(null);
+      const fetched = await getResumeAnalysis(resume.id);
+      if (!fetched) {
+        setError('No analysis available for this resume');
+        return;
+      }
+      setAnalysis(fetched);
+      setIsAnalysisOpen(true);
+    } catch (error) {
+      console.error('Error loading analysis:', error);
+      setError(error instanceof Error ? error.message : 'Failed to load analysis');
+    } finally {
+      setIsLoadingAnalysis(false);
+    }
   };
 
   const handleDelete = async () => {
@@ -77,7 +92,7 @@ export default function ResumeCard({ resume, onUpdate }: ResumeCardProps) {
   return (
     <div className="bg-white rounded-lg shadow-md p-6 mb-4 relative">
       {/* Loading overlay */}
-      {(isDeleting || isDownloading) && (
+      {(isDeleting || isDownloading || isLoadingAnalysis) && (
         <div className="absolute inset-0 bg-white/50 flex items-center justify-center rounded-lg">
           <div className="animate-spin rounded-full h-8 w-8 border-b-2 border-indigo-600"></div>
         </div>
@@ -114,10 +129,10 @@ export default function ResumeCard({ resume, onUpdate }: ResumeCardProps) {
               <Download className="w-5 h-5" />
             </button>
           )}
-          {resume.analysis && (
+          {resume.status !== 'processing' && resume.status !== 'failed' && (
             <button
               onClick={handleViewAnalysis}
-              disabled={isDeleting}
+              disabled={isDeleting || isLoadingAnalysis}
               className="p-2 text-gray-600 hover:text-indigo-600 transition-colors disabled:opacity-50"
               title="View Analysis"
             >
@@ -160,7 +175,7 @@ export default function ResumeCard({ resume, onUpdate }: ResumeCardProps) {
       <AnalysisModal
         isOpen={isAnalysisOpen}
         onClose={() => setIsAnalysisOpen(false)}
-        analysis={resume.analysis ? resume.analysis.split('FINAL CHECK - VERIFY:')[0].replace(/\*\*/g, '').trim() : ''}
+        analysis={analysis ? analysis.split('FINAL CHECK - VERIFY:')[0].replace(/\*\*/g, '').trim() : ''}
       />
 
       <ConfirmModal
@@ -52,8 +52,8 @@ function Dashboard() {
   const loadRecentResumes = async () => {
     try {
       setLoading(true);
-      const resumes = await getRecentResumes(3); // Only fetch 3 most recent resumes
-      setRecentResumes(resumes);
+      const { items } = await getRecentResumes(3); // Only fetch 3 most recent resumes
+      setRecentResumes(items);
     } catch (error) {
       console.error('Error loading resumes:', error);
       setUploadStatus('Failed to load recent resumes');
@@ -127,7 +127,7 @@ function Dashboard() {
         <form onSubmit={handleSubmit} className="space-y-6">
           <div>
             <label className="block text-sm font-medium text-gray-700 mb-2">
-              Upload Resume (PDF)
+              Upload Resume (PDF, DOCX or TXT)
             </label>
             <label
               htmlFor="resume-upload"
@@ -160,14 +160,14 @@ function Dashboard() {
                         id="resume-upload"
                         name="resume-upload"
                         type="file"
-                        accept=".pdf"
+                        accept=".pdf,.docx,.txt"
                         ref={fileInputRef}
                         onChange={(e) => setFile(e.target.files?.[0] || null)}
                         className="sr-only"
                       />
                       <p className="pl-1">or drag and drop</p>
                     </div>
-                    <p className="text-xs text-gray-500">PDF up to 10MB</p>
+                    <p className="text-xs text-gray-500">PDF, DOCX or TXT up to 10MB</p>
                   </>
                 ) : (
                   <div className="space-y-2">
@@ -6,12 +6,15 @@ export default function MyResumes() {
   const [resumes, setResumes] = useState<Resume[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const fetchResumes = async () => {
     try {
       setLoading(true);
-      const data = await getRecentResumes();
-      setResumes(data);
+      const page = await getRecentResumes();
+      setResumes(page.items);
+      setNextCursor(page.nextCursor);
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to fetch resumes');
     } finally {
@@ -19,6 +22,20 @@ export default function MyResumes() {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const page = await getRecentResumes(undefined, nextCursor);
+      setResumes((current) => [...current, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      setError(err instanceof Error ? err.message : 'Failed to fetch resumes');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchResumes();
   }, []);
@@ -56,6 +73,18 @@ export default function MyResumes() {
           ))}
         </div>
       )}
+
+      {nextCursor && !error && (
+        <div className="flex justify-center mt-6">
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="px-4 py-2 border border-gray-300 shadow-sm text-sm font-medium rounded-md text-gray-700 bg-white hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed"
+          >
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </button>
+        </div>
+      )}
     </div>
   );
 };
\ No newline at end of file
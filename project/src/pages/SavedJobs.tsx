@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { useAuth } from '../context/AuthContext';
-import { getJobApplications, updateJobApplicationStatus, deleteJobApplication, JobApplication, downloadCoverLetter, downloadResume } from '../services/api';
+import { getJobApplications, getJobApplication, updateJobApplicationStatus, deleteJobApplication, JobApplication, downloadCoverLetter, downloadResume } from '../services/api';
 import { format } from 'date-fns';
 import { Building2, Calendar, ExternalLink, Search, BookOpen, Download, FileText, Trash2 } from 'lucide-react';
 import AnalysisModal from '../components/AnalysisModal';
@@ -18,6 +18,11 @@ function SavedJobs() {
   const [searchTerm, setSearchTerm] = useState('');
   const [showDeleteConfirm, setShowDeleteConfirm] = useState(false);
   const [selectedJobId, setSelectedJobId] = useState<string | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+  // Descriptions and analyses are not in the list; they are fetched per job when opened
+  const [details, setDetails] = useState<Record<string, JobApplication>>({});
+  const [loadingDetailsId, setLoadingDetailsId] = useState<string | null>(null);
   const { user } = useAuth();
   const { showToast } = useToast();
 
@@ -35,9 +40,10 @@ function SavedJobs() {
       try {
         setIsLoading(true);
         setError(null);
-        const jobsData = await getJobApplications(user.id);
+        const page = await getJobApplications(user.id);
         if (isMounted) {
-          setJobs(jobsData);
+          setJobs(page.items);
+          setNextCursor(page.nextCursor);
         }
       } catch (err) {
         if (isMounted) {
@@ -60,6 +66,49 @@ function SavedJobs() {
     };
   }, [user?.id]);
 
+  const loadMore = async () => {
+    if (!user?.id || !nextCursor) return;
+    try {
+      setIsLoadingMore(true);
+      const page = await getJobApplications(user.id, nextCursor);
+      setJobs((current) => [...current, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error('Error fetching jobs:', err);
+      setError(err instanceof Error ? err.message : 'Failed to fetch jobs');
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
+  const loadDetails = async (jobId: string): Promise<JobApplication | null> => {
+    if (details[jobId]) return details[jobId];
+    if (!user?.id) return null;
+    try {
+      setLoadingDetailsId(jobId);
+      const job = await getJobApplication(user.id, jobId);
+      setDetails((current) => ({ ...current, [jobId]: job }));
+      return job;
+    } catch (err) {
+      console.error('Error fetching job details:', err);
+      showToast(err instanceof Error ? err.message : 'Failed to load job details', 'error');
+      return null;
+    } finally {
+      setLoadingDetailsId(null);
+    }
+  };
+
+  const handleViewAnalysis = async (jobId: string) => {
+    const job = await loadDetails(jobId);
+    if (!job) return;
+    if (!job.analysis) {
+      showToast('No analysis available for this job', 'error');
+      return;
+    }
+    setSelectedAnalysis(job.analysis);
+    setIsAnalysisOpen(true);
+  };
+
   const handleDownload = async (resumeId: string, jobTitle: string) => {
     try {
       setIsDownloading(true);
@@ -121,11 +170,7 @@ function SavedJobs() {
       await deleteJobApplication(selectedJobId);
       showToast('Job application deleted successfully', 'success');
       
-      // Refresh the jobs list
-      if (user?.id) {
-        const updatedJobs = await getJobApplications(user.id);
-        setJobs(updatedJobs);
-      }
+      setJobs((current) => current.filter((job) => job.id !== selectedJobId));
     } catch (error) {
       console.error('Error deleting job:', error);
       showToast(error instanceof Error ? error.message : 'Failed to delete job application', 'error');
@@ -139,7 +184,7 @@ function SavedJobs() {
     if (!searchTerm) return true;
     return job.job_title?.toLowerCase().includes(searchTerm.toLowerCase()) ||
       job.company?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      job.job_description?.toLowerCase().includes(searchTerm.toLowerCase());
+      details[job.id]?.job_description?.toLowerCase().includes(searchTerm.toLowerCase());
   });
 
   return (
@@ -199,10 +244,20 @@ function SavedJobs() {
                     </div>
 
                     {/* Description */}
-                    {job.job_description && (
-                      <div className="text-sm text-gray-600 line-clamp-3">
-                        {job.job_description}
-                      </div>
+                    {details[job.id] ? (
+                      details[job.id].job_description && (
+                        <div className="text-sm text-gray-600 line-clamp-3">
+                          {details[job.id].job_description}
+                        </div>
+                      )
+                    ) : (
+                      <button
+                        onClick={() => loadDetails(job.id)}
+                        disabled={loadingDetailsId === job.id}
+                        className="text-sm text-indigo-600 hover:text-indigo-800 disabled:opacity-50"
+                      >
+                        {loadingDetailsId === job.id ? 'Loading description...' : 'Show description'}
+                      </button>
                     )}
 
                     {/* Links and Actions */}
@@ -218,13 +273,11 @@ function SavedJobs() {
                         </a>
                       )}
 
-                      {job.resume?.analysis && (
+                      {job.resume_id && (
                         <button
-                          onClick={() => {
-                            setSelectedAnalysis(job.resume?.analysis || '');
-                            setIsAnalysisOpen(true);
-                          }}
-                          className="inline-flex items-center px-3 py-2 border border-gray-300 shadow-sm text-sm font-medium rounded-md text-gray-700 bg-white hover:bg-gray-50 focus:outline-none focus:ring-2 focus:ring-offset-2 focus:ring-indigo-500"
+                          onClick={() => handleViewAnalysis(job.id)}
+                          disabled={loadingDetailsId === job.id}
+                          className="inline-flex items-center px-3 py-2 border border-gray-300 shadow-sm text-sm font-medium rounded-md text-gray-700 bg-white hover:bg-gray-50 focus:outline-none focus:ring-2 focus:ring-offset-2 focus:ring-indigo-500 disabled:opacity-50"
                         >
                           <BookOpen className="h-5 w-5 mr-2" />
                           View Analysis
@@ -240,9 +293,9 @@ function SavedJobs() {
                             }
                             const newStatus = e.target.value as JobApplication['status'];
                             await updateJobApplicationStatus(job.id, newStatus);
-                            // Refresh the jobs list
-                            const updatedJobs = await getJobApplications(user.id);
-                            setJobs(updatedJobs);
+                            setJobs((current) => current.map((item) =>
+                              item.id === job.id ? { ...item, status: newStatus } : item
+                            ));
                             showToast('Status updated successfully', 'success');
                           } catch (error) {
                             console.error('Error updating job status:', error);
@@ -310,6 +363,17 @@ function SavedJobs() {
             </p>
           </div>
         )}
+        {nextCursor && (
+          <div className="flex justify-center mt-6">
+            <button
+              onClick={loadMore}
+              disabled={isLoadingMore}
+              className="px-4 py-2 border border-gray-300 shadow-sm text-sm font-medium rounded-md text-gray-700 bg-white hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed"
+            >
+              {isLoadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          </div>
+        )}
         </>}
 
         <AnalysisModal
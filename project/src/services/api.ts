@@ -2,18 +2,46 @@ import { supabase } from '../lib/supabaseClient';
 
 const API_URL = import.meta.env.VITE_RESUME_API_URL;
 
+// One page of a keyset-paginated list; pass `nextCursor` back to get the next page
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
+// Fetch one page of a list endpoint. The list endpoints return summary columns
+// only; descriptions and analyses are fetched per item when they are opened.
+const fetchPage = async <T>(
+  url: URL,
+  headers: Record<string, string>,
+  errorMessage: string,
+  cursor?: string | null
+): Promise<Page<T>> => {
+  if (cursor) {
+    url.searchParams.set('cursor', cursor);
+  }
+  const response = await fetch(url.toString(), { method: 'GET', headers });
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.error || errorMessage);
+  }
+  return {
+    items: await response.json(),
+    nextCursor: response.headers.get('X-Next-Cursor')
+  };
+};
+
 export interface JobApplication {
   id: string;
   user_id: string;
   resume_id: string | null;
   job_title: string;
   company: string;
-  job_description: string | null;
+  job_description?: string | null;
   job_url: string | null;
   status: 'pending' | 'applied' | 'interviewing' | 'offered' | 'rejected';
   created_at: string;
   updated_at: string;
-  analysis: string | null;
+  analysis?: string | null;
   resume: Resume | null;
 }
 
@@ -23,7 +51,7 @@ export interface Resume {
   title: string;
   created_at: string;
   optimized_pdf_url: string | null;
-  analysis: string | null;
+  analysis?: string | null;
   job_url: string | null;
   status: 'processing' | 'completed' | 'failed';
 }
@@ -46,6 +74,9 @@ export const optimizeResume = async (formData: FormData, onCreditsUpdate?: () =>
       throw new Error('User not authenticated');
     }
 
+    // Ask for a download URL instead of the PDF base64-encoded inside the JSON
+    formData.set('response_format', 'url');
+
     // Call the optimization endpoint
     const response = await fetch(`${API_URL}/api/optimize`, {
       method: 'POST',
@@ -74,9 +105,16 @@ export const optimizeResume = async (formData: FormData, onCreditsUpdate?: () =>
       await onCreditsUpdate();
     }
 
-    // Create a blob from the base64 PDF data
-    const pdfBlob = base64ToBlob(responseData.pdf_data, 'application/pdf');
-    const blobUrl = URL.createObjectURL(pdfBlob);
+    // Fetch the rendered PDF as binary; the server already has it cached
+    const pdfResponse = await fetch(`${API_URL}${responseData.pdf_url}`, {
+      headers: {
+        'X-User-Id': session.user.id
+      }
+    });
+    if (!pdfResponse.ok) {
+      throw new Error('Failed to download optimized resume');
+    }
+    const blobUrl = URL.createObjectURL(await pdfResponse.blob());
 
     // Return the resume data from the backend response
     return {
@@ -94,8 +132,8 @@ export const optimizeResume = async (formData: FormData, onCreditsUpdate?: () =>
   }
 };
 
-// Get recent resumes
-export const getRecentResumes = async (limit?: number): Promise<Resume[]> => {
+// Get a page of the most recent resumes
+export const getRecentResumes = async (limit?: number, cursor?: string | null): Promise<Page<Resume>> => {
   const { data: { session } } = await supabase.auth.getSession();
   if (!session?.user) {
     throw new Error('Not authenticated');
@@ -106,20 +144,35 @@ export const getRecentResumes = async (limit?: number): Promise<Resume[]> => {
     url.searchParams.append('limit', limit.toString());
   }
 
+  return await fetchPage<Resume>(url, {
+    'Content-Type': 'application/json',
+    'X-User-Id': session.user.id
+  }, 'Failed to get resumes', cursor);
+};
+
+// Get a resume's analysis, which the list leaves out
+export const getResumeAnalysis = async (resumeId: string): Promise<string | null> => {
+  const { data: { session } } = await supabase.auth.getSession();
+  if (!session?.user) {
+    throw new Error('Not authenticated');
+  }
+
+  const url = new URL(`${API_URL}/api/resumes/${resumeId}`);
+  url.searchParams.append('fields', 'analysis');
+
   const response = await fetch(url.toString(), {
-    method: 'GET',
     headers: {
-      'Content-Type': 'application/json',
       'X-User-Id': session.user.id
     }
   });
 
   if (!response.ok) {
     const error = await response.json();
-    throw new Error(error.error || 'Failed to get resumes');
+    throw new Error(error.error || 'Failed to get resume analysis');
   }
 
-  return await response.json();
+  const resume: Resume = await response.json();
+  return resume.analysis ?? null;
 };
 
 // Delete resume
@@ -183,41 +236,31 @@ export const downloadCoverLetter = async (resumeId: string): Promise<Blob> => {
   return await response.blob();
 };
 
-// Helper function to convert base64 to Blob
-function base64ToBlob(base64: string, type: string): Blob {
-  const byteCharacters = atob(base64);
-  const byteArrays = [];
+// Get a page of the user's job applications
+export const getJobApplications = async (userId: string, cursor?: string | null): Promise<Page<JobApplication>> => {
+  const url = new URL(`${API_URL}/api/jobs`);
 
-  for (let offset = 0; offset < byteCharacters.length; offset += 512) {
-    const slice = byteCharacters.slice(offset, offset + 512);
-    const byteNumbers = new Array(slice.length);
-
-    for (let i = 0; i < slice.length; i++) {
-      byteNumbers[i] = slice.charCodeAt(i);
-    }
-
-    const byteArray = new Uint8Array(byteNumbers);
-    byteArrays.push(byteArray);
-  }
-
-  return new Blob(byteArrays, { type });
-}
+  return await fetchPage<JobApplication>(url, {
+    'Content-Type': 'application/json',
+    'X-User-Id': userId
+  }, 'Failed to get job applications', cursor);
+};
 
-export const getJobApplications = async (userId: string) => {
-  const response = await fetch(`${API_URL}/api/jobs`, {
-    method: 'GET',
+// Get one job application with its description and the linked resume's analysis
+export const getJobApplication = async (userId: string, jobId: string): Promise<JobApplication> => {
+  const response = await fetch(`${API_URL}/job/${jobId}`, {
     headers: {
-      'Content-Type': 'application/json',
       'X-User-Id': userId
     }
   });
 
   if (!response.ok) {
     const error = await response.json();
-    throw new Error(error.error || 'Failed to get job applications');
+    throw new Error(error.detail || 'Failed to get job application');
   }
 
-  return await response.json();
+  const { data } = await response.json();
+  return data;
 };
 
 export const saveJob = async (
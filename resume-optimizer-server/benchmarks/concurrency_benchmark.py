@@ -0,0 +1,81 @@
+"""
+Concurrency benchmark for the blocking I/O offload layer.
+
+Simulates an upstream call (Supabase, OpenAI, PayPal) that takes a fixed
+amount of time and drives two FastAPI endpoints with an increasing number of
+in-flight requests:
+
+  inline   - calls the blocking function directly inside `async def`, the way
+             the route handlers used to
+  offload  - hands the same call to services.blocking_io.run_blocking
+
+With the inline handler throughput stays flat at ~1/latency no matter how many
+requests are in flight; with the offload handler it scales with concurrency
+until the I/O pool is saturated.
+
+Run from the resume-optimizer-server directory:
+
+    python -m benchmarks.concurrency_benchmark --latency 0.05 --requests 64
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from services.blocking_io import io_pool, run_blocking
+
+
+def build_app(latency: float) -> FastAPI:
+    app = FastAPI()
+
+    def upstream_call():
+        time.sleep(latency)
+        return {"ok": True}
+
+    @app.get("/inline")
+    async def inline():
+        return upstream_call()
+
+    @app.get("/offload")
+    async def offload():
+        return await run_blocking(upstream_call)
+
+    return app
+
+
+async def measure(client: httpx.AsyncClient, path: str, concurrency: int, total: int) -> float:
+    """Return requests/second for `total` requests with `concurrency` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            response = await client.get(path)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return total / (time.perf_counter() - started)
+
+
+async def main(latency: float, total: int, levels):
+    app = build_app(latency)
+    async with httpx.AsyncClient(app=app, base_url="http://benchmark") as client:
+        print(f"Simulated upstream latency: {latency * 1000:.0f} ms, "
+              f"{total} requests per run, I/O pool size {io_pool.max_workers}")
+        print(f"{'in-flight':>10} {'inline req/s':>14} {'offload req/s':>15} {'speedup':>9}")
+        for concurrency in levels:
+            inline = await measure(client, "/inline", concurrency, total)
+            offload = await measure(client, "/offload", concurrency, total)
+            print(f"{concurrency:>10} {inline:>14.1f} {offload:>15.1f} {offload / inline:>8.1f}x")
+    io_pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per simulated upstream call")
+    parser.add_argument("--requests", type=int, default=64, help="requests per concurrency level")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.requests, args.levels))
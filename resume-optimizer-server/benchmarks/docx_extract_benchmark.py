@@ -0,0 +1,89 @@
+"""
+Correctness and speed check for DOCX uploads through services.upload_ingest
+and services.resume_text_extractor.
+
+Builds a DOCX of `--paragraphs` paragraphs with python-docx, then ingests and
+extracts it twice: once with the upload kept in memory and once after the
+spool has rolled over to disk (where parsers read from an mmap of the file).
+Both must give back exactly the paragraphs that went in; the exit status is
+non-zero otherwise. Timings are compared against python-docx reading the same
+document.
+
+Run from the resume-optimizer-server directory:
+
+    python -m benchmarks.docx_extract_benchmark --paragraphs 3000 --repeat 5
+"""
+import argparse
+import asyncio
+import io
+import statistics
+import sys
+import time
+
+import docx
+from starlette.datastructures import UploadFile
+
+from services.resume_text_extractor import extract_docx_text
+from services.upload_ingest import UploadIngestor
+
+
+def build_docx(paragraphs: int) -> tuple:
+    document = docx.Document()
+    lines = []
+    for index in range(paragraphs):
+        line = f"Paragraph {index}: shipped feature {index} with Python, FastAPI and Postgres for {index * 7} users"
+        document.add_paragraph(line)
+        lines.append(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue(), lines
+
+
+def median_ms(function, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def main(paragraphs: int, repeat: int) -> int:
+    data, lines = build_docx(paragraphs)
+    print(f"{paragraphs} paragraphs, {len(data) / 1024:.0f} KiB, {repeat} runs each")
+    print(f"{'reader':<18} {'ms/doc':>9}  result")
+
+    failures = 0
+    # A spool larger than the file keeps it in memory; a smaller one forces it to disk
+    for label, spool_bytes in (("in memory", len(data) * 2), ("rolled to disk", len(data) // 4)):
+        upload = await UploadIngestor(max_bytes=len(data) * 2, spool_bytes=spool_bytes).ingest(
+            UploadFile(io.BytesIO(data), filename="resume.docx")
+        )
+        with upload:
+            def extract():
+                with upload.open() as stream:
+                    return extract_docx_text(stream)
+
+            try:
+                # The document's own paragraphs come after any python-docx template ones
+                extracted = extract().split("\n")[-len(lines):]
+                result = "ok" if extracted == lines else "FAIL: text differs"
+                elapsed = median_ms(extract, repeat)
+            except Exception as e:
+                result, elapsed = f"FAIL: {type(e).__name__}: {e}", float("nan")
+            if label == "rolled to disk" and not upload.on_disk:
+                result = "FAIL: upload did not roll over to disk"
+        failures += result != "ok"
+        print(f"{label:<18} {elapsed:>9.1f}  {result}")
+
+    python_docx_ms = median_ms(lambda: [p.text for p in docx.Document(io.BytesIO(data)).paragraphs], repeat)
+    print(f"{'python-docx':<18} {python_docx_ms:>9.1f}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paragraphs", type=int, default=3000, help="paragraphs in the generated DOCX")
+    parser.add_argument("--repeat", type=int, default=5, help="timed extractions per reader")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.paragraphs, args.repeat)))
@@ -0,0 +1,98 @@
+"""
+Parse-time and memory benchmark for the job page HTML extractors.
+
+Runs every available backend in services.job_html_extractor over the saved
+LinkedIn pages in benchmarks/fixtures/linkedin and reports, per page:
+
+  ms/page   - median wall time of one extraction over --repeat runs
+  peak KiB  - peak Python heap allocated during one extraction (tracemalloc;
+              libxml2's own C allocations are not visible to it, so the lxml
+              figure is a lower bound)
+
+Each backend's output is checked against the BeautifulSoup baseline before
+it is timed, so a faster backend can't silently return different fields.
+
+The fixtures are synthetic pages that reproduce the structure and size of
+LinkedIn's guest jobPosting fragment and its public /jobs/view page (top card,
+rich description, criteria list, similar-jobs rail, inline config).
+
+Run from the resume-optimizer-server directory:
+
+    python -m benchmarks.html_parse_benchmark --repeat 50
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from services.job_html_extractor import (
+    GUEST_POSTING_FIELDS,
+    JOB_PAGE_FIELDS,
+    available_extractors,
+    get_extractor,
+)
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures" / "linkedin"
+
+
+def fields_for(fixture: Path):
+    return JOB_PAGE_FIELDS if fixture.name.startswith("job_view") else GUEST_POSTING_FIELDS
+
+
+def time_extraction(extractor, html: str, fields, repeat: int) -> float:
+    """Median milliseconds per extraction"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        extractor.extract(html, fields)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def peak_memory(extractor, html: str, fields) -> float:
+    """Peak KiB allocated on the Python heap during one extraction"""
+    tracemalloc.start()
+    try:
+        extractor.extract(html, fields)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def main(repeat: int, backends):
+    extractors = {name: get_extractor(name) for name in backends}
+    baseline = get_extractor("bs4")
+    fixtures = sorted(FIXTURES_DIR.glob("*.html"))
+
+    print(f"{len(fixtures)} fixtures, {repeat} runs each, backends: {', '.join(extractors)}")
+    print(f"{'fixture':<40} {'KiB':>6} {'backend':>10} {'ms/page':>9} {'peak KiB':>9} {'speedup':>8}")
+    for fixture in fixtures:
+        html = fixture.read_text(encoding="utf-8")
+        fields = fields_for(fixture)
+        expected = baseline.extract(html, fields)
+        baseline_ms = None
+
+        for name, extractor in extractors.items():
+            result = extractor.extract(html, fields)
+            if result != expected:
+                differing = [field for field in fields if result.get(field) != expected.get(field)]
+                print(f"{fixture.name:<40} {'':>6} {name:>10}  output differs from bs4 on {differing}")
+                continue
+
+            ms = time_extraction(extractor, html, fields, repeat)
+            peak = peak_memory(extractor, html, fields)
+            if name == "bs4":
+                baseline_ms = ms
+            speedup = f"{baseline_ms / ms:>7.1f}x" if baseline_ms else f"{'':>8}"
+            print(f"{fixture.name:<40} {len(html) / 1024:>6.0f} {name:>10} {ms:>9.2f} {peak:>9.0f} {speedup}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=30, help="timed runs per fixture and backend")
+    parser.add_argument("--backends", nargs="+", default=available_extractors(),
+                        help="extractors to compare (bs4 is always used as the correctness baseline)")
+    args = parser.parse_args()
+    main(args.repeat, args.backends)
@@ -0,0 +1,96 @@
+"""
+Micro-benchmark for services.resume_markup against the line-by-line
+formatting path that create_pdf_from_text used before the tokenizer.
+
+Both paths turn resume markup into a list of (text, paragraph style) pairs;
+the legacy path is reproduced here verbatim (startswith chain, per-line
+re.match for the age filter, re.sub for emphasis). Outputs are compared
+before timing. Only parsing is measured, not ReportLab layout.
+
+Run from the resume-optimizer-server directory:
+
+    python -m benchmarks.markup_parse_benchmark --lines 200 2000 20000
+"""
+import argparse
+import random
+import re
+import timeit
+
+from services.pdf_generator import PDFGenerator
+from services.resume_markup import parse_resume_markup
+
+
+def legacy_process_text_formatting(line: str):
+    line = line.strip()
+    if line.startswith('***') and line.endswith('***'):
+        return line[3:-3].strip(), 'SectionHeading'
+    if line.startswith('**') and line.endswith('**'):
+        return line[2:-2].strip(), 'SubHeading'
+    if '*' in line:
+        line = re.sub(r'\*(.*?)\*', r'\1', line)
+        return line, 'BoldText'
+    return line, 'NormalText'
+
+
+def legacy_parse(text: str):
+    result = []
+    is_first_content = True
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if (line.startswith('---') or
+                line.startswith('===') or
+                line == '---' or
+                re.match(r'^\d+\s*yo\s*$', line, re.IGNORECASE)):
+            continue
+        processed_text, style_name = legacy_process_text_formatting(line)
+        if is_first_content:
+            result.append((processed_text, 'Name'))
+            is_first_content = False
+            continue
+        result.append((processed_text, style_name))
+    return result
+
+
+def tokenizer_parse(text: str):
+    return [(block.text, PDFGenerator._block_style(block)) for block in parse_resume_markup(text).blocks]
+
+
+def build_resume(lines: int, seed: int = 42) -> str:
+    """A resume in the prompt's markup, repeated sections until `lines` long"""
+    rng = random.Random(seed)
+    words = "led built scaled designed reduced latency revenue platform team python kubernetes postgres api".split()
+    out = ["Jane Doe", "**Staff Software Engineer**", "jane@example.com | +1 555 0100", "34 yo", "---"]
+    section = 0
+    while len(out) < lines:
+        section += 1
+        out.append(f"***SECTION {section}***")
+        out.append(f"**Role {section} – Company {section} – 2019-2024**")
+        for _ in range(rng.randint(4, 10)):
+            sentence = " ".join(rng.choice(words) for _ in range(rng.randint(8, 16)))
+            if rng.random() < 0.4:
+                sentence = sentence.replace(" ", " *", 1).replace(" ", "* ", 2)
+            out.append(f"{rng.choice(['•', '-'])} {sentence.capitalize()}")
+        out.append("")
+    return "\n".join(out[:lines])
+
+
+def main(sizes, number: int):
+    print(f"{'lines':>8} {'legacy us/line':>15} {'tokenizer us/line':>18} {'speedup':>8}")
+    for lines in sizes:
+        text = build_resume(lines)
+        if legacy_parse(text) != tokenizer_parse(text):
+            raise SystemExit(f"Tokenizer output differs from the legacy path for {lines} lines")
+        runs = max(1, number * 1000 // lines)
+        legacy = min(timeit.repeat(lambda: legacy_parse(text), number=runs, repeat=5)) / runs
+        tokenizer = min(timeit.repeat(lambda: tokenizer_parse(text), number=runs, repeat=5)) / runs
+        print(f"{lines:>8} {legacy / lines * 1e6:>15.2f} {tokenizer / lines * 1e6:>18.2f} {legacy / tokenizer:>7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, nargs="+", default=[200, 2000, 20000], help="resume sizes to parse")
+    parser.add_argument("--number", type=int, default=20, help="roughly thousands of lines parsed per timing")
+    args = parser.parse_args()
+    main(args.lines, args.number)
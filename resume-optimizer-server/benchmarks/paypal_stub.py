@@ -0,0 +1,128 @@
+"""
+Local stand-in for the PayPal endpoints the server uses, for exercising the
+subscription webhook and reconciler without a sandbox account.
+
+It serves /v1/oauth2/token, GET /v1/billing/subscriptions/{id} from an
+in-memory table and /v1/notifications/verify-webhook-signature. Signatures
+are an HMAC over the transmission id, time, webhook id and the CRC32 of the
+raw event, mirroring the fields PayPal signs, so a tampered body or a wrong
+webhook id fails verification just as it would against PayPal.
+
+Start the stub and point the server at it:
+
+    uvicorn benchmarks.paypal_stub:app --port 8089
+    PAYPAL_API_URL=http://localhost:8089 PAYPAL_CLIENT_ID=stub PAYPAL_CLIENT_SECRET=stub \\
+        PAYPAL_WEBHOOK_ID=stub-webhook uvicorn main:app --port 8000
+
+then deliver a signed event (sent twice with --repeat 2 to check idempotency):
+
+    python -m benchmarks.paypal_stub send I-SUBSCRIPTION-ID CANCELLED --repeat 2
+"""
+import argparse
+import datetime
+import hashlib
+import hmac
+import json
+import uuid
+import zlib
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+
+STUB_SECRET = b"paypal-stub-secret"
+WEBHOOK_ID = "stub-webhook"
+EVENT_MARKER = b'"webhook_event": '
+# Subscription status -> the event PayPal sends when it changes to it
+STATUS_EVENTS = {
+    "ACTIVE": "BILLING.SUBSCRIPTION.ACTIVATED",
+    "SUSPENDED": "BILLING.SUBSCRIPTION.SUSPENDED",
+    "CANCELLED": "BILLING.SUBSCRIPTION.CANCELLED",
+    "EXPIRED": "BILLING.SUBSCRIPTION.EXPIRED"
+}
+
+app = FastAPI(title="PayPal stub")
+subscriptions = {}
+
+
+def sign(transmission_id: str, transmission_time: str, webhook_id: str, event: bytes) -> str:
+    message = f"{transmission_id}|{transmission_time}|{webhook_id}|{zlib.crc32(event)}".encode()
+    return hmac.new(STUB_SECRET, message, hashlib.sha256).hexdigest()
+
+
+def subscription_resource(subscription_id: str, status: str) -> dict:
+    return {
+        "id": subscription_id,
+        "status": status,
+        "status_update_time": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "billing_info": {
+            "next_billing_time": (datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=30)).isoformat()
+        }
+    }
+
+
+@app.post("/v1/oauth2/token")
+async def token():
+    return {"access_token": f"stub-{uuid.uuid4().hex}", "token_type": "Bearer", "expires_in": 32400}
+
+
+@app.get("/v1/billing/subscriptions/{subscription_id}")
+async def get_subscription(subscription_id: str):
+    return subscriptions.setdefault(subscription_id, subscription_resource(subscription_id, "ACTIVE"))
+
+
+@app.put("/stub/subscriptions/{subscription_id}")
+async def set_subscription(subscription_id: str, request: Request):
+    subscriptions[subscription_id] = await request.json()
+    return subscriptions[subscription_id]
+
+
+@app.post("/v1/notifications/verify-webhook-signature")
+async def verify_webhook_signature(request: Request):
+    body = await request.body()
+    fields = json.loads(body)
+    # Signatures cover the event bytes as delivered, so check the raw slice
+    start = body.find(EVENT_MARKER)
+    if start < 0:
+        raise HTTPException(status_code=400, detail="webhook_event is required")
+    event = body[start + len(EVENT_MARKER):body.rindex(b"}")]
+    expected = sign(fields["transmission_id"], fields["transmission_time"], fields["webhook_id"], event)
+    verified = fields["webhook_id"] == WEBHOOK_ID and hmac.compare_digest(expected, fields["transmission_sig"])
+    return {"verification_status": "SUCCESS" if verified else "FAILURE"}
+
+
+def send(subscription_id: str, status: str, target: str, stub: str, repeat: int):
+    """Set the subscription's state in the stub, then deliver one signed event for it"""
+    resource = subscription_resource(subscription_id, status)
+    httpx.put(f"{stub}/stub/subscriptions/{subscription_id}", json=resource).raise_for_status()
+    event = json.dumps({
+        "id": f"WH-{uuid.uuid4().hex}",
+        "event_type": STATUS_EVENTS[status],
+        "create_time": resource["status_update_time"],
+        "resource": resource
+    }).encode()
+    transmission_id = str(uuid.uuid4())
+    transmission_time = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    headers = {
+        "Content-Type": "application/json",
+        "PAYPAL-AUTH-ALGO": "SHA256withRSA",
+        "PAYPAL-CERT-URL": f"{stub}/stub/cert.pem",
+        "PAYPAL-TRANSMISSION-ID": transmission_id,
+        "PAYPAL-TRANSMISSION-TIME": transmission_time,
+        "PAYPAL-TRANSMISSION-SIG": sign(transmission_id, transmission_time, WEBHOOK_ID, event)
+    }
+    for _ in range(repeat):
+        response = httpx.post(target, content=event, headers=headers)
+        print(response.status_code, response.text)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    send_parser = subcommands.add_parser("send", help="deliver a signed subscription event")
+    send_parser.add_argument("subscription_id")
+    send_parser.add_argument("status", choices=list(STATUS_EVENTS))
+    send_parser.add_argument("--target", default="http://localhost:8000/api/webhooks/paypal")
+    send_parser.add_argument("--stub", default="http://localhost:8089")
+    send_parser.add_argument("--repeat", type=int, default=1, help="deliveries of the same event")
+    args = parser.parse_args()
+    send(args.subscription_id, args.status, args.target, args.stub, args.repeat)
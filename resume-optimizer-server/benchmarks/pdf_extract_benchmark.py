@@ -0,0 +1,122 @@
+"""
+Speed and text-quality benchmark for services.pdf_text_extractor.
+
+Runs every available backend over the sample resumes in
+benchmarks/fixtures/resumes and reports, per document:
+
+  ms/doc    - median wall time of one in-process (serial) extraction
+  par ms    - the same with pages split across a --workers process pool
+  quality   - word-level similarity (difflib) between the extracted text and
+              the ground-truth text the PDF was generated from, in percent
+
+Each PDF sits next to a .txt with its ground truth. The corpus is generated
+by this repo's own renderer across all themes, from a one-page resume up to
+a long CV, so the text is known exactly; rebuild it with --regenerate after
+changing the generator.
+
+Run from the resume-optimizer-server directory:
+
+    python -m benchmarks.pdf_extract_benchmark --repeat 5 --workers 4
+"""
+import argparse
+import difflib
+import statistics
+import time
+from pathlib import Path
+
+from services.pdf_text_extractor import PDFTextExtractor, available_backends
+
+CORPUS_DIR = Path(__file__).resolve().parent / "fixtures" / "resumes"
+
+# name -> (markup lines, theme); None marks the cover letter
+CORPUS = {
+    "resume_1p_classic": (18, "classic"),
+    "resume_2p_modern": (40, "modern"),
+    "resume_3p_minimal": (100, "minimal"),
+    "cv_30p_classic": (1000, "classic"),
+    "cover_letter": (None, None),
+}
+
+COVER_LETTER = "\n\n".join([
+    "Dear Hiring Manager,",
+    "I am writing to apply for the Staff Software Engineer position. Over the past eight years I have "
+    "built and scaled backend platforms in Python and Go, most recently leading a team of six engineers "
+    "that cut p95 API latency by 60% while traffic tripled.",
+    "Your focus on developer tooling matches the work I enjoy most: designing clear interfaces, "
+    "profiling hot paths and making systems that are pleasant to operate at three in the morning.",
+    "I would welcome the chance to discuss how my experience can help your team.",
+    "Sincerely,\nJane Doe",
+])
+
+
+def regenerate():
+    """Render the corpus with PDFGenerator and write PDF + ground-truth pairs"""
+    from reportlab import rl_config
+
+    from benchmarks.markup_parse_benchmark import build_resume
+    from services.pdf_generator import PDFGenerator
+    from services.resume_markup import parse_resume_markup
+
+    # Byte-stable output so regenerating an unchanged corpus is a no-op in git
+    rl_config.invariant = 1
+    CORPUS_DIR.mkdir(parents=True, exist_ok=True)
+    for name, (lines, theme) in CORPUS.items():
+        generator = PDFGenerator(theme=theme)
+        if lines is None:
+            pdf, truth = generator.create_cover_letter_pdf(COVER_LETTER), COVER_LETTER
+        else:
+            markup = build_resume(lines, seed=lines)
+            pdf = generator.create_pdf_from_text(markup)
+            truth = "\n".join(block.text for block in parse_resume_markup(markup).blocks)
+        (CORPUS_DIR / f"{name}.pdf").write_bytes(pdf)
+        (CORPUS_DIR / f"{name}.txt").write_text(truth + "\n", encoding="utf-8")
+        print(f"wrote {name}.pdf ({len(pdf) / 1024:.0f} KiB)")
+
+
+def quality(extracted: str, truth: str) -> float:
+    matcher = difflib.SequenceMatcher(None, extracted.split(), truth.split(), autojunk=False)
+    return matcher.ratio() * 100
+
+
+def time_extraction(extractor: PDFTextExtractor, data: bytes, repeat: int) -> float:
+    """Median milliseconds per document"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        extractor.extract(data)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main(repeat: int, workers: int, backends):
+    fixtures = sorted(CORPUS_DIR.glob("*.pdf"))
+    print(f"{len(fixtures)} documents, {repeat} runs each, {workers} workers, backends: {', '.join(backends)}")
+    print(f"{'document':<22} {'pages':>5} {'backend':>11} {'ms/doc':>9} {'par ms':>9} {'quality':>8}")
+    for name in backends:
+        serial = PDFTextExtractor(name, max_workers=0)
+        parallel = PDFTextExtractor(name, max_workers=workers, parallel_min_pages=2)
+        try:
+            # Spin the pool up outside the timings
+            parallel.extract((CORPUS_DIR / "resume_2p_modern.pdf").read_bytes())
+            for fixture in fixtures:
+                data = fixture.read_bytes()
+                truth = fixture.with_suffix(".txt").read_text(encoding="utf-8")
+                pages = serial.extract_pages(data)
+                serial_ms = time_extraction(serial, data, repeat)
+                parallel_ms = time_extraction(parallel, data, repeat) if len(pages) > 1 else serial_ms
+                print(f"{fixture.stem:<22} {len(pages):>5} {name:>11} {serial_ms:>9.1f} {parallel_ms:>9.1f} "
+                      f"{quality(chr(10).join(pages), truth):>7.1f}%")
+        finally:
+            parallel.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per document and backend")
+    parser.add_argument("--workers", type=int, default=4, help="process pool size for the parallel column")
+    parser.add_argument("--backends", nargs="+", default=available_backends(), help="backends to compare")
+    parser.add_argument("--regenerate", action="store_true", help="rebuild the corpus before measuring")
+    args = parser.parse_args()
+    if args.regenerate:
+        regenerate()
+    main(args.repeat, args.workers, args.backends)
@@ -0,0 +1,71 @@
+"""
+Throughput benchmark for services.pdf_render_service.
+
+Renders the same sample resume `--renders` times with everything submitted at
+once, first on the blocking I/O thread pool (`max_workers=0`, how rendering
+ran before) and then on process pools of increasing size. Thread rendering is
+capped by the GIL; process rendering should scale roughly with cores.
+
+Run from the resume-optimizer-server directory:
+
+    python -m benchmarks.pdf_render_benchmark --renders 48 --workers 1 2 4
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from services.blocking_io import io_pool
+from services.pdf_render_service import PDFRenderService
+
+SAMPLE_RESUME = "\n".join(
+    ["Jane Doe", "Senior Backend Engineer", "jane@example.com | +1 555 0100 | Berlin"]
+    + [
+        line
+        for section in range(6)
+        for line in (
+            f"***SECTION {section + 1}***",
+            f"**Role {section + 1} - Company {section + 1}**",
+            *[f"• Built and operated service {i} handling *millions* of requests per day with Python and Postgres"
+              for i in range(8)],
+        )
+    ]
+)
+
+
+async def measure(workers: int, renders: int) -> dict:
+    service = PDFRenderService(max_workers=workers, max_pending=renders)
+    await service.start()
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(service.render_resume(SAMPLE_RESUME) for _ in range(renders)))
+        elapsed = time.perf_counter() - started
+    finally:
+        service.shutdown()
+    stats = service.stats()
+    return {
+        'renders_per_s': renders / elapsed,
+        'render_ms_p50': stats['render_ms_p50'],
+        'queue_ms_p95': stats['queue_ms_p95'],
+    }
+
+
+async def main(renders: int, worker_counts):
+    print(f"{renders} renders per run, {os.cpu_count()} CPUs, I/O pool size {io_pool.max_workers}")
+    print(f"{'mode':>12} {'renders/s':>10} {'render p50 ms':>14} {'queue p95 ms':>13} {'speedup':>8}")
+    baseline = await measure(0, renders)
+    print(f"{'threads':>12} {baseline['renders_per_s']:>10.1f} {baseline['render_ms_p50']:>14.1f} "
+          f"{baseline['queue_ms_p95']:>13.1f} {1.0:>7.1f}x")
+    for workers in worker_counts:
+        result = await measure(workers, renders)
+        print(f"{f'{workers} procs':>12} {result['renders_per_s']:>10.1f} {result['render_ms_p50']:>14.1f} "
+              f"{result['queue_ms_p95']:>13.1f} {result['renders_per_s'] / baseline['renders_per_s']:>7.1f}x")
+    io_pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--renders", type=int, default=48, help="renders per run")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="process pool sizes to compare")
+    args = parser.parse_args()
+    asyncio.run(main(args.renders, args.workers))
@@ -0,0 +1,518 @@
+"""
+Query-plan regression suite for the Supabase queries the route modules issue.
+
+Builds the tables in a scratch schema of a local Postgres, applies the
+migrations, seeds per-user volumes shaped like production (most users hold a
+handful of resumes, a few heavy users hold thousands) and ANALYZEs. Then, for
+every hot query, in the SQL PostgREST generates for it:
+
+  plan     - EXPLAIN ANALYZE must use the expected indexes, with no Seq Scan
+             and no Sort node (list pages must come straight off the index)
+  latency  - p95 over `--runs` executions must stay within the query's budget
+
+Per-user queries run for both a heavy and a typical user. Writes run inside a
+transaction that is rolled back. The exit status is non-zero when any query
+regresses, so the suite can gate migrations and query changes in CI;
+`--without-indexes` skips the index migrations to show what it catches.
+
+Needs psycopg2 (`pip install psycopg2-binary`) and Postgres 13+. Run from the
+resume-optimizer-server directory:
+
+    createdb resumeai_bench
+    python -m benchmarks.query_plan_benchmark --dsn postgresql://localhost/resumeai_bench
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+# Migrations that add columns and tables the queries need, in the order they were applied
+SCHEMA_MIGRATIONS = (
+    "add_paypal_subscription_id.sql",
+    "add_cancelled_at_to_subscriptions.sql",
+    "alter_resumes_table.sql",
+    "create_credit_ledger.sql",
+    "create_paypal_webhook_events.sql",
+)
+# Index-only migrations, applied after seeding
+INDEX_MIGRATIONS = (
+    "add_listing_indexes.sql",
+    "add_hot_path_indexes.sql",
+)
+
+# The Supabase-managed tables as they were before the migrations in migrations/
+BASE_SCHEMA = """
+CREATE TABLE resumes (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL,
+    title TEXT,
+    job_url TEXT,
+    content TEXT,
+    analysis TEXT,
+    optimized_pdf_url TEXT,
+    status TEXT DEFAULT 'processing',
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE TABLE job_applications (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL,
+    resume_id UUID REFERENCES resumes(id) ON DELETE CASCADE,
+    job_title TEXT,
+    company TEXT,
+    job_url TEXT,
+    job_description TEXT,
+    status TEXT DEFAULT 'new',
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE TABLE subscriptions (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL,
+    plan_type TEXT,
+    status TEXT,
+    current_period_start TIMESTAMP WITH TIME ZONE,
+    current_period_end TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE TABLE usage_credits (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL,
+    credits_remaining INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+"""
+
+SEED = (
+    # One row per user with how much they own; heavy users come first
+    """
+    CREATE TABLE bench_users AS
+    SELECT gen_random_uuid() AS user_id,
+           g <= %(heavy_users)s AS heavy,
+           CASE WHEN g <= %(heavy_users)s THEN %(heavy_resumes)s
+                ELSE floor(random() ^ 2 * %(typical_max_resumes)s)::int END AS resumes,
+           CASE WHEN g <= %(heavy_users)s OR random() < %(subscriber_ratio)s
+                THEN 1 + floor(random() * 3)::int ELSE 0 END AS subscriptions
+    FROM generate_series(1, %(users)s) g
+    """,
+    """
+    INSERT INTO resumes (user_id, title, job_url, content, analysis, optimized_pdf_url, status, created_at, updated_at)
+    SELECT user_id, title, job_url, content, analysis, optimized_pdf_url, status, created_at, created_at
+    FROM (
+        SELECT u.user_id,
+               'Resume ' || g AS title,
+               'https://jobs.example.com/' || md5(random()::text) AS job_url,
+               repeat(md5(random()::text), %(content_repeat)s) AS content,
+               repeat(md5(random()::text), 20) AS analysis,
+               'https://storage.example.com/' || md5(random()::text) || '.pdf' AS optimized_pdf_url,
+               CASE WHEN random() < 0.97 THEN 'completed' ELSE 'processing' END AS status,
+               date_trunc('second', NOW() - random() * INTERVAL '365 days') AS created_at
+        FROM bench_users u, generate_series(1, u.resumes) g
+    ) seeded
+    """,
+    """
+    INSERT INTO job_applications (user_id, resume_id, job_title, company, job_url, job_description, status,
+                                  created_at, updated_at)
+    SELECT r.user_id, r.id, 'Engineer ' || left(md5(r.id::text), 6), 'Company ' || left(md5(r.job_url), 4),
+           r.job_url, repeat(md5(random()::text), %(content_repeat)s),
+           (ARRAY['new', 'applied', 'interviewing', 'rejected', 'offer'])[1 + floor(random() * 5)::int],
+           r.created_at + INTERVAL '1 minute', r.created_at + INTERVAL '1 minute'
+    FROM resumes r
+    WHERE random() < %(job_ratio)s
+    """,
+    # Older subscriptions were replaced; the latest is usually still active
+    """
+    INSERT INTO subscriptions (user_id, plan_type, status, paypal_subscription_id, current_period_start,
+                               current_period_end, created_at, updated_at, paypal_status_at, paypal_synced_at)
+    SELECT user_id, plan_type, status, paypal_subscription_id, created_at, created_at + INTERVAL '30 days',
+           created_at, created_at, created_at, paypal_synced_at
+    FROM (
+        SELECT u.user_id,
+               (ARRAY['basic', 'pro', 'enterprise'])[1 + floor(random() * 3)::int] AS plan_type,
+               CASE WHEN g < u.subscriptions THEN 'cancelled'
+                    WHEN random() < 0.75 THEN 'active'
+                    WHEN random() < 0.2 THEN 'suspended'
+                    ELSE 'cancelled' END AS status,
+               'I-' || upper(left(md5(random()::text), 12)) AS paypal_subscription_id,
+               NOW() - (u.subscriptions - g) * INTERVAL '30 days' - random() * INTERVAL '29 days' AS created_at,
+               CASE WHEN random() < 0.1 THEN NULL
+                    ELSE NOW() - random() * INTERVAL '12 hours' END AS paypal_synced_at
+        FROM bench_users u, generate_series(1, u.subscriptions) g
+    ) seeded
+    """,
+    """
+    INSERT INTO usage_credits (user_id, credits_remaining)
+    SELECT user_id, floor(random() * 50)::int FROM bench_users
+    """,
+    # One settled reservation per optimization, and a few still open
+    """
+    INSERT INTO credit_reservations (user_id, amount, status, reason, created_at, settled_at)
+    SELECT user_id, 1, CASE WHEN random() < 0.98 THEN 'committed' ELSE 'refunded' END, 'optimize',
+           created_at, created_at + INTERVAL '40 seconds'
+    FROM resumes
+    """,
+    """
+    INSERT INTO credit_reservations (user_id, amount, reason, created_at)
+    SELECT user_id, 1, 'optimize', NOW() - random() * INTERVAL '2 hours'
+    FROM resumes
+    WHERE random() < 0.002
+    """,
+)
+
+# The user each profile runs as, and the rows their queries point at
+PROFILE_USERS = {
+    "heavy": "SELECT user_id FROM bench_users WHERE heavy ORDER BY user_id LIMIT 1",
+    # The median-sized user among those with resumes, jobs and a subscription
+    "typical": """
+        WITH candidates AS (
+            SELECT u.user_id, u.resumes FROM bench_users u
+            WHERE NOT u.heavy AND u.resumes >= 5 AND u.subscriptions > 0
+              AND EXISTS (SELECT 1 FROM job_applications j WHERE j.user_id = u.user_id)
+        )
+        SELECT user_id FROM candidates ORDER BY resumes, user_id
+        OFFSET (SELECT count(*) / 2 FROM candidates) LIMIT 1
+    """,
+}
+USER_FIXTURES = {
+    "resume_id": "SELECT id FROM resumes WHERE user_id = %(user_id)s ORDER BY created_at DESC LIMIT 1",
+    # Cursor halfway down the list: the deepest page most users ever reach
+    "resume_cursor": """
+        SELECT created_at, id FROM resumes WHERE user_id = %(user_id)s
+        ORDER BY created_at DESC, id DESC
+        OFFSET (SELECT count(*) / 2 FROM resumes WHERE user_id = %(user_id)s) LIMIT 1
+    """,
+    "job_id": "SELECT id FROM job_applications WHERE user_id = %(user_id)s ORDER BY created_at DESC LIMIT 1",
+    "job_cursor": """
+        SELECT created_at, id FROM job_applications WHERE user_id = %(user_id)s
+        ORDER BY created_at DESC, id DESC
+        OFFSET (SELECT count(*) / 2 FROM job_applications WHERE user_id = %(user_id)s) LIMIT 1
+    """,
+    "subscription": """
+        SELECT id, paypal_subscription_id FROM subscriptions WHERE user_id = %(user_id)s
+        ORDER BY created_at DESC LIMIT 1
+    """,
+}
+GLOBAL_FIXTURES = {
+    "reservation_id": """
+        SELECT COALESCE((SELECT id FROM credit_reservations WHERE status = 'reserved' LIMIT 1), gen_random_uuid())
+    """,
+}
+
+RESUME_SUMMARY = "id, created_at, user_id, title, job_url, status, optimized_pdf_url"
+JOB_SUMMARY = ("j.id, j.created_at, j.user_id, j.resume_id, j.job_title, j.company, j.job_url, j.status, "
+               "j.updated_at, row_to_json(r.*) AS resume")
+# PostgREST embeds resume:resumes(...) as a lateral join on the foreign key
+JOB_EMBED = ("job_applications j LEFT JOIN LATERAL ("
+             "SELECT resumes.id, resumes.title, resumes.created_at, resumes.optimized_pdf_url "
+             "FROM resumes WHERE resumes.id = j.resume_id) r ON TRUE")
+
+
+@dataclass
+class QueryCase:
+    name: str
+    source: str
+    sql: str
+    indexes: Tuple[str, ...]
+    budget_ms: float
+    per_user: bool = True
+
+
+CASES = [
+    QueryCase(
+        "resumes.list", "GET /api/resumes",
+        f"SELECT {RESUME_SUMMARY} FROM resumes WHERE user_id = %(user_id)s "
+        "ORDER BY created_at DESC, id DESC LIMIT 51",
+        ("idx_resumes_user_created_id",), 10),
+    QueryCase(
+        "resumes.list_after_cursor", "GET /api/resumes?cursor=",
+        f"SELECT {RESUME_SUMMARY} FROM resumes WHERE user_id = %(user_id)s "
+        "AND created_at <= %(resume_cursor_created_at)s "
+        "AND (created_at < %(resume_cursor_created_at)s "
+        "OR (created_at = %(resume_cursor_created_at)s AND id < %(resume_cursor_id)s)) "
+        "ORDER BY created_at DESC, id DESC LIMIT 51",
+        ("idx_resumes_user_created_id",), 10),
+    QueryCase(
+        "resumes.by_id", "GET /api/resumes/{id}/download, /status, DELETE /api/resumes/{id}",
+        "SELECT * FROM resumes WHERE id = %(resume_id)s AND user_id = %(user_id)s",
+        ("resumes_pkey",), 5),
+    QueryCase(
+        "resumes.latest", "POST /api/jobs",
+        "SELECT id FROM resumes WHERE user_id = %(user_id)s ORDER BY created_at DESC LIMIT 1",
+        ("idx_resumes_user_created_id",), 5),
+    QueryCase(
+        "resumes.store_result", "optimization pipeline",
+        "UPDATE resumes SET status = 'completed', updated_at = NOW() WHERE id = %(resume_id)s",
+        ("resumes_pkey",), 5),
+    QueryCase(
+        "jobs.list", "GET /api/jobs",
+        f"SELECT {JOB_SUMMARY} FROM {JOB_EMBED} WHERE j.user_id = %(user_id)s "
+        "ORDER BY j.created_at DESC, j.id DESC LIMIT 51",
+        ("idx_job_applications_user_created_id", "resumes_pkey"), 15),
+    QueryCase(
+        "jobs.list_after_cursor", "GET /api/jobs?cursor=",
+        f"SELECT {JOB_SUMMARY} FROM {JOB_EMBED} WHERE j.user_id = %(user_id)s "
+        "AND j.created_at <= %(job_cursor_created_at)s "
+        "AND (j.created_at < %(job_cursor_created_at)s "
+        "OR (j.created_at = %(job_cursor_created_at)s AND j.id < %(job_cursor_id)s)) "
+        "ORDER BY j.created_at DESC, j.id DESC LIMIT 51",
+        ("idx_job_applications_user_created_id", "resumes_pkey"), 15),
+    QueryCase(
+        "jobs.by_id", "GET /api/jobs/{id}",
+        f"SELECT {JOB_SUMMARY} FROM {JOB_EMBED} WHERE j.id = %(job_id)s AND j.user_id = %(user_id)s",
+        ("job_applications_pkey", "resumes_pkey"), 5),
+    QueryCase(
+        "jobs.update_status", "PUT /api/jobs/{id}",
+        "UPDATE job_applications SET status = 'applied', updated_at = NOW() "
+        "WHERE id = %(job_id)s AND user_id = %(user_id)s",
+        ("job_applications_pkey",), 5),
+    # What the foreign key runs for every resume deleted
+    QueryCase(
+        "jobs.by_resume", "DELETE /api/resumes/{id} (foreign key)",
+        "SELECT 1 FROM ONLY job_applications x WHERE resume_id = %(resume_id)s FOR KEY SHARE OF x",
+        ("idx_job_applications_resume_id",), 5),
+    QueryCase(
+        "subscriptions.latest", "GET /api/subscriptions",
+        "SELECT * FROM subscriptions WHERE user_id = %(user_id)s ORDER BY created_at DESC LIMIT 1",
+        ("idx_subscriptions_user_created",), 5),
+    QueryCase(
+        "subscriptions.active", "POST /api/subscriptions/cancel",
+        "SELECT * FROM subscriptions WHERE user_id = %(user_id)s AND status = 'active'",
+        ("idx_subscriptions_user_active",), 5),
+    QueryCase(
+        "subscriptions.cancel_active", "POST /api/subscriptions",
+        "UPDATE subscriptions SET status = 'cancelled' WHERE user_id = %(user_id)s AND status = 'active'",
+        ("idx_subscriptions_user_active",), 5),
+    QueryCase(
+        "subscriptions.apply_event", "POST /api/webhooks/paypal",
+        "UPDATE subscriptions SET paypal_status_at = NOW(), updated_at = NOW() "
+        "WHERE paypal_subscription_id = %(paypal_subscription_id)s AND paypal_status_at < NOW()",
+        ("idx_subscriptions_paypal_subscription_id",), 5),
+    QueryCase(
+        "subscriptions.mark_synced", "PayPal reconciler",
+        "UPDATE subscriptions SET paypal_synced_at = NOW() WHERE id = %(subscription_id)s",
+        ("subscriptions_pkey",), 5),
+    QueryCase(
+        "subscriptions.reconcile_batch", "PayPal reconciler",
+        "SELECT id, paypal_subscription_id, paypal_synced_at FROM subscriptions "
+        "WHERE status IN ('active', 'suspended') AND paypal_subscription_id <> '' "
+        "ORDER BY paypal_synced_at ASC NULLS FIRST LIMIT 50",
+        ("idx_subscriptions_reconcile",), 10, per_user=False),
+    QueryCase(
+        "credits.balance", "GET /api/credits",
+        "SELECT credits_remaining FROM usage_credits WHERE user_id = %(user_id)s",
+        ("idx_usage_credits_user_id",), 5),
+    QueryCase(
+        "credits.reserve", "reserve_credit()",
+        "UPDATE usage_credits SET credits_remaining = credits_remaining - 1, updated_at = NOW() "
+        "WHERE user_id = %(user_id)s AND credits_remaining >= 1",
+        ("idx_usage_credits_user_id",), 5),
+    QueryCase(
+        "credits.add", "add_credits()",
+        "INSERT INTO usage_credits (user_id, credits_remaining, created_at, updated_at) "
+        "VALUES (%(user_id)s, 10, NOW(), NOW()) ON CONFLICT (user_id) DO UPDATE "
+        "SET credits_remaining = usage_credits.credits_remaining + EXCLUDED.credits_remaining, updated_at = NOW()",
+        ("idx_usage_credits_user_id",), 5),
+    QueryCase(
+        "credits.settle", "commit_credit(), refund_credit()",
+        "UPDATE credit_reservations SET status = 'committed', settled_at = NOW() "
+        "WHERE id = %(reservation_id)s AND status = 'reserved'",
+        ("credit_reservations_pkey",), 5, per_user=False),
+    QueryCase(
+        "credits.release_stale", "release_stale_credit_reservations()",
+        "SELECT id FROM credit_reservations WHERE status = 'reserved' AND created_at < NOW() - INTERVAL '1 hour' "
+        "FOR UPDATE SKIP LOCKED",
+        ("idx_credit_reservations_open",), 10, per_user=False),
+]
+
+
+def apply_migrations(cur, names):
+    for name in names:
+        cur.execute((MIGRATIONS_DIR / name).read_text())
+
+
+def setup(conn, schema: str, volumes: dict, with_indexes: bool):
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        cur.execute(f"CREATE SCHEMA {schema}")
+        cur.execute(f"SET search_path TO {schema}, public")
+        cur.execute(BASE_SCHEMA)
+        apply_migrations(cur, SCHEMA_MIGRATIONS)
+
+        started = time.perf_counter()
+        cur.execute("SELECT setseed(%s)", (volumes.pop("seed"),))
+        for statement in SEED:
+            cur.execute(statement, volumes)
+        if with_indexes:
+            apply_migrations(cur, INDEX_MIGRATIONS)
+        cur.execute("ANALYZE")
+        conn.commit()
+
+        cur.execute("SELECT (SELECT count(*) FROM resumes), (SELECT count(*) FROM job_applications), "
+                    "(SELECT count(*) FROM subscriptions), (SELECT count(*) FROM credit_reservations)")
+        resumes, jobs, subscriptions, reservations = cur.fetchone()
+        print(f"Seeded {resumes} resumes, {jobs} jobs, {subscriptions} subscriptions, "
+              f"{reservations} credit reservations in {time.perf_counter() - started:.1f}s")
+
+
+def fixtures(conn) -> Dict[str, dict]:
+    """Query parameters for each user profile, plus '-' for the queries that are not per user"""
+    params = {}
+    with conn.cursor() as cur:
+        shared = {}
+        for name, sql in GLOBAL_FIXTURES.items():
+            cur.execute(sql)
+            shared[name] = cur.fetchone()[0]
+        params["-"] = shared
+
+        for profile, sql in PROFILE_USERS.items():
+            cur.execute(sql)
+            row = cur.fetchone()
+            if row is None:
+                raise SystemExit(f"No {profile} user in the seeded data; raise --users")
+            values = {**shared, "user_id": row[0]}
+            for name, fixture_sql in USER_FIXTURES.items():
+                cur.execute(fixture_sql, values)
+                row = cur.fetchone()
+                if name.endswith("_cursor"):
+                    prefix = name[:-len("_cursor")]
+                    values[f"{prefix}_cursor_created_at"], values[f"{prefix}_cursor_id"] = row
+                elif name == "subscription":
+                    values["subscription_id"], values["paypal_subscription_id"] = row
+                else:
+                    values[name] = row[0]
+            cur.execute("SELECT resumes FROM bench_users WHERE user_id = %s", (values["user_id"],))
+            print(f"{profile} user: {cur.fetchone()[0]} resumes")
+            params[profile] = values
+        conn.rollback()
+    return params
+
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def check_plan(conn, case: QueryCase, values: dict) -> List[str]:
+    """Problems with the query's plan; empty when it uses the expected indexes and never scans or sorts"""
+    with conn.cursor() as cur:
+        cur.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + case.sql, values)
+        explain = cur.fetchone()[0]
+    conn.rollback()
+    if isinstance(explain, str):
+        explain = json.loads(explain)
+
+    used = set()
+    problems = []
+    for node in plan_nodes(explain[0]["Plan"]):
+        if "Index Name" in node:
+            used.add(node["Index Name"])
+        used.update(node.get("Arbiter Indexes", []))
+        if node["Node Type"] == "Seq Scan":
+            problems.append(f"seq scan on {node.get('Relation Name')}")
+        elif node["Node Type"] in ("Sort", "Incremental Sort"):
+            problems.append(f"sort on {', '.join(node.get('Sort Key', []))}")
+    missing = [index for index in case.indexes if index not in used]
+    if missing:
+        problems.append(f"not using {', '.join(missing)}")
+    return problems
+
+
+def measure(conn, case: QueryCase, values: dict, runs: int) -> List[float]:
+    timings = []
+    with conn.cursor() as cur:
+        for run in range(runs + 1):
+            started = time.perf_counter()
+            cur.execute(case.sql, values)
+            if cur.description:
+                cur.fetchall()
+            elapsed = (time.perf_counter() - started) * 1000
+            # Writes are rolled back so every run sees the seeded data
+            conn.rollback()
+            if run:
+                timings.append(elapsed)
+    return timings
+
+
+def main(args) -> int:
+    try:
+        import psycopg2
+    except ImportError:
+        print("psycopg2 is required: pip install psycopg2-binary", file=sys.stderr)
+        return 2
+    if not args.dsn:
+        print("Pass --dsn or set DATABASE_URL", file=sys.stderr)
+        return 2
+
+    conn = psycopg2.connect(args.dsn)
+    try:
+        volumes = {
+            "seed": args.seed,
+            "users": args.users,
+            "heavy_users": max(1, round(args.users * args.heavy_ratio)),
+            "heavy_resumes": args.heavy_resumes,
+            "typical_max_resumes": args.typical_max_resumes,
+            "subscriber_ratio": args.subscriber_ratio,
+            "job_ratio": args.job_ratio,
+            "content_repeat": args.content_kb * 32,
+        }
+        setup(conn, args.schema, volumes, with_indexes=not args.without_indexes)
+        params = fixtures(conn)
+
+        failures = 0
+        print(f"\n{'query':32} {'user':8} {'p50 ms':>8} {'p95 ms':>8} {'budget':>8}  result")
+        for case in CASES:
+            for profile in (("heavy", "typical") if case.per_user else ("-",)):
+                values = params[profile]
+                problems = check_plan(conn, case, values)
+                timings = measure(conn, case, values, args.runs)
+                p50 = statistics.median(timings)
+                p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+                budget = case.budget_ms * args.budget_scale
+                if p95 > budget:
+                    problems.append("p95 over budget")
+                failures += bool(problems)
+                result = "ok" if not problems else "FAIL: " + "; ".join(problems)
+                print(f"{case.name:32} {profile:8} {p50:8.2f} {p95:8.2f} {budget:8.1f}  {result}")
+
+        print(f"\n{len(CASES)} queries, {failures} regressions")
+        return 1 if failures else 0
+    finally:
+        if not args.keep:
+            conn.rollback()
+            with conn.cursor() as cur:
+                cur.execute(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE")
+            conn.commit()
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=os.getenv("DATABASE_URL"), help="local Postgres (default: $DATABASE_URL)")
+    parser.add_argument("--schema", default="query_plan_bench", help="scratch schema, dropped and recreated")
+    parser.add_argument("--keep", action="store_true", help="leave the seeded schema in place afterwards")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--heavy-ratio", type=float, default=0.01, help="share of users with --heavy-resumes")
+    parser.add_argument("--heavy-resumes", type=int, default=2000, help="resumes per heavy user")
+    parser.add_argument("--typical-max-resumes", type=int, default=40, help="upper bound for everyone else")
+    parser.add_argument("--subscriber-ratio", type=float, default=0.35, help="share of users with a subscription")
+    parser.add_argument("--job-ratio", type=float, default=0.6, help="share of resumes tracked as a job")
+    parser.add_argument("--content-kb", type=int, default=4, help="approximate resume text size")
+    parser.add_argument("--seed", type=float, default=0.42, help="setseed() value for reproducible volumes")
+    parser.add_argument("--runs", type=int, default=30, help="timed executions per query and user")
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="multiply every latency budget")
+    parser.add_argument("--without-indexes", action="store_true",
+                        help="skip the index migrations to see what the suite catches")
+    sys.exit(main(parser.parse_args()))
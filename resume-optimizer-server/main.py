@@ -1,11 +1,11 @@
 from fastapi import FastAPI, Request, Response, HTTPException, File, UploadFile, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
 import os
 import openai
 import sentry_sdk
 from loguru import logger
-from supabase import create_client, Client
 
 # Load environment variables
 load_dotenv()
@@ -25,12 +25,11 @@ if not api_key:
     raise ValueError("OpenAI API key not found")
 openai.api_key = api_key
 
-# Initialize Supabase
+# Validate Supabase credentials (the shared client lives in services.supabase_client)
 supabase_url = os.getenv('SUPABASE_URL')
 supabase_key = os.getenv('SUPABASE_KEY')
 if not supabase_url or not supabase_key:
     raise ValueError("Supabase credentials not found")
-supabase: Client = create_client(supabase_url, supabase_key)
 
 # Create FastAPI app
 app = FastAPI(title="Resume Optimizer API")
@@ -50,8 +49,44 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Retry-After", "X-Next-Cursor"],
 )
 
+# Compress JSON responses (resume and job lists run large). Brotli is used when
+# brotli-asgi is installed, falling back to gzip for clients that lack it;
+# PDFs are already compressed and SSE must not be buffered, so both are skipped
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_EXCLUDED_TYPES = ("text/event-stream", "application/pdf", "multipart/mixed")
+# brotli-asgi can only exclude by path: the SSE streams and PDF downloads
+COMPRESSION_EXCLUDED_PATHS = [r"^/api/optimize/stream$", r"^/api/optimize/[^/]+/events$", r"/download$"]
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(
+        BrotliMiddleware,
+        minimum_size=COMPRESSION_MIN_SIZE,
+        gzip_fallback=True,
+        excluded_handlers=COMPRESSION_EXCLUDED_PATHS
+    )
+except ImportError:
+    from starlette.middleware.gzip import GZipMiddleware
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=COMPRESSION_MIN_SIZE,
+        exclude_content_types=COMPRESSION_EXCLUDED_TYPES
+    )
+
+from services.upload_ingest import upload_ingestor
+
+# Uploads are parsed before route handlers run, so refuse oversize bodies here
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    if request.headers.get('content-type', '').startswith('multipart/form-data'):
+        try:
+            upload_ingestor.check_content_length(request.headers.get('content-length'))
+        except HTTPException as e:
+            return JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+    return await call_next(request)
+
 # Import routers
 from routes.optimize_routes import router as optimize_router
 from routes.job_routes import router as jobs_router
@@ -59,6 +94,8 @@ from routes.resume_routes import router as resumes_router
 from routes.user_routes import router as users_router
 from routes.scrape_routes import router as scrape_router
 from routes.subscription_routes import router as subscriptions_router
+from routes.health_routes import router as health_router
+from routes.webhook_routes import router as webhook_router
 
 # Include routers
 app.include_router(optimize_router)
@@ -67,6 +104,41 @@ app.include_router(resumes_router)
 app.include_router(users_router)
 app.include_router(scrape_router)
 app.include_router(subscriptions_router)
+app.include_router(health_router)
+app.include_router(webhook_router)
+
+from services.job_queue import optimization_queue
+from services.blocking_io import io_pool
+from services.supabase_client import supabase
+from services.http_client import scraping_client
+from services.job_posting_cache import job_posting_cache
+from services.pdf_render_service import pdf_renderer
+from services.pdf_text_extractor import pdf_text_extractor
+from services.credit_ledger import credit_ledger
+from services.paypal_client import paypal_client
+from services.paypal_subscription_sync import paypal_subscription_sync
+
+@app.on_event("startup")
+async def startup():
+    supabase.startup()
+    await pdf_renderer.start()
+    await pdf_text_extractor.start()
+    await optimization_queue.start()
+    credit_ledger.start()
+    paypal_subscription_sync.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await optimization_queue.stop()
+    await credit_ledger.stop()
+    await paypal_subscription_sync.stop()
+    pdf_renderer.shutdown()
+    pdf_text_extractor.shutdown()
+    await paypal_client.aclose()
+    supabase.shutdown()
+    job_posting_cache.shutdown()
+    scraping_client.close()
+    io_pool.shutdown()
 
 @app.get("/")
 async def root():
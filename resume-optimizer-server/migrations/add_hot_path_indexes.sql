@@ -0,0 +1,24 @@
+-- Indexes for the per-user queries the route modules issue. Each one is
+-- checked by benchmarks/query_plan_benchmark.py, which seeds a local Postgres
+-- and asserts the planner picks it. The listing indexes on resumes and
+-- job_applications (user_id, created_at DESC, id DESC) live in
+-- add_listing_indexes.sql, and usage_credits(user_id) in create_credit_ledger.sql.
+
+-- GET /api/subscriptions: the user's latest subscription
+CREATE INDEX IF NOT EXISTS idx_subscriptions_user_created
+    ON subscriptions(user_id, created_at DESC);
+
+-- Cancelling, and replacing on subscribe, look up the user's active
+-- subscription. Active rows are a small slice of the table, so the index is partial.
+CREATE INDEX IF NOT EXISTS idx_subscriptions_user_active
+    ON subscriptions(user_id)
+    WHERE status = 'active';
+
+-- The PayPal reconciler walks live PayPal subscriptions, least recently synced first
+CREATE INDEX IF NOT EXISTS idx_subscriptions_reconcile
+    ON subscriptions(paypal_synced_at NULLS FIRST)
+    WHERE status IN ('active', 'suspended') AND paypal_subscription_id <> '';
+
+-- Jobs embed their resume, and deleting a resume has to find the jobs pointing at it
+CREATE INDEX IF NOT EXISTS idx_job_applications_resume_id
+    ON job_applications(resume_id);
@@ -0,0 +1,8 @@
+-- Keyset pagination for GET /api/resumes and GET /api/jobs: both filter on
+-- user_id and walk (created_at, id) newest first, so one composite index per
+-- table serves every page straight from the index order without a sort
+CREATE INDEX IF NOT EXISTS idx_resumes_user_created_id
+    ON resumes(user_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_job_applications_user_created_id
+    ON job_applications(user_id, created_at DESC, id DESC);
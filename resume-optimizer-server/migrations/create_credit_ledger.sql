@@ -0,0 +1,136 @@
+-- Credit ledger: every balance change is a single conditional UPDATE/UPSERT on
+-- usage_credits, so concurrent optimizations and purchases can no longer
+-- overwrite each other's read-modify-write. An optimization reserves a credit
+-- up front and the reservation is committed when the result is stored or
+-- refunded when the optimization fails.
+
+-- One balance row per user; add_credits relies on it for ON CONFLICT
+CREATE UNIQUE INDEX IF NOT EXISTS idx_usage_credits_user_id ON usage_credits(user_id);
+
+CREATE TABLE IF NOT EXISTS credit_reservations (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL,
+    amount INTEGER NOT NULL CHECK (amount > 0),
+    status TEXT NOT NULL DEFAULT 'reserved' CHECK (status IN ('reserved', 'committed', 'refunded')),
+    reason TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    settled_at TIMESTAMP WITH TIME ZONE
+);
+
+COMMENT ON TABLE credit_reservations IS 'Credits held by in-flight optimizations until they are committed or refunded';
+
+-- Partial index: release_stale_credit_reservations only scans open reservations
+CREATE INDEX IF NOT EXISTS idx_credit_reservations_open
+    ON credit_reservations(created_at)
+    WHERE status = 'reserved';
+
+ALTER TABLE credit_reservations ENABLE ROW LEVEL SECURITY;
+
+-- Take p_amount credits if the user has them. Always returns one row: the new
+-- reservation id (NULL when the balance was too low) and the resulting balance.
+CREATE OR REPLACE FUNCTION reserve_credit(p_user_id UUID, p_amount INTEGER DEFAULT 1, p_reason TEXT DEFAULT NULL)
+RETURNS TABLE (reservation_id UUID, credits_remaining INTEGER)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_balance INTEGER;
+    v_reservation UUID;
+BEGIN
+    UPDATE usage_credits
+    SET credits_remaining = usage_credits.credits_remaining - p_amount,
+        updated_at = NOW()
+    WHERE user_id = p_user_id
+      AND usage_credits.credits_remaining >= p_amount
+    RETURNING usage_credits.credits_remaining INTO v_balance;
+
+    IF NOT FOUND THEN
+        SELECT usage_credits.credits_remaining INTO v_balance
+        FROM usage_credits
+        WHERE user_id = p_user_id;
+        RETURN QUERY SELECT NULL::UUID, COALESCE(v_balance, 0);
+        RETURN;
+    END IF;
+
+    INSERT INTO credit_reservations (user_id, amount, reason)
+    VALUES (p_user_id, p_amount, p_reason)
+    RETURNING id INTO v_reservation;
+
+    RETURN QUERY SELECT v_reservation, v_balance;
+END;
+$$;
+
+-- Keep the reserved credits. Returns false if the reservation was already settled.
+CREATE OR REPLACE FUNCTION commit_credit(p_reservation_id UUID)
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE credit_reservations
+    SET status = 'committed', settled_at = NOW()
+    WHERE id = p_reservation_id AND status = 'reserved';
+    RETURN FOUND;
+END;
+$$;
+
+-- Give the reserved credits back. Settling twice is a no-op, so a retried
+-- refund can never credit the user twice. Returns the balance afterwards.
+CREATE OR REPLACE FUNCTION refund_credit(p_reservation_id UUID)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_user UUID;
+    v_amount INTEGER;
+    v_balance INTEGER;
+BEGIN
+    UPDATE credit_reservations
+    SET status = 'refunded', settled_at = NOW()
+    WHERE id = p_reservation_id AND status = 'reserved'
+    RETURNING user_id, amount INTO v_user, v_amount;
+
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    UPDATE usage_credits
+    SET credits_remaining = credits_remaining + v_amount,
+        updated_at = NOW()
+    WHERE user_id = v_user
+    RETURNING credits_remaining INTO v_balance;
+    RETURN v_balance;
+END;
+$$;
+
+-- Purchases and plan grants: add to the balance, creating the row if needed
+CREATE OR REPLACE FUNCTION add_credits(p_user_id UUID, p_amount INTEGER)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    INSERT INTO usage_credits (user_id, credits_remaining, created_at, updated_at)
+    VALUES (p_user_id, p_amount, NOW(), NOW())
+    ON CONFLICT (user_id) DO UPDATE
+    SET credits_remaining = usage_credits.credits_remaining + EXCLUDED.credits_remaining,
+        updated_at = NOW()
+    RETURNING credits_remaining;
+$$;
+
+-- Refund reservations whose worker died before settling them
+CREATE OR REPLACE FUNCTION release_stale_credit_reservations(p_older_than INTERVAL DEFAULT INTERVAL '1 hour')
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_reservation UUID;
+    v_released INTEGER := 0;
+BEGIN
+    FOR v_reservation IN
+        SELECT id FROM credit_reservations
+        WHERE status = 'reserved' AND created_at < NOW() - p_older_than
+        FOR UPDATE SKIP LOCKED
+    LOOP
+        PERFORM refund_credit(v_reservation);
+        v_released := v_released + 1;
+    END LOOP;
+    RETURN v_released;
+END;
+$$;
@@ -0,0 +1,26 @@
+-- PayPal subscription state is pushed by webhooks (plus a periodic reconciler)
+-- instead of being fetched from PayPal on every GET /api/subscriptions.
+
+-- Delivered webhook events, keyed by PayPal's event id so redeliveries are skipped
+CREATE TABLE IF NOT EXISTS paypal_webhook_events (
+    event_id TEXT PRIMARY KEY,
+    event_type TEXT NOT NULL,
+    resource_id TEXT,
+    received_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+COMMENT ON TABLE paypal_webhook_events IS 'Processed PayPal webhook event ids for idempotent handling';
+
+ALTER TABLE paypal_webhook_events ENABLE ROW LEVEL SECURITY;
+
+-- Last PayPal subscription resource seen, served as-is to the billing pages
+ALTER TABLE subscriptions
+ADD COLUMN IF NOT EXISTS paypal_resource JSONB,
+-- PayPal-side time of the status we hold; older events never overwrite newer ones
+ADD COLUMN IF NOT EXISTS paypal_status_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT 'epoch',
+-- When the reconciler last compared this row with PayPal
+ADD COLUMN IF NOT EXISTS paypal_synced_at TIMESTAMP WITH TIME ZONE;
+
+COMMENT ON COLUMN subscriptions.paypal_resource IS 'Latest PayPal subscription resource from a webhook or the reconciler';
+
+CREATE INDEX IF NOT EXISTS idx_subscriptions_paypal_subscription_id ON subscriptions(paypal_subscription_id);
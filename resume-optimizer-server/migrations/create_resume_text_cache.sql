@@ -0,0 +1,17 @@
+-- Cleaned text extracted from uploaded resumes, keyed by the SHA-256 of the file.
+-- Only used when RESUME_TEXT_CACHE_PERSIST=true; lets workers and restarts skip
+-- re-parsing a PDF that was already uploaded.
+CREATE TABLE IF NOT EXISTS resume_text_cache (
+    sha256 TEXT NOT NULL,
+    extractor TEXT NOT NULL,
+    version TEXT NOT NULL,
+    text TEXT NOT NULL,
+    extract_ms DOUBLE PRECISION NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (sha256, extractor, version)
+);
+
+COMMENT ON TABLE resume_text_cache IS 'Extracted resume text cache keyed by upload hash; safe to truncate';
+
+-- Resume text is personal data: keep it server-side only
+ALTER TABLE resume_text_cache ENABLE ROW LEVEL SECURITY;
@@ -1,13 +1,51 @@
-from fastapi import FastAPI
+from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 import time
 
-app = FastAPI()
+from services.supabase_client import supabase
+from services.blocking_io import io_pool
+from services.job_queue import optimization_queue
+from services.openai_optimizer import optimization_cache
+from services.http_client import scraping_client
+from services.job_posting_cache import job_posting_cache
+from services.pdf_render_service import pdf_renderer
+from services.upload_ingest import upload_ingestor
+from services.pdf_text_extractor import pdf_text_extractor
+from services.resume_text_cache import resume_text_cache
+from services.resume_text_extractor import resume_text_extractor
+from services.credit_ledger import credit_ledger
+from services.account_cache import account_cache
+from services.paypal_client import paypal_client
+from services.paypal_subscription_sync import paypal_subscription_sync
 
-@app.get("/health")
+router = APIRouter(tags=["health"])
+
+@router.get("/api/health")
 def health_check():
     """Health check endpoint"""
     return JSONResponse(content={
         "status": "healthy",
         "timestamp": time.time()
-    })
\ No newline at end of file
+    })
+
+@router.get("/api/metrics")
+def metrics():
+    """Pool, queue and cache counters for dashboards and load tests"""
+    return JSONResponse(content={
+        "timestamp": time.time(),
+        "supabase": supabase.stats(),
+        "io_pool": io_pool.stats(),
+        "optimization_queue": optimization_queue.stats(),
+        "optimization_cache": optimization_cache.stats(),
+        "scraping_client": scraping_client.stats(),
+        "job_posting_cache": job_posting_cache.stats(),
+        "pdf_renderer": pdf_renderer.stats(),
+        "uploads": upload_ingestor.stats(),
+        "pdf_text_extractor": pdf_text_extractor.stats(),
+        "resume_text_cache": resume_text_cache.stats(),
+        "resume_text_extractor": resume_text_extractor.stats(),
+        "credit_ledger": credit_ledger.stats(),
+        "account_cache": account_cache.stats(),
+        "paypal": paypal_client.stats(),
+        "paypal_subscription_sync": paypal_subscription_sync.stats()
+    })
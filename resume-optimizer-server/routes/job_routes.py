@@ -1,16 +1,12 @@
-from fastapi import APIRouter, Header, HTTPException, Depends
-from typing import Optional, List
-import os
+from fastapi import APIRouter, Header, HTTPException
+from typing import Optional
 from pydantic import BaseModel
 from datetime import datetime
-from supabase import create_client, Client
+from services.supabase_client import supabase
 from services.linkedin_scraper import LinkedInJobScraper
-
-supabase_url = os.getenv('SUPABASE_URL')
-supabase_key = os.getenv('SUPABASE_KEY')
+from services.pagination import keyset_page, page_response, page_size, project_fields
 
 router = APIRouter(tags=["jobs"])
-supabase: Client = create_client(supabase_url, supabase_key)
 
 # Pydantic models for request/response validation
 class JobBase(BaseModel):
@@ -45,12 +41,13 @@ def get_job(
 ):
     try:
         
-        response =  supabase.table('job_applications')\
-            .select('*, resume:resumes(id, analysis, title, created_at)')\
-            .eq('id', job_id)\
-            .eq('user_id', x_user_id)\
-            .single()\
-            .execute()
+        response = supabase.execute_sync(
+            supabase.table('job_applications')
+            .select('*, resume:resumes(id, analysis, title, created_at)')
+            .eq('id', job_id)
+            .eq('user_id', x_user_id)
+            .single()
+        )
 
         if not response.data:
             raise HTTPException(status_code=404, detail="Job not found or not authorized")
@@ -63,29 +60,55 @@ def get_job(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Column sets for the job list. 'analysis' comes from the linked resume; the
+# description and analysis texts are only sent when asked for
+JOB_VIEWS = {
+    'summary': ('id', 'user_id', 'resume_id', 'job_title', 'company', 'job_url', 'status',
+                'created_at', 'updated_at'),
+    'full': ('id', 'user_id', 'resume_id', 'job_title', 'company', 'job_url', 'status',
+             'created_at', 'updated_at', 'job_description', 'analysis')
+}
+
 @router.get("/api/jobs")
-def get_jobs(x_user_id: str = Header(..., alias="X-User-Id")):
+def get_jobs(
+    x_user_id: str = Header(..., alias="X-User-Id"),
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    view: str = 'summary'
+):
+    """
+    The user's job applications, newest first, one page at a time (the next
+    page's cursor is in X-Next-Cursor). Summary columns unless `view=full` or
+    `fields` asks for more.
+    """
     try:
-        response = supabase.table('job_applications')\
-            .select('*, resume:resumes(id, analysis, title, created_at, optimized_pdf_url)')\
-            .eq('user_id', x_user_id)\
-            .order('created_at', desc=True)\
-            .execute()
-
-        if not response.data:
-            return []
+        size = page_size(limit)
+        columns = project_fields(fields, JOB_VIEWS, view)
+        resume_columns = ['id', 'title', 'created_at', 'optimized_pdf_url']
+        if 'analysis' in columns or columns == ['*']:
+            resume_columns.append('analysis')
+        job_columns = ','.join(column for column in columns if column != 'analysis')
+
+        query = supabase.table('job_applications')\
+            .select(f"{job_columns},resume:resumes({','.join(resume_columns)})")\
+            .eq('user_id', x_user_id)
+        response = supabase.execute_sync(keyset_page(query, cursor, size))
 
         jobs = []
-        for job in response.data:
+        for job in response.data or []:
             job_data = {**job}
             if job.get('resume'):
                 resume = job['resume']
-                job_data['analysis'] = resume.get('analysis')
+                if 'analysis' in resume:
+                    job_data['analysis'] = resume.get('analysis')
                 job_data['resume_title'] = resume.get('title')
                 job_data['resume_id'] = resume.get('id')
             jobs.append(job_data)
 
-        return jobs
+        return page_response(jobs, size)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -96,12 +119,13 @@ def create_job(
 ):
     try:
         # Get latest resume
-        resume_response = supabase.table('resumes')\
-            .select('id')\
-            .eq('user_id', x_user_id)\
-            .order('created_at', desc=True)\
-            .limit(1)\
-            .execute()
+        resume_response = supabase.execute_sync(
+            supabase.table('resumes')
+            .select('id')
+            .eq('user_id', x_user_id)
+            .order('created_at', desc=True)
+            .limit(1)
+        )
 
         resume_id = resume_response.data[0]['id'] if resume_response.data else None
 
@@ -117,9 +141,10 @@ def create_job(
             'updated_at': 'now()'
         }
 
-        response = supabase.table('job_applications')\
-            .insert(job_data)\
-            .execute()
+        response = supabase.execute_sync(
+            supabase.table('job_applications')
+            .insert(job_data)
+        )
 
         return {"success": True, "data": response.data[0]}
     except Exception as e:
@@ -131,11 +156,12 @@ def download_job_resume(
     x_user_id: str = Header(..., alias="X-User-Id")
 ):
     try:
-        response =  supabase.table('job_applications')\
-            .select('resume:resumes(optimized_pdf_url)')\
-            .eq('id', job_id)\
-            .eq('user_id', x_user_id)\
-            .execute()
+        response = supabase.execute_sync(
+            supabase.table('job_applications')
+            .select('resume:resumes(optimized_pdf_url)')
+            .eq('id', job_id)
+            .eq('user_id', x_user_id)
+        )
 
         if not response.data:
             raise HTTPException(status_code=404, detail="Resume not found or not authorized")
@@ -170,11 +196,12 @@ def update_job_status(
         )
 
     try:
-        response =  supabase.table('job_applications')\
-            .update({'status': job_update.status, 'updated_at': 'now()'})\
-            .eq('id', job_id)\
-            .eq('user_id', x_user_id)\
-            .execute()
+        response = supabase.execute_sync(
+            supabase.table('job_applications')
+            .update({'status': job_update.status, 'updated_at': 'now()'})
+            .eq('id', job_id)
+            .eq('user_id', x_user_id)
+        )
 
         if not response.data:
             raise HTTPException(status_code=404, detail="Job not found or not authorized")
@@ -190,11 +217,12 @@ def delete_job(
 ):
     try:
         
-        response =  supabase.table('job_applications')\
-            .delete()\
-            .eq('id', job_id)\
-            .eq('user_id', x_user_id)\
-            .execute()
+        response = supabase.execute_sync(
+            supabase.table('job_applications')
+            .delete()
+            .eq('id', job_id)
+            .eq('user_id', x_user_id)
+        )
 
         if not response.data:
             raise HTTPException(status_code=404, detail="Job application not found or unauthorized")
@@ -232,5 +260,7 @@ def get_job_details(query: JobSearchQuery):
             raise HTTPException(status_code=404, detail="Failed to get job details")
 
         return {"success": True, "data": job_details}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
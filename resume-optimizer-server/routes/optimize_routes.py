@@ -1,171 +1,288 @@
 from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, Form, Header, Request
-from fastapi.responses import JSONResponse
-from services.openai_optimizer import OpenAIOptimizer
-from services.pdf_generator import PDFGenerator
-from supabase import create_client, Client
-import os
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+import anyio
 import base64
-import re
-import time
+import json
+import uuid
 from services.supabase_client import supabase
-import datetime
-from routes.subscription_routes import check_user_credits
-from services.linkedin_scraper import LinkedInJobScraper as JobScraper
+from services.credit_ledger import credit_ledger
+from services.optimization_pipeline import (
+    OptimizationRequest,
+    create_processing_resume,
+    mark_resume_failed,
+    release_credit,
+    run_optimization,
+    stream_optimization
+)
+from services.job_queue import optimization_queue, QueueFullError
+from services.blocking_io import run_blocking
+from services.upload_ingest import upload_ingestor
 from loguru import logger
 
-app = FastAPI()
 router = APIRouter()
 
-# Initialize Supabase client
-supabase_url = os.getenv('SUPABASE_URL')
-supabase_key = os.getenv('SUPABASE_KEY')
-supabase: Client = create_client(supabase_url, supabase_key)
+RESPONSE_FORMATS = ('json', 'url', 'multipart')
+
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+class SettlingStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose background task runs however the response ends.
+    Starlette skips the background task when the client disconnects, and a
+    body generator that never started has no finally of its own to run.
+    """
+
+    async def __call__(self, scope, receive, send):
+        background, self.background = self.background, None
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            if background is not None:
+                # Shielded: a disconnect cancels the surrounding scope
+                with anyio.CancelScope(shield=True):
+                    await background()
+
+def _multipart_response(result: dict, pdf_data: bytes) -> StreamingResponse:
+    """
+    multipart/mixed body with the JSON result followed by the raw PDF. The PDF
+    buffer is yielded as-is rather than copied into one joined body.
+    """
+    boundary = uuid.uuid4().hex
+    filename = f"resume_{result.get('title') or 'document'}.pdf"
+    parts = [
+        (
+            f"--{boundary}\r\n"
+            "Content-Type: application/json\r\n\r\n"
+        ).encode() + json.dumps(result).encode() + b"\r\n",
+        (
+            f"--{boundary}\r\n"
+            "Content-Type: application/pdf\r\n"
+            f'Content-Disposition: attachment; filename="{filename}"\r\n'
+            f"Content-Length: {len(pdf_data)}\r\n\r\n"
+        ).encode(),
+        memoryview(pdf_data),
+        f"\r\n--{boundary}--\r\n".encode()
+    ]
+
+    async def body():
+        for part in parts:
+            yield part
+
+    return StreamingResponse(body(), media_type=f"multipart/mixed; boundary={boundary}", headers={
+        "Content-Length": str(sum(len(part) for part in parts)),
+        "ETag": result['pdf_etag']
+    })
+
+async def _read_optimization_request(
+    request: Request,
+    resume: UploadFile,
+    job_url: str,
+    job_description: str
+) -> OptimizationRequest:
+    """Validate the caller and form fields and read the upload"""
+    user_id = request.headers.get('X-User-Id')
+    if not user_id:
+        raise HTTPException(status_code=401, detail="User ID is required")
+
+    logger.debug("Processing resume optimization request")
+    if not resume:
+        raise HTTPException(status_code=400, detail="No resume file provided")
+
+    if not resume.filename:
+        raise HTTPException(status_code=400, detail="No resume file selected")
+
+    if not (job_url and 'linkedin.com' in job_url) and not job_description:
+        raise HTTPException(status_code=400, detail="Please provide either a job URL or description")
+
+    # The upload is closed once the handler returns, so spool it into a file we own
+    resume_file = await upload_ingestor.ingest(resume)
+
+    return OptimizationRequest(
+        user_id=user_id,
+        filename=resume.filename,
+        resume_file=resume_file,
+        job_url=job_url,
+        job_description=job_description
+    )
+
+async def _reserve_credit(optimization_request: OptimizationRequest):
+    """
+    Reserve the request's credit. The pipeline commits it once the result is
+    stored and refunds it if the optimization fails.
+    """
+    try:
+        # One atomic conditional decrement; raises 403 when the balance is empty
+        optimization_request.credit_reservation = await credit_ledger.reserve(optimization_request.user_id)
+    except BaseException:
+        optimization_request.resume_file.close()
+        raise
 
 @router.post("/api/optimize")
 async def optimize_resume(
     request: Request,
     resume: UploadFile = Form(...),
     job_url: str = Form(None),
-    job_description: str = Form(None)
+    job_description: str = Form(None),
+    mode: str = Form('sync'),
+    response_format: str = Form('json')
 ):
+    """
+    Optimize an uploaded resume. `response_format` decides how the PDF comes back
+    in sync mode: 'json' embeds it base64-encoded in `pdf_data` (legacy), 'url'
+    only returns `pdf_url` for a cached, ETag-aware download, and 'multipart'
+    streams the JSON result and the raw PDF as a multipart/mixed body.
+    """
     try:
-        user_id = request.headers.get('X-User-Id')
-        if not user_id:
-            raise HTTPException(status_code=401, detail="User ID is required")
-
-        # Check credits and subscription
-        has_credits, credits_or_error = check_user_credits(user_id)
-        if not has_credits:
-            raise HTTPException(status_code=403, detail=credits_or_error)
-
-        # Store credits for deduction later if not enterprise user
-        credits_remaining = credits_or_error if isinstance(credits_or_error, int) else None
-
-        print(f"Processing resume optimization request")
-        if not resume:
-            raise HTTPException(status_code=400, detail="No resume file provided")
-        
-        if not resume.filename:
-            raise HTTPException(status_code=400, detail="No resume file selected")
-
-        # Get job details
-        if job_url and 'linkedin.com' in job_url:
+        if response_format not in RESPONSE_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unknown response format: {response_format}")
+
+        optimization_request = await _read_optimization_request(request, resume, job_url, job_description)
+        await _reserve_credit(optimization_request)
+        user_id = optimization_request.user_id
+
+        if mode != 'async':
+            result = await run_optimization(optimization_request, include_pdf=response_format != 'url')
+            if response_format == 'multipart':
+                pdf_data = result.pop('pdf_data')
+                return _multipart_response(result, pdf_data)
+            if response_format == 'json':
+                result['pdf_data'] = base64.b64encode(result['pdf_data']).decode('utf-8')
+            return JSONResponse(content=result)
+
+        # Job-submission mode: the resume row doubles as the job record
+        try:
+            resume_id = await run_blocking(create_processing_resume, optimization_request)
+        except Exception:
+            optimization_request.resume_file.close()
+            await release_credit(optimization_request)
+            raise
+
+        async def runner(job):
+            async def progress(stage, percent):
+                await optimization_queue.update(job, stage, percent)
             try:
-                scraper = JobScraper()
-                job_details = scraper.extract_job_details(job_url)
-                if job_details:
-                    job_title = job_details.get('job_title')
-                    company = job_details.get('company')
-                    job_description = job_details.get('job_description')
-            except Exception as e:
-                print(f"Error extracting job details: {str(e)}")
-        elif job_description:
-            print(f"Processing with job description only")
-            job_title = None
-            company = None
-        else:
-            raise HTTPException(status_code=400, detail="Please provide either a job URL or description")
-
-        # Extract text from PDF
-        pdf_generator = PDFGenerator()
-        resume_text = await pdf_generator.extract_text_from_pdf(resume)
-        if not resume_text:
-            raise HTTPException(status_code=400, detail="Failed to extract text from PDF")
-
-        # Get optimization suggestions
+                return await run_optimization(optimization_request, resume_id=resume_id, progress=progress)
+            except Exception:
+                await run_blocking(mark_resume_failed, resume_id, user_id)
+                raise
+
         try:
-            openai_optimizer = OpenAIOptimizer()
-            optimization_result = openai_optimizer.generate_with_openai(job_title, company, resume_text, job_description)
-
-            # Split the result into resume content and analysis
-            resume_content, analysis = openai_optimizer.split_ai_response(optimization_result)
-
-            cover_letter = openai_optimizer.generate_cover_letter(resume_text, job_description, job_title, company)
-
-            # Create PDF from optimized resume content only
-            pdf_data = pdf_generator.create_pdf_from_text(resume_content)
-
-            # Convert PDF data to base64 for response
-            pdf_base64 = base64.b64encode(pdf_data).decode('utf-8')
-
-            # Generate safe filename
-            safe_filename = re.sub(r'[^a-zA-Z0-9.-]', '_', resume.filename)
-            filename = f"{int(time.time())}_{safe_filename}"
-
-            # Store the resume content in the resumes table
-            resume_data = {
-                'user_id': user_id,
-                'title': safe_filename,
-                'job_url': job_url,
-                'content': resume_content,
-                'analysis': analysis,
-                'cover_letter': cover_letter,
-                'status': 'completed'
-            }
-
-            resume_result = supabase \
-                .table('resumes') \
-                .insert(resume_data) \
-                .execute()
-
-            if not resume_result.data:
-                raise Exception("Failed to create resume record")
-
-            resume_id = resume_result.data[0]['id']
-
-            # Create job application if we have job details
-            if job_description:
-                try:
-                    job_data = {
-                        'user_id': user_id,
-                        'resume_id': resume_id,
-                        'job_title': job_title or 'Untitled Position',
-                        'company': company or 'Unknown Company',
-                        'job_description': job_description,
-                        'job_url': job_url,
-                        'status': 'pending'
-                    }
-
-                    job_result = supabase \
-                        .table('job_applications') \
-                        .insert(job_data) \
-                        .execute()
-
-                except Exception as job_error:
-                    print(f"Error creating job application: {str(job_error)}")
-            else:
-                print(f"Skipping job application - missing required fields:", {
-                    'has_url': bool(job_url),
-                    'has_title': bool(job_title),
-                    'has_company': bool(company)
-                })
-
-            # Since optimization was successful, deduct one credit if not enterprise user
-            if credits_remaining is not None:
-                supabase.table('usage_credits').update({
-                    'credits_remaining': credits_remaining - 1,
-                    'updated_at': datetime.datetime.utcnow().isoformat()
-                }).eq('user_id', user_id).execute()
-
-            # Return success response with base64 PDF data and resume details
-            return JSONResponse(content={
-                'success': True,
-                'pdf_data': pdf_base64,
-                'analysis': analysis,
-                'resume_id': resume_id,
-                'title': safe_filename,
-                'created_at': datetime.datetime.now().isoformat(),
-                'job_url': job_url,
-                'status': 'completed'
-            })
+            optimization_queue.submit(resume_id, user_id, runner)
+        except QueueFullError:
+            optimization_request.resume_file.close()
+            await release_credit(optimization_request)
+            await run_blocking(mark_resume_failed, resume_id, user_id)
+            return JSONResponse(
+                status_code=503,
+                content={"error": "Optimization queue is full, please retry shortly"},
+                headers={"Retry-After": "30"}
+            )
 
-        except Exception as e:
-            print(f"Error in optimization process: {str(e)}")
-            logger.error(f"Error in optimization process: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Optimization failed: {str(e)}")
+        return JSONResponse(status_code=202, content={
+            'success': True,
+            'job_id': resume_id,
+            'resume_id': resume_id,
+            'status': 'processing',
+            'status_url': f"/api/optimize/{resume_id}",
+            'events_url': f"/api/optimize/{resume_id}/events"
+        })
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error processing request: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-app.include_router(router)
+@router.get("/api/optimize/{job_id}")
+async def get_optimization_status(job_id: str, request: Request):
+    user_id = request.headers.get('X-User-Id')
+    if not user_id:
+        raise HTTPException(status_code=401, detail="User ID is required")
+
+    job = optimization_queue.get(job_id)
+    if job:
+        if job.user_id != user_id:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return JSONResponse(content=job.to_dict())
+
+    # Fall back to the resume row, e.g. after a restart or on another worker
+    try:
+        response = await supabase.execute(
+            supabase.table('resumes')
+            .select('id, status, created_at')
+            .eq('id', job_id)
+            .eq('user_id', user_id)
+        )
+    except Exception as e:
+        logger.error(f"Error fetching optimization status: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    resume = response.data[0]
+    return JSONResponse(content={
+        'job_id': job_id,
+        'status': resume.get('status'),
+        'stage': resume.get('status'),
+        'progress': 100 if resume.get('status') == 'completed' else None,
+        'resume_id': resume.get('id')
+    })
+
+@router.get("/api/optimize/{job_id}/events")
+async def stream_optimization_status(job_id: str, request: Request):
+    user_id = request.headers.get('X-User-Id')
+    if not user_id:
+        raise HTTPException(status_code=401, detail="User ID is required")
+
+    job = optimization_queue.get(job_id)
+    if not job or job.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        async for snapshot in optimization_queue.watch(job):
+            if await request.is_disconnected():
+                break
+            yield _sse(snapshot['status'], snapshot)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+@router.post("/api/optimize/stream")
+async def optimize_resume_stream(
+    request: Request,
+    resume: UploadFile = Form(...),
+    job_url: str = Form(None),
+    job_description: str = Form(None)
+):
+    """
+    Stream the optimized resume and analysis as Server-Sent Events. The credit
+    is reserved before the stream starts, so an empty balance is still a 403.
+    """
+    optimization_request = await _read_optimization_request(request, resume, job_url, job_description)
+    await _reserve_credit(optimization_request)
+
+    async def settle():
+        # No-ops once the pipeline has committed the credit and closed the upload
+        await release_credit(optimization_request)
+        optimization_request.resume_file.close()
+
+    async def event_stream():
+        try:
+            async for event, payload in stream_optimization(optimization_request):
+                yield _sse(event, payload)
+        except HTTPException as e:
+            yield _sse('error', {'error': e.detail, 'status': e.status_code})
+        except Exception as e:
+            logger.error(f"Error streaming optimization: {str(e)}")
+            yield _sse('error', {'error': f"Optimization failed: {str(e)}"})
+
+    return SettlingStreamingResponse(event_stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    }, background=BackgroundTask(settle))
@@ -1,32 +1,54 @@
 from fastapi import FastAPI, Request, HTTPException, APIRouter
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from supabase import create_client, Client
 import os
 from services.supabase_client import supabase
-from services.pdf_generator import PDFGenerator
+from services.blocking_io import run_blocking
+from services.pdf_render_service import pdf_renderer
+from services.pdf_templates import template_registry
+from services.pagination import keyset_page, page_response, page_size, project_fields
 from loguru import logger
 from io import BytesIO
 from dotenv import load_dotenv
 
-# Initialize Supabase client
-supabase_url = os.getenv('SUPABASE_URL')
-supabase_key = os.getenv('SUPABASE_KEY')
-supabase: Client = create_client(supabase_url, supabase_key)
 load_dotenv()
 
 router = APIRouter()
 
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in if_none_match.split(','))
+
+async def _cached_pdf_response(request: Request, kind: str, text: str, filename: str, theme: str = None) -> Response:
+    """Serve a rendered PDF from the cache, or a 304 when the client already has it"""
+    etag = pdf_renderer.etag(kind, text, theme)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get('If-None-Match'), etag):
+        return Response(status_code=304, headers=headers)
+
+    pdf_data, _ = await pdf_renderer.render_cached(kind, text, theme)
+    headers["Content-Disposition"] = f'attachment; filename="{filename}.pdf"'
+    return Response(content=pdf_data, media_type="application/pdf", headers=headers)
+
+@router.get("/api/pdf-themes")
+async def get_pdf_themes():
+    return JSONResponse(content=template_registry.themes())
+
 @router.get("/api/test-pdf")
 async def test_pdf():
     try:
         test_content = "Test Resume\n\nSection 1\nThis is a test."
-        pdf_generator = PDFGenerator()
-        pdf_data = pdf_generator.create_pdf_from_text(test_content)
+        pdf_data = await pdf_renderer.render_resume(test_content)
         
         return StreamingResponse(BytesIO(pdf_data), media_type="application/pdf", headers={
             "Content-Disposition": 'attachment; filename="test.pdf"'
         })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -37,11 +59,12 @@ async def download_cover_letter(resume_id: str, request: Request):
         if not user_id:
             raise HTTPException(status_code=401, detail="Missing X-User-Id header")
 
-        response = supabase.table('resumes')\
-            .select('cover_letter, title')\
-            .eq('id', resume_id)\
-            .eq('user_id', user_id)\
-            .execute()
+        response = await supabase.execute(
+            supabase.table('resumes')
+            .select('cover_letter, title')
+            .eq('id', resume_id)
+            .eq('user_id', user_id)
+        )
 
         if not response.data:
             raise HTTPException(status_code=404, detail="Resume not found or not authorized")
@@ -50,55 +73,92 @@ async def download_cover_letter(resume_id: str, request: Request):
         if not cover_letter:
             raise HTTPException(status_code=404, detail="Cover letter not found")
 
-        pdf_generator = PDFGenerator()
-        pdf_data = pdf_generator.create_cover_letter_pdf(cover_letter)
-
         filename = f"cover_letter_{response.data[0].get('title', 'document')}"
-        return StreamingResponse(BytesIO(pdf_data), media_type="application/pdf", headers={
-            "Content-Disposition": f'attachment; filename="{filename}.pdf"'
-        })
+        return await _cached_pdf_response(request, 'cover_letter', cover_letter, filename)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating cover letter PDF: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Column sets for the resume list; the generated text columns are only sent when asked for
+RESUME_VIEWS = {
+    'summary': ('id', 'user_id', 'title', 'job_url', 'status', 'created_at', 'optimized_pdf_url'),
+    'full': ('id', 'user_id', 'title', 'job_url', 'status', 'created_at', 'optimized_pdf_url',
+             'analysis', 'content', 'cover_letter', 'cover_letter_pdf_url')
+}
+
 @router.get("/api/resumes")
-async def get_resumes(request: Request, limit: int = None):
+async def get_resumes(request: Request, limit: int = None, cursor: str = None,
+                      fields: str = None, view: str = 'summary'):
+    """
+    The user's resumes, newest first, one page at a time. Pass the X-Next-Cursor
+    response header back as `cursor` for the next page. Only the summary columns
+    are returned unless `view=full` or an explicit `fields` list asks for more.
+    """
     try:
         print("Getting resumes")
         user_id = request.headers.get('X-User-Id')
         if not user_id:
             raise HTTPException(status_code=401, detail="Missing X-User-Id header")
 
+        size = page_size(limit)
         query = supabase.table('resumes')\
-            .select('*')\
-            .eq('user_id', user_id)\
-            .order('created_at', desc=True)
-            
-        if limit:
-            query = query.limit(limit)
+            .select(','.join(project_fields(fields, RESUME_VIEWS, view)))\
+            .eq('user_id', user_id)
 
-        response = query.execute()
+        response = await supabase.execute(keyset_page(query, cursor, size))
+        return page_response(response.data or [], size)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/api/resumes/{resume_id}")
+async def get_resume(resume_id: str, request: Request, fields: str = None, view: str = 'full'):
+    """
+    One resume, for the columns the list leaves out (e.g. `fields=analysis` when
+    the analysis is opened). Every column unless `fields` or `view` narrows it.
+    """
+    try:
+        user_id = request.headers.get('X-User-Id')
+        if not user_id:
+            raise HTTPException(status_code=401, detail="Missing X-User-Id header")
+
+        response = await supabase.execute(
+            supabase.table('resumes')
+            .select(','.join(project_fields(fields, RESUME_VIEWS, view)))
+            .eq('id', resume_id)
+            .eq('user_id', user_id)
+        )
 
         if not response.data:
-            return JSONResponse(content=[])
+            raise HTTPException(status_code=404, detail="Resume not found or not authorized")
 
-        return JSONResponse(content=response.data)
+        return JSONResponse(content=response.data[0])
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/api/resumes/{resume_id}/download")
-async def download_resume(resume_id: str, request: Request):
+async def download_resume(resume_id: str, request: Request, theme: str = None):
     try:
         user_id = request.headers.get('X-User-Id')
         if not user_id:
             raise HTTPException(status_code=401, detail="Missing X-User-Id header")
 
-        response = supabase.table('resumes')\
-            .select('content, title')\
-            .eq('id', resume_id)\
-            .eq('user_id', user_id)\
-            .execute()
+        if theme and not template_registry.has_theme(theme):
+            raise HTTPException(status_code=400, detail=f"Unknown theme: {theme}")
+
+        response = await supabase.execute(
+            supabase.table('resumes')
+            .select('content, title')
+            .eq('id', resume_id)
+            .eq('user_id', user_id)
+        )
 
         if not response.data:
             raise HTTPException(status_code=404, detail="Resume not found or not authorized")
@@ -107,13 +167,10 @@ async def download_resume(resume_id: str, request: Request):
         if not resume_content:
             raise HTTPException(status_code=404, detail="Resume content not found")
 
-        pdf_generator = PDFGenerator()
-        pdf_data = pdf_generator.create_pdf_from_text(resume_content)
-
         filename = f"resume_{response.data[0].get('title', 'document')}"
-        return StreamingResponse(BytesIO(pdf_data), media_type="application/pdf", headers={
-            "Content-Disposition": f'attachment; filename="{filename}.pdf"'
-        })
+        return await _cached_pdf_response(request, 'resume', resume_content, filename, theme)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating resume PDF: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -125,11 +182,12 @@ async def delete_resume(resume_id: str, request: Request):
         if not user_id:
             raise HTTPException(status_code=401, detail="Missing X-User-Id header")
 
-        response = supabase.table('resumes')\
-            .select('optimized_pdf_url')\
-            .eq('id', resume_id)\
-            .eq('user_id', user_id)\
-            .execute()
+        response = await supabase.execute(
+            supabase.table('resumes')
+            .select('optimized_pdf_url')
+            .eq('id', resume_id)
+            .eq('user_id', user_id)
+        )
 
         if not response.data:
             raise HTTPException(status_code=404, detail="Resume not found or not authorized")
@@ -138,15 +196,16 @@ async def delete_resume(resume_id: str, request: Request):
         if optimized_pdf_url:
             try:
                 file_path = optimized_pdf_url.split('/resumes/')[1].split('?')[0]
-                supabase.storage.from_('resumes').remove([file_path])
+                await run_blocking(supabase.storage.from_('resumes').remove, [file_path])
             except Exception as e:
                 logger.warning(f"Warning: Failed to delete file from storage: {str(e)}")
 
-        supabase.table('resumes')\
-            .delete()\
-            .eq('id', resume_id)\
-            .eq('user_id', user_id)\
-            .execute()
+        await supabase.execute(
+            supabase.table('resumes')
+            .delete()
+            .eq('id', resume_id)
+            .eq('user_id', user_id)
+        )
 
         return JSONResponse(content={"success": True})
     except Exception as e:
@@ -1,24 +1,58 @@
-from fastapi import FastAPI, HTTPException, APIRouter
-from pydantic import BaseModel
+from fastapi import HTTPException, APIRouter
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Annotated, List
+import json
+import os
 from services.linkedin_batch_scraper import LinkedInJobScraper
+from services.http_client import scraping_client
 
-app = FastAPI()
+# Every query and every job is at least one LinkedIn request, so a scrape is bounded
+SCRAPE_MAX_QUERIES = int(os.getenv('SCRAPE_MAX_QUERIES', '10'))
+SCRAPE_MAX_JOBS = int(os.getenv('SCRAPE_MAX_JOBS', '100'))
 
 class ScrapeJobsRequest(BaseModel):
-    search_queries: list
-    max_jobs: int = 25
+    search_queries: List[Annotated[str, Field(min_length=1, max_length=200)]] = Field(..., max_length=SCRAPE_MAX_QUERIES)
+    max_jobs: int = Field(25, ge=1, le=SCRAPE_MAX_JOBS)
+    stream: bool = False
 
 class ScrapeJobUrlRequest(BaseModel):
     job_url: str
 
 router = APIRouter(tags=["scrape-jobs"])
 
-@app.post("/scrape-jobs")
+@router.post("/scrape-jobs")
 async def scrape_jobs(request: ScrapeJobsRequest):
-    """Endpoint to scrape jobs from LinkedIn based on search criteria"""
+    """
+    Endpoint to scrape jobs from LinkedIn based on search criteria.
+
+    With `stream: true` jobs are sent as newline-delimited JSON as soon as
+    each one is scraped, followed by a final `{"done": true, "count": n}` line.
+    """
+    if not request.search_queries:
+        raise HTTPException(status_code=400, detail="At least one search query is required")
+
+    scraper = LinkedInJobScraper()
+
+    if request.stream:
+        async def job_stream():
+            count = 0
+            try:
+                async for job in scraper.iter_jobs(request.search_queries, request.max_jobs):
+                    count += 1
+                    yield json.dumps({"job": job}) + "\n"
+                yield json.dumps({"done": True, "count": count}) + "\n"
+            except Exception as e:
+                print(f"Error: {str(e)}")
+                yield json.dumps({"error": str(e), "count": count}) + "\n"
+
+        return StreamingResponse(job_stream(), media_type="application/x-ndjson", headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        })
+
     try:
-        scraper = LinkedInJobScraper()
-        jobs = scraper.scrape_jobs(request.search_queries, request.max_jobs)
+        jobs = await scraper.scrape_jobs(request.search_queries, request.max_jobs)
 
         return {
             "success": True,
@@ -31,12 +65,12 @@ async def scrape_jobs(request: ScrapeJobsRequest):
         print(f"Error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/scrape-job-url")
+@router.post("/scrape-job-url")
 async def scrape_job_url(request: ScrapeJobUrlRequest):
     """Endpoint to scrape a job from a specific LinkedIn URL"""
     try:
         scraper = LinkedInJobScraper()
-        job_details = scraper.scrape_job_by_url(request.job_url)
+        job_details = await scraping_client.run(scraper.scrape_job_by_url, request.job_url)
 
         if job_details is None:
             raise HTTPException(status_code=404, detail="Failed to scrape job details")
@@ -45,6 +79,8 @@ async def scrape_job_url(request: ScrapeJobUrlRequest):
             "success": True,
             "data": job_details
         }
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,26 +1,45 @@
 from fastapi import FastAPI, APIRouter, Request, HTTPException, Depends
 from fastapi.responses import JSONResponse
-from supabase import create_client, Client
+from services.supabase_client import supabase
+from services.credit_ledger import credit_ledger
+from services.account_cache import account_cache
+from services.paypal_client import PayPalError, paypal_client
 import os
-import base64
 from dotenv import load_dotenv
 import openai
-import requests
 import json
 import datetime
+import httpx
+from loguru import logger
 from fastapi.middleware.cors import CORSMiddleware
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Supabase client
-supabase_url = os.getenv('SUPABASE_URL')
-supabase_key = os.getenv('SUPABASE_KEY')
-supabase: Client = create_client(supabase_url, supabase_key)
-
 # Create a router for subscription routes
 router = APIRouter()
 
+# Credits granted when subscribing to each plan
+PLAN_CREDITS = {
+    'pro': 50,
+    'yearly': 9999,
+    'enterprise': 999999
+}
+
+async def _load_credits(user_id: str) -> int:
+    credits_response = await supabase.execute(supabase.table('usage_credits').select('credits_remaining').eq('user_id', user_id))
+    if len(credits_response.data) == 0:
+        # Create initial credits for user if not exists
+        await supabase.execute(supabase.table('usage_credits').insert({
+            'user_id': user_id,
+            'credits_remaining': 2,
+            'created_at': datetime.datetime.utcnow().isoformat(),
+            'updated_at': datetime.datetime.utcnow().isoformat()
+        }))
+        return 2
+
+    return credits_response.data[0]['credits_remaining']
+
 @router.get('/api/credits')
 async def get_user_credits(request: Request):
     """Get user's current credit balance"""
@@ -29,18 +48,9 @@ async def get_user_credits(request: Request):
         if not user_id:
             raise HTTPException(status_code=401, detail="User ID is required")
 
-        credits_response = supabase.table('usage_credits').select('credits_remaining').eq('user_id', user_id).execute()
-        if len(credits_response.data) == 0:
-            # Create initial credits for user if not exists
-            supabase.table('usage_credits').insert({
-                'user_id': user_id,
-                'credits_remaining': 2,
-                'created_at': datetime.datetime.utcnow().isoformat(),
-                'updated_at': datetime.datetime.utcnow().isoformat()
-            }).execute()
-            return {"credits": 2}
-
-        return {"credits": credits_response.data[0]['credits_remaining']}
+        # Polled by the frontend; served from memory between ledger updates
+        credits = await account_cache.get('credits', user_id, lambda: _load_credits(user_id))
+        return {"credits": credits}
 
     except Exception as e:
         print(f"Error getting user credits: {str(e)}")
@@ -55,17 +65,18 @@ async def initialize_credits(request: Request):
             raise HTTPException(status_code=401, detail="User ID is required")
 
         # Check if user already has credits
-        credits_response = supabase.table('usage_credits').select('credits_remaining').eq('user_id', user_id).execute()
+        credits_response = await supabase.execute(supabase.table('usage_credits').select('credits_remaining').eq('user_id', user_id))
         if len(credits_response.data) > 0:
             raise HTTPException(status_code=400, detail="Credits already initialized for this user")
 
         # Initialize credits for new user
-        supabase.table('usage_credits').insert({
+        await supabase.execute(supabase.table('usage_credits').insert({
             'user_id': user_id,
             'credits_remaining': 2,
             'created_at': datetime.datetime.utcnow().isoformat(),
             'updated_at': datetime.datetime.utcnow().isoformat()
-        }).execute()
+        }))
+        account_cache.update('credits', user_id, 2)
 
         return {
             "success": True,
@@ -94,25 +105,9 @@ async def purchase_credits(request: Request):
             raise HTTPException(status_code=400, detail=f"Minimum credit purchase is {min_credits}")
         credits = requested_credits
 
-        # Get current credits
-        credits_response = supabase.table('usage_credits').select('credits_remaining').eq('user_id', user_id).execute()
-        print("Credits response:", credits_response)
-
-        if not credits_response.data:
-            # Create new record if it doesn't exist
-            new_credits = credits
-            supabase.table('usage_credits').insert({
-                'user_id': user_id,
-                'credits_remaining': new_credits
-            }).execute()
-        else:
-            # Update existing record
-            current_credits = credits_response.data[0]['credits_remaining']
-            new_credits = current_credits + credits
-            print(f"Updating credits from {current_credits} to {new_credits}")
-            supabase.table('usage_credits').update({
-                'credits_remaining': new_credits
-            }).eq('user_id', user_id).execute()
+        # Atomic increment; creates the balance row for first-time buyers
+        new_credits = await credit_ledger.add(user_id, credits)
+        logger.info(f"Added {credits} credits for user {user_id}")
 
         return {
             "success": True,
@@ -124,6 +119,36 @@ async def purchase_credits(request: Request):
         print(f"Error purchasing credits: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to purchase credits")
 
+async def _load_subscription(user_id: str) -> dict:
+    # Get subscription from Supabase - now without status filter
+    subscription_response = await supabase.execute(
+        supabase.table('subscriptions')
+        .select('*')
+        .eq('user_id', user_id)
+        .order('created_at', desc=True)
+        .limit(1)
+    )
+
+    # If no subscription found at all, return early
+    if not subscription_response.data or len(subscription_response.data) == 0:
+        return {
+            "has_subscription": False,
+            "subscription": None
+        }
+
+    # Get the subscription data. Its PayPal state is kept current by the webhook
+    # and the reconciler (services/paypal_subscription_sync.py), so reads never call PayPal
+    subscription = subscription_response.data[0]
+    paypal_subscription = subscription.pop('paypal_resource', None)
+
+    response = {
+        "has_subscription": subscription.get('status') == 'active',
+        "subscription": subscription
+    }
+    if paypal_subscription:
+        response["paypal_subscription"] = paypal_subscription
+    return response
+
 @router.get('/api/subscriptions')
 async def get_subscription(request: Request):
     """Get user's current subscription status"""
@@ -132,79 +157,8 @@ async def get_subscription(request: Request):
         if not user_id:
             raise HTTPException(status_code=401, detail="User ID is required")
 
-        # Get subscription from Supabase - now without status filter
-        subscription_response = supabase.table('subscriptions')\
-            .select('*')\
-            .eq('user_id', user_id)\
-            .order('created_at', desc=True)\
-            .limit(1)\
-            .execute()
-
-        # If no subscription found at all, return early
-        if not subscription_response.data or len(subscription_response.data) == 0:
-            return {
-                "has_subscription": False,
-                "subscription": None
-            }
-
-        # Get the subscription data
-        subscription = subscription_response.data[0]
-        paypal_subscription_id = subscription.get('paypal_subscription_id')
-
-        # If no PayPal subscription ID, return just the Supabase data
-        if not paypal_subscription_id:
-            return {
-                "has_subscription": subscription.get('status') == 'active',
-                "subscription": subscription
-            }
-
-        # Check PayPal status only if subscription was active
-        if subscription.get('status') == 'active':
-            access_token = generate_paypal_token()
-            if not access_token:
-                raise HTTPException(status_code=500, detail="Failed to generate Paypal access token")
-
-            url = f"{os.getenv('PAYPAL_API_URL')}/v1/billing/subscriptions/{paypal_subscription_id}"
-            headers = {
-                'Content-Type': 'application/json',
-                'Accept': 'application/json',
-                'Authorization': f'Bearer {access_token}'
-            }
-            
-            response = requests.get(url, headers=headers)
-
-            if response.status_code == 200:
-                paypal_status = response.json().get('status', '').lower()
-                
-                # If cancelled in PayPal but active in Supabase, update Supabase
-                if paypal_status in ['cancelled', 'suspended', 'expired']:
-                    now = datetime.datetime.utcnow()
-                    supabase.table('subscriptions')\
-                        .update({
-                            'status': paypal_status,
-                            'updated_at': now.isoformat(),
-                            'cancelled_at': now.isoformat()
-                        })\
-                        .eq('id', subscription.get('id'))\
-                        .execute()
-
-                    return {
-                        "has_subscription": False,
-                        "subscription": subscription,
-                        "paypal_subscription": response.json()
-                    }
-
-            return {
-                "has_subscription": True,
-                "subscription": subscription,
-                "paypal_subscription": response.json()
-            }
-        
-        # For inactive subscriptions, just return the data without PayPal check
-        return {
-            "has_subscription": False,
-            "subscription": subscription
-        }
+        # Hit on every billing page view; create, cancel and webhooks invalidate the entry
+        return await account_cache.get('subscription', user_id, lambda: _load_subscription(user_id))
 
     except Exception as e:
         print(f"Error getting subscription: {str(e)}")
@@ -228,11 +182,12 @@ async def create_subscription(request: Request):
         plan_type = data['plan_type']
         
         # Cancel any existing active subscriptions
-        supabase.table('subscriptions')\
-            .update({'status': 'cancelled'})\
-            .eq('user_id', user_id)\
-            .eq('status', 'active')\
-            .execute()
+        await supabase.execute(
+            supabase.table('subscriptions')
+            .update({'status': 'cancelled'})
+            .eq('user_id', user_id)
+            .eq('status', 'active')
+        )
 
         # Create new subscription
         now = datetime.datetime.utcnow()
@@ -247,33 +202,14 @@ async def create_subscription(request: Request):
             'updated_at': now.isoformat()
         }
 
-        subscription_result = supabase.table('subscriptions')\
-            .insert(subscription_data)\
-            .execute()
-
-        # Update user credits based on plan
-        credits = supabase.table('usage_credits').select('credits_remaining').eq('user_id', user_id).execute()
-        if plan_type == 'pro':
-            credits = credits.data[0]['credits_remaining'] + 50
-        elif plan_type == 'yearly':
-            credits = credits.data[0]['credits_remaining'] + 9999
-        elif plan_type == 'enterprise':
-            credits = credits.data[0]['credits_remaining'] + 999999
-
-        # Update or create credits
-        credits_response = supabase.table('usage_credits').select('*').eq('user_id', user_id).execute()
-        if len(credits_response.data) == 0:
-            supabase.table('usage_credits').insert({
-                'user_id': user_id,
-                'credits_remaining': credits,
-                'created_at': now.isoformat(),
-                'updated_at': now.isoformat()
-            }).execute()
-        else:
-            supabase.table('usage_credits').update({
-                'credits_remaining': credits,
-                'updated_at': now.isoformat()
-            }).eq('user_id', user_id).execute()
+        subscription_result = await supabase.execute(
+            supabase.table('subscriptions')
+            .insert(subscription_data)
+        )
+        account_cache.invalidate('subscription', user_id)
+
+        # Grant the plan's credits on top of the current balance in one atomic step
+        credits = await credit_ledger.add(user_id, PLAN_CREDITS.get(plan_type, 0))
 
         return {
             "success": True,
@@ -286,6 +222,21 @@ async def create_subscription(request: Request):
         print(f"Error creating subscription: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to create subscription")
 
+async def _call_paypal(action: str, call):
+    """Await a PayPal API call, reporting token and network failures as a 502"""
+    try:
+        return await call
+    except PayPalError as e:
+        raise HTTPException(status_code=502, detail=f"Could not authenticate with PayPal to {action}: {str(e)}")
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"PayPal did not respond while trying to {action}: {type(e).__name__}")
+
+def _paypal_status_error(action: str, response: httpx.Response) -> HTTPException:
+    """A subscription PayPal does not know is a 404; any other PayPal error response is a 502"""
+    if response.status_code == 404:
+        return HTTPException(status_code=404, detail="Subscription not found in PayPal")
+    return HTTPException(status_code=502, detail=f"PayPal returned {response.status_code} while trying to {action}")
+
 @router.post('/api/cancel-subscription')
 async def cancel_subscription(request: Request):
     """Cancel user subscription"""
@@ -295,11 +246,12 @@ async def cancel_subscription(request: Request):
             raise HTTPException(status_code=401, detail="User ID is required")
 
         # Get the active subscription for the user
-        subscription_result = supabase.table('subscriptions')\
-            .select('*')\
-            .eq('user_id', user_id)\
-            .eq('status', 'active')\
-            .execute()
+        subscription_result = await supabase.execute(
+            supabase.table('subscriptions')
+            .select('*')
+            .eq('user_id', user_id)
+            .eq('status', 'active')
+        )
 
         if not subscription_result.data:
             raise HTTPException(status_code=404, detail="No active subscription found")
@@ -314,102 +266,69 @@ async def cancel_subscription(request: Request):
         if not paypal_subscription_id:
             raise HTTPException(status_code=400, detail="No PayPal subscription ID found")
 
-        # Generate PayPal access token
-        try:
-            access_token = generate_paypal_token()
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to generate PayPal token: {str(e)}")
+        # First check subscription status in PayPal (the app token is cached across calls)
+        status_response = await _call_paypal(
+            "fetch the subscription", paypal_client.get_subscription(paypal_subscription_id)
+        )
+        logger.debug(f"PayPal subscription {paypal_subscription_id} lookup returned {status_response.status_code}")
+        if status_response.status_code != 200:
+            raise _paypal_status_error("fetch the subscription", status_response)
 
-        # First check subscription status in PayPal
-        status_url = f"{os.getenv('PAYPAL_API_URL')}/v1/billing/subscriptions/{paypal_subscription_id}"
-        headers = {
-            'Content-Type': 'application/json',
-            'Accept': 'application/json',
-            'Authorization': f'Bearer {access_token}'
-        }
+        paypal_status = status_response.json().get('status', '').lower()
+        
+        # If already cancelled in PayPal, just update Supabase
+        if paypal_status in ['cancelled', 'suspended', 'expired']:
+            now = datetime.datetime.utcnow()
+            await supabase.execute(
+                supabase.table('subscriptions')
+                .update({
+                    'status': 'cancelled',
+                    'updated_at': now.isoformat(),
+                    'cancelled_at': now.isoformat()
+                })
+                .eq('id', subscription_id)
+            )
+            account_cache.invalidate('subscription', user_id)
 
-        status_response = requests.get(status_url, headers=headers)
-        print("PayPal Status Response:", status_response.json())
-
-        if status_response.status_code == 200:
-            paypal_status = status_response.json().get('status', '').lower()
-            
-            # If already cancelled in PayPal, just update Supabase
-            if paypal_status in ['cancelled', 'suspended', 'expired']:
-                now = datetime.datetime.utcnow()
-                supabase.table('subscriptions')\
-                    .update({
-                        'status': 'cancelled',
-                        'updated_at': now.isoformat(),
-                        'cancelled_at': now.isoformat()
-                    })\
-                    .eq('id', subscription_id)\
-                    .execute()
-
-                return {
-                    "success": True,
-                    "message": "Subscription status synchronized with PayPal"
-                }
+            return {
+                "success": True,
+                "message": "Subscription status synchronized with PayPal"
+            }
 
         # If not cancelled, proceed with cancellation
-        cancel_url = f"{os.getenv('PAYPAL_API_URL')}/v1/billing/subscriptions/{paypal_subscription_id}/cancel"
-        cancel_response = requests.post(
-            cancel_url,
-            headers=headers,
-            json={"reason": "Cancelled by user"}
+        cancel_response = await _call_paypal(
+            "cancel the subscription",
+            paypal_client.cancel_subscription(paypal_subscription_id, "Cancelled by user")
         )
-
-        print("PAYPAL REQUEST", cancel_url)
-        print("PAYPAL RESPONSE STATUS", cancel_response.status_code)
-        print("PAYPAL RESPONSE CONTENT", cancel_response.content)
+        logger.debug(f"PayPal cancel of {paypal_subscription_id} returned {cancel_response.status_code}")
 
         if cancel_response.status_code not in [204, 200]:
-            raise HTTPException(status_code=500, detail=f"Failed to cancel PayPal subscription. Status: {cancel_response.status_code}")
+            raise _paypal_status_error("cancel the subscription", cancel_response)
 
         # Update subscription status in Supabase
         now = datetime.datetime.utcnow()
-        supabase.table('subscriptions')\
+        await supabase.execute(
+            supabase.table('subscriptions')
             .update({
                 'status': 'cancelled',
                 'updated_at': now.isoformat(),
                 'cancelled_at': now.isoformat()
-            })\
-            .eq('id', subscription_id)\
-            .execute()
+            })
+            .eq('id', subscription_id)
+        )
+        account_cache.invalidate('subscription', user_id)
 
         return {
             "success": True,
             "message": "Subscription cancelled successfully"
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error cancelling subscription: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-def check_user_credits(user_id):
-    """Check if user has credits in Supabase"""
-    try:
-        credits_response = supabase.table('usage_credits')\
-            .select('credits_remaining')\
-            .eq('user_id', user_id)\
-            .execute()
-            
-        # If no credits record exists or credits <= 0
-        if len(credits_response.data) == 0 or credits_response.data[0]['credits_remaining'] <= 0:
-            return False, {
-                "error": "Insufficient credits",
-                "message": "You have no credits remaining. Please purchase more credits to continue.",
-                "action": "purchase_required",
-                "redirect_url": "/dashboard/billing",
-                "current_credits": credits_response.data[0]['credits_remaining'] if credits_response.data else 0
-            }
-
-        return True, credits_response.data[0]['credits_remaining']
-
-    except Exception as e:
-        print(f"Error checking user credits: {str(e)}")
-        return False, {"error": "Failed to check credits"}
-
 @router.post('/api/create-paypal-subscription')
 async def create_paypal_subscription(request: Request):
     """Create or update user subscription"""
@@ -429,16 +348,11 @@ async def create_paypal_subscription(request: Request):
         subscription_id = data.get('subscription_id')
         if not subscription_id:
             raise HTTPException(status_code=400, detail="subscription_id is required")
-        url = f'{os.getenv("PAYPAL_API_URL")}/v1/billing/subscriptions/{subscription_id}'
-
         if not access_token:
             raise HTTPException(status_code=500, detail="Failed to generate Paypal access token")
         
         headers = {
-            'Content-Type': 'application/json',
-            'Accept': 'application/json',
             'Prefer': 'return=representation',
-            'Authorization': f'Bearer {access_token}',
             'PayPal-Request-Id': 'SUBSCRIPTION-21092019-001',
         }
 
@@ -452,7 +366,11 @@ async def create_paypal_subscription(request: Request):
             }
         }
 
-        response = requests.post(url, headers=headers, json=body)
+        # Made with the buyer's token from the frontend, over the shared connection pool
+        response = await paypal_client.request(
+            'POST', f'/v1/billing/subscriptions/{subscription_id}',
+            access_token=access_token, headers=headers, json=body
+        )
 
         if response.status_code != 201:
             raise HTTPException(status_code=500, detail="Failed to create subscription")
@@ -465,26 +383,3 @@ async def create_paypal_subscription(request: Request):
     except Exception as e:
         print(f"Error creating subscription: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to create subscription")
-
-def generate_paypal_token() -> str:
-    client_id = os.getenv("PAYPAL_CLIENT_ID")
-    client_secret = os.getenv("PAYPAL_CLIENT_SECRET")
-    
-    if not client_id or not client_secret:
-        raise Exception("Missing PayPal client ID or secret in environment variables.")
-    
-    url = os.getenv("PAYPAL_API_URL") + "/v1/oauth2/token"
-    auth_header = base64.b64encode(f"{client_id}:{client_secret}".encode()).decode()
-
-    headers = {
-        "Content-Type": "application/x-www-form-urlencoded",
-        "Authorization": f"Basic {auth_header}",
-    }
-    
-    response = requests.post(url, headers=headers, data="grant_type=client_credentials")
-    
-    if response.status_code == 200:
-        return response.json().get("access_token", "")
-    else:
-        raise Exception(f"Failed to generate token: {response.status_code}, {response.text}")
-
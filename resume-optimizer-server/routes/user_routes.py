@@ -1,16 +1,11 @@
 from fastapi import APIRouter, Header, HTTPException
 from pydantic import BaseModel
 from typing import Optional
-from supabase import create_client, Client
-import os
+from services.supabase_client import supabase
+from services.blocking_io import run_blocking
 
 router = APIRouter()
 
-# Initialize Supabase client
-supabase_url = os.getenv('SUPABASE_URL')
-supabase_key = os.getenv('SUPABASE_KEY')
-supabase: Client = create_client(supabase_url, supabase_key)
-
 class ProfileUpdate(BaseModel):
     full_name: str
 
@@ -24,7 +19,8 @@ async def update_user_profile(
 
     try:
         # Update user metadata in Supabase
-        update_result = supabase.auth.admin.update_user_by_id(
+        update_result = await run_blocking(
+            supabase.auth.admin.update_user_by_id,
             x_user_id,
             {"user_metadata": {"name": profile.full_name}}
         )
@@ -33,7 +29,7 @@ async def update_user_profile(
             raise HTTPException(status_code=500, detail="Failed to update user profile")
 
         # Get updated user data
-        user_response = supabase.auth.admin.get_user_by_id(x_user_id)
+        user_response = await run_blocking(supabase.auth.admin.get_user_by_id, x_user_id)
         if not user_response.user:
             raise HTTPException(status_code=500, detail="Failed to fetch updated user data")
 
@@ -0,0 +1,31 @@
+import json
+
+from fastapi import APIRouter, HTTPException, Request
+from loguru import logger
+
+from services.paypal_subscription_sync import paypal_subscription_sync
+
+router = APIRouter(tags=["webhooks"])
+
+@router.post('/api/webhooks/paypal')
+async def paypal_webhook(request: Request):
+    """
+    PayPal subscription events. The signature is verified with PayPal before
+    anything is applied; a non-2xx answer makes PayPal redeliver the event.
+    """
+    body = await request.body()
+    await paypal_subscription_sync.verify(request.headers, body)
+
+    try:
+        event = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Webhook body is not valid JSON")
+
+    try:
+        outcome = await paypal_subscription_sync.handle_event(event)
+    except Exception as e:
+        logger.error(f"Error handling PayPal webhook {event.get('id')}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to process webhook")
+
+    logger.info(f"PayPal webhook {event.get('id')} ({event.get('event_type')}): {outcome}")
+    return {"received": True, "status": outcome}
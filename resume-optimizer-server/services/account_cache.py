@@ -0,0 +1,113 @@
+import asyncio
+import os
+import threading
+from typing import Any, Awaitable, Callable, Dict
+
+from services.cache import CacheBackend, get_cache_backend
+
+AccountLoader = Callable[[], Awaitable[Any]]
+
+
+class AccountCache:
+    """
+    Short-lived per-user cache for the values the frontend polls: the credit
+    balance and the subscription status.
+
+    Reads go through `get`, which serves the cached value or runs the loader
+    once no matter how many requests for the same user arrive together. Each
+    kind has its own TTL, which bounds how stale another worker's view can be;
+    within this process, writers call `update` with the value they just
+    produced (the credit ledger knows the balance after every change) or
+    `invalidate` it. A load that was overtaken by either is returned to its
+    callers but not cached.
+    """
+
+    def __init__(self, backend: CacheBackend, ttls: Dict[str, float]):
+        self.backend = backend
+        self.ttls = ttls
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._counters = {
+            kind: {'hits': 0, 'coalesced': 0, 'upstream_requests': 0, 'upstream_errors': 0,
+                   'updates': 0, 'invalidations': 0}
+            for kind in ttls
+        }
+
+    @staticmethod
+    def _key(kind: str, user_id: str) -> str:
+        return f"account:{kind}:{user_id}"
+
+    def _count(self, kind: str, counter: str):
+        with self._lock:
+            self._counters[kind][counter] += 1
+
+    async def get(self, kind: str, user_id: str, load: AccountLoader) -> Any:
+        """Cached value of `kind` for the user, calling `load` on a miss"""
+        key = self._key(kind, user_id)
+        value = self.backend.get(key)
+        if value is not None:
+            self._count(kind, 'hits')
+            return value
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._count(kind, 'coalesced')
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting on the future, so mark failures as retrieved
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        self._count(kind, 'upstream_requests')
+        try:
+            value = await load()
+            # Skip the store if an update or invalidation arrived mid-load
+            if self._inflight.get(key) is future and value is not None:
+                self.backend.set(key, value, ttl=self.ttls[kind])
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            self._count(kind, 'upstream_errors')
+            future.set_exception(e)
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def update(self, kind: str, user_id: str, value: Any):
+        """Replace the cached value with one the caller knows to be current"""
+        key = self._key(kind, user_id)
+        self._inflight.pop(key, None)
+        self.backend.set(key, value, ttl=self.ttls[kind])
+        self._count(kind, 'updates')
+
+    def invalidate(self, kind: str, user_id: str):
+        key = self._key(kind, user_id)
+        self._inflight.pop(key, None)
+        self.backend.delete(key)
+        self._count(kind, 'invalidations')
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {}
+            for kind, counters in self._counters.items():
+                reads = counters['hits'] + counters['coalesced'] + counters['upstream_requests']
+                stats[kind] = {
+                    'ttl': self.ttls[kind],
+                    **counters,
+                    'hit_rate': round((counters['hits'] + counters['coalesced']) / reads, 3) if reads else 0.0
+                }
+            stats['store'] = self.backend.stats()
+            return stats
+
+
+account_cache = AccountCache(
+    get_cache_backend('memory', max_entries=int(os.getenv('ACCOUNT_CACHE_SIZE', 10000))),
+    ttls={
+        'credits': float(os.getenv('ACCOUNT_CACHE_CREDITS_TTL', 10)),
+        'subscription': float(os.getenv('ACCOUNT_CACHE_SUBSCRIPTION_TTL', 60))
+    }
+)
@@ -0,0 +1,73 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from loguru import logger
+
+
+class BlockingIOPool:
+    """
+    Managed thread pool for libraries that only offer a blocking API
+    (supabase-py, PyPDF2, ReportLab, requests).
+
+    Async handlers hand blocking calls to this pool through `run` so a slow
+    Supabase query or HTTP request never stalls the event loop. The pool size
+    caps how many blocking calls can be in flight at once. Clients whose calls
+    wait for a connection slot or back off between retries (Supabase, the
+    scraper) own a pool of their own, so their waiting never holds a thread
+    the shared `io_pool` needs.
+    """
+
+    def __init__(self, max_workers: int = 32, thread_name_prefix: str = 'blocking-io'):
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self.in_flight = 0
+        self.completed = 0
+        self.errors = 0
+        self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix=self.thread_name_prefix
+            )
+        return self._executor
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        try:
+            return await loop.run_in_executor(
+                self._get_executor(), functools.partial(func, *args, **kwargs)
+            )
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            'max_workers': self.max_workers,
+            'in_flight': self.in_flight,
+            'completed': self.completed,
+            'errors': self.errors
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            logger.info(f"Shutting down {self.thread_name_prefix} thread pool")
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+io_pool = BlockingIOPool(max_workers=int(os.getenv('IO_THREAD_POOL_SIZE', 32)))
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking callable on the shared I/O pool and await its result"""
+    return await io_pool.run(func, *args, **kwargs)
@@ -0,0 +1,236 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+
+def content_hash(*parts) -> str:
+    """Stable SHA-256 over any JSON-serialisable parts, used as a cache key"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Collapse whitespace so cosmetic differences in extracted text share a key"""
+    if not text:
+        return ''
+    return ' '.join(text.split())
+
+
+class CacheBackend:
+    """Interface every cache backend implements"""
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class InMemoryCache(CacheBackend):
+    """Thread-safe in-process cache with per-entry TTL and LRU eviction"""
+
+    def __init__(self, max_entries: int = 512, default_ttl: Optional[float] = 3600):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'backend': 'memory',
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+
+class DiskCache(CacheBackend):
+    """
+    Byte-valued cache stored as one file per key under `directory`.
+
+    Meant for large, content-addressed values such as rendered PDFs that
+    should survive restarts, so it is built directly rather than by name
+    through get_cache_backend: the named backends hold arbitrary Python
+    values, this one only bytes. The directory is created on the first
+    write, not at construction. Entries expire `default_ttl` seconds after they
+    were last read or written (per-entry ttl is not supported), and the
+    least recently used files are evicted once the directory grows past
+    `max_bytes`. Writes go through a temp file and os.replace so readers
+    never see a partial file.
+    """
+
+    _SAFE_KEY = re.compile(r'^[A-Za-z0-9_-]+$')
+
+    def __init__(self, directory: str = '.cache', max_bytes: int = 512 * 1024 * 1024,
+                 default_ttl: Optional[float] = None):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.total_bytes = sum(path.stat().st_size for path in self._files())
+
+    def _files(self):
+        return (path for path in self.directory.glob('*/*') if path.is_file() and not path.name.startswith('.'))
+
+    def _path(self, key: str) -> Path:
+        if not self._SAFE_KEY.match(key):
+            key = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return self.directory / key[:2] / key
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            stat = path.stat()
+            if self.default_ttl and stat.st_mtime + self.default_ttl <= time.time():
+                self.delete(key)
+                raise FileNotFoundError
+            value = path.read_bytes()
+            # Touch the file so eviction is least-recently-used
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(value)
+            previous = path.stat().st_size if path.exists() else 0
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        with self._lock:
+            self.total_bytes += len(value) - previous
+            over_budget = self.total_bytes > self.max_bytes
+        if over_budget:
+            self._evict()
+
+    def _evict(self):
+        with self._lock:
+            files = sorted(self._files(), key=lambda path: path.stat().st_mtime)
+            for path in files:
+                if self.total_bytes <= self.max_bytes:
+                    break
+                try:
+                    size = path.stat().st_size
+                    path.unlink()
+                except FileNotFoundError:
+                    continue
+                self.total_bytes -= size
+                self.evictions += 1
+
+    def delete(self, key: str):
+        path = self._path(key)
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self.total_bytes -= size
+
+    def clear(self):
+        for path in list(self._files()):
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self.total_bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'backend': 'disk',
+            'directory': str(self.directory),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+
+CACHE_BACKENDS = {
+    'memory': InMemoryCache,
+}
+
+
+def get_cache_backend(name: str = 'memory', **options) -> CacheBackend:
+    """Create a cache backend by name; shared stores register themselves in CACHE_BACKENDS"""
+    try:
+        backend = CACHE_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown cache backend: {name}")
+    return backend(**options)
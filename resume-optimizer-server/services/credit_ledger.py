@@ -0,0 +1,185 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import HTTPException
+from loguru import logger
+
+from services.account_cache import account_cache
+from services.supabase_client import supabase
+
+
+class InsufficientCreditsError(HTTPException):
+    def __init__(self, current_credits: int = 0):
+        super().__init__(status_code=403, detail={
+            "error": "Insufficient credits",
+            "message": "You have no credits remaining. Please purchase more credits to continue.",
+            "action": "purchase_required",
+            "redirect_url": "/dashboard/billing",
+            "current_credits": current_credits
+        })
+
+
+@dataclass
+class CreditReservation:
+    """Credits taken from a user's balance that are not yet committed or refunded"""
+    id: str
+    user_id: str
+    amount: int
+    credits_remaining: int
+    settled: bool = False
+
+
+class CreditLedger:
+    """
+    Credit bookkeeping through the Postgres functions in
+    migrations/create_credit_ledger.sql.
+
+    Every balance change is one RPC that updates usage_credits atomically, so
+    concurrent optimizations for the same user cannot lose decrements the way
+    a read followed by a write of `credits_remaining - 1` did. An optimization
+    reserves its credit before any work starts and settles it at the end:
+    committed when the result is stored, refunded when it fails or was served
+    from cache. Reservations left open by a crashed worker are refunded by a
+    periodic sweep.
+
+    Every RPC that moves the balance returns the new value, which is written
+    through to the account cache so polled balance reads stay current.
+    """
+
+    def __init__(self, stale_after: float = 3600, sweep_interval: float = 900, sample_size: int = 200):
+        self.stale_after = stale_after
+        self.sweep_interval = sweep_interval
+        self._sweeper: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+        self.reserved = 0
+        self.rejected = 0
+        self.committed = 0
+        self.refunded = 0
+        self.granted = 0
+        self.released = 0
+        self.errors = 0
+        self._rpc_ms = deque(maxlen=sample_size)
+
+    def _count(self, counter: str, amount: int = 1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    async def _call(self, fn: str, params: dict):
+        started = time.perf_counter()
+        try:
+            response = await supabase.execute(supabase.rpc(fn, params))
+        except Exception:
+            self._count('errors')
+            raise
+        with self._lock:
+            self._rpc_ms.append((time.perf_counter() - started) * 1000)
+        return response.data
+
+    async def reserve(self, user_id: str, amount: int = 1, reason: str = 'optimization') -> CreditReservation:
+        """Take `amount` credits or raise InsufficientCreditsError, in one round trip"""
+        rows = await self._call('reserve_credit', {
+            'p_user_id': user_id,
+            'p_amount': amount,
+            'p_reason': reason
+        })
+        row = rows[0] if rows else {'reservation_id': None, 'credits_remaining': 0}
+        if not row['reservation_id']:
+            self._count('rejected')
+            raise InsufficientCreditsError(row['credits_remaining'] or 0)
+        self._count('reserved')
+        account_cache.update('credits', user_id, row['credits_remaining'])
+        return CreditReservation(row['reservation_id'], user_id, amount, row['credits_remaining'])
+
+    async def commit(self, reservation: CreditReservation):
+        if reservation.settled:
+            return
+        await self._call('commit_credit', {'p_reservation_id': reservation.id})
+        reservation.settled = True
+        self._count('committed')
+
+    async def refund(self, reservation: Optional[CreditReservation]):
+        """
+        Return the reserved credits. Never raises: a refund that fails here is
+        picked up by the stale-reservation sweep instead.
+        """
+        if reservation is None or reservation.settled:
+            return
+        try:
+            balance = await self._call('refund_credit', {'p_reservation_id': reservation.id})
+        except Exception as e:
+            logger.error(f"Failed to refund credit reservation {reservation.id}: {str(e)}")
+            return
+        reservation.settled = True
+        if balance is not None:
+            reservation.credits_remaining = balance
+            account_cache.update('credits', reservation.user_id, balance)
+        self._count('refunded')
+
+    async def add(self, user_id: str, amount: int) -> int:
+        """Add purchased or plan credits, creating the balance row if needed; returns the new balance"""
+        balance = await self._call('add_credits', {'p_user_id': user_id, 'p_amount': amount})
+        self._count('granted', amount)
+        account_cache.update('credits', user_id, balance)
+        return balance
+
+    async def release_stale(self) -> int:
+        released = await self._call('release_stale_credit_reservations', {
+            'p_older_than': f"{int(self.stale_after)} seconds"
+        }) or 0
+        if released:
+            # Balances of the affected users are unknown here; their entries expire on their own
+            logger.warning(f"Refunded {released} stale credit reservations")
+            self._count('released', released)
+        return released
+
+    async def _sweep(self):
+        while True:
+            try:
+                await self.release_stale()
+            except Exception as e:
+                logger.warning(f"Stale credit reservation sweep failed: {str(e)}")
+            await asyncio.sleep(self.sweep_interval)
+
+    def start(self):
+        if self.sweep_interval > 0 and self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep())
+
+    async def stop(self):
+        if self._sweeper is None:
+            return
+        self._sweeper.cancel()
+        await asyncio.gather(self._sweeper, return_exceptions=True)
+        self._sweeper = None
+
+    @staticmethod
+    def _percentile(samples, fraction: float) -> float:
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 2)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'reserved': self.reserved,
+                'rejected': self.rejected,
+                'committed': self.committed,
+                'refunded': self.refunded,
+                'open': self.reserved - self.committed - self.refunded,
+                'granted': self.granted,
+                'released_stale': self.released,
+                'errors': self.errors,
+                'rpc_ms_p50': self._percentile(self._rpc_ms, 0.5),
+                'rpc_ms_p95': self._percentile(self._rpc_ms, 0.95)
+            }
+
+
+credit_ledger = CreditLedger(
+    stale_after=float(os.getenv('CREDIT_RESERVATION_STALE_AFTER', 3600)),
+    sweep_interval=float(os.getenv('CREDIT_RESERVATION_SWEEP_INTERVAL', 900))
+)
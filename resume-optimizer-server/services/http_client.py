@@ -0,0 +1,172 @@
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from loguru import logger
+
+from services.blocking_io import BlockingIOPool
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class ScrapingHttpClient:
+    """
+    Shared HTTP client for scraping job boards.
+
+    Keeps one `requests.Session` with a keep-alive connection pool so repeated
+    scrapes reuse TLS connections, applies connect/read timeouts to every call,
+    retries 429/5xx responses and connection errors with exponential backoff
+    and full jitter (honouring Retry-After), and caps concurrent requests per
+    host so a burst of scrapes does not get us rate-banned.
+
+    Async callers hand scraping work to `run`, which uses this client's own
+    thread pool: the per-host waits and retry sleeps then tie up scraper
+    threads rather than the shared io_pool.
+    """
+
+    def __init__(self, pool_size: int = 20, connect_timeout: float = 5.0, read_timeout: float = 15.0,
+                 max_retries: int = 3, backoff_factor: float = 0.5, backoff_max: float = 30.0,
+                 per_host_limit: int = 4, user_agent: str = DEFAULT_USER_AGENT, max_workers: int = 20):
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.per_host_limit = per_host_limit
+        self.user_agent = user_agent
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_in_flight: Dict[str, int] = {}
+        self._stats_lock = threading.Lock()
+        self._executor = BlockingIOPool(max_workers=max_workers, thread_name_prefix='scraper')
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        # Retries are handled in `request` so we can add jitter and per-host limits
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=0)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers['User-Agent'] = self.user_agent
+        return session
+
+    def _host_slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._stats_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return slot
+
+    def _backoff_delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Seconds to wait before retry number `attempt + 1`"""
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                    return min(max(delay, 0.0), self.backoff_max)
+                except (TypeError, ValueError):
+                    pass
+        # Full jitter keeps simultaneous retries from hitting the host in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_factor * (2 ** attempt)))
+
+    def _send(self, host: str, method: str, url: str, **kwargs) -> requests.Response:
+        slot = self._host_slot(host)
+        with slot:
+            with self._stats_lock:
+                self.requests += 1
+                self._host_in_flight[host] = self._host_in_flight.get(host, 0) + 1
+            try:
+                return self.session.request(method, url, **kwargs)
+            finally:
+                with self._stats_lock:
+                    self._host_in_flight[host] -= 1
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request, retrying transient failures. The last response is
+        returned as-is once retries are exhausted; connection errors and
+        timeouts are re-raised.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlsplit(url).netloc
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self._send(host, method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    with self._stats_lock:
+                        self.errors += 1
+                    raise
+                delay = self._backoff_delay(attempt)
+                logger.warning(f"{method} {url} failed ({type(e).__name__}), retrying in {delay:.2f}s")
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                delay = self._backoff_delay(attempt, response)
+                logger.warning(f"{method} {url} returned {response.status_code}, retrying in {delay:.2f}s")
+                response.close()
+
+            with self._stats_lock:
+                self.retries += 1
+            # Sleep outside the host slot so waiting retries don't block other requests
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking scrape (anything calling `request`) on the scraper threads"""
+        return await self._executor.run(func, *args, **kwargs)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                'pool_size': self.pool_size,
+                'per_host_limit': self.per_host_limit,
+                'requests': self.requests,
+                'retries': self.retries,
+                'errors': self.errors,
+                'in_flight': {host: count for host, count in self._host_in_flight.items() if count},
+                'executor': self._executor.stats()
+            }
+
+    def close(self):
+        self._executor.shutdown()
+        if self._session is not None:
+            logger.info("Closing scraping HTTP session")
+            self._session.close()
+            self._session = None
+
+
+scraping_client = ScrapingHttpClient(
+    pool_size=int(os.getenv('SCRAPER_POOL_SIZE', 20)),
+    connect_timeout=float(os.getenv('SCRAPER_CONNECT_TIMEOUT', 5)),
+    read_timeout=float(os.getenv('SCRAPER_READ_TIMEOUT', 15)),
+    max_retries=int(os.getenv('SCRAPER_MAX_RETRIES', 3)),
+    backoff_factor=float(os.getenv('SCRAPER_BACKOFF_FACTOR', 0.5)),
+    per_host_limit=int(os.getenv('SCRAPER_PER_HOST_LIMIT', 4)),
+    max_workers=int(os.getenv('SCRAPER_THREADS', 20))
+)
@@ -0,0 +1,236 @@
+import os
+from html.parser import HTMLParser
+from typing import Dict, List, Tuple
+
+from bs4 import BeautifulSoup
+
+# field -> (tag, css class) of the first element whose text becomes the field value
+FieldSpec = Dict[str, Tuple[str, str]]
+
+# Markup served by the guest jobPosting API used by the batch scraper
+GUEST_POSTING_FIELDS: FieldSpec = {
+    'title': ('h1', 'top-card-layout__title'),
+    'company': ('a', 'topcard__org-name-link'),
+    'location': ('span', 'topcard__flavor--bullet'),
+    'description': ('div', 'description__text'),
+}
+
+# Markup of the public /jobs/view/<id> page
+JOB_PAGE_FIELDS: FieldSpec = {
+    'title': ('h1', 'top-card-layout__title'),
+    'company': ('a', 'topcard__org-name-link'),
+    'location': ('span', 'topcard__flavor--bullet'),
+    'description': ('div', 'show-more-less-html__markup'),
+}
+
+VOID_ELEMENTS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+})
+
+PRESERVE_WHITESPACE_TAGS = frozenset({'pre', 'textarea'})
+
+# BeautifulSoup leaves script and stylesheet contents out of `.text`
+NON_TEXT_TAGS = frozenset({'script', 'style', 'template'})
+
+ASCII_WHITESPACE = ' \n\t\x0c\r'
+
+
+def _collapse_blank(data: str) -> str:
+    """
+    BeautifulSoup replaces whitespace-only strings with a single newline or
+    space; the other backends do the same so every backend returns identical text
+    """
+    if data.strip(ASCII_WHITESPACE):
+        return data
+    return '\n' if '\n' in data else ' '
+
+
+class HtmlExtractor:
+    """
+    Pulls the stripped text of a handful of elements out of a job page.
+    Every backend returns the same dict, with '' for fields that are missing.
+    """
+
+    name = 'base'
+
+    def extract(self, html: str, fields: FieldSpec) -> Dict[str, str]:
+        raise NotImplementedError
+
+
+class BeautifulSoupExtractor(HtmlExtractor):
+    """Builds the full BeautifulSoup tree; the original scraper behaviour"""
+
+    name = 'bs4'
+
+    def extract(self, html: str, fields: FieldSpec) -> Dict[str, str]:
+        soup = BeautifulSoup(html, 'html.parser')
+        result = {}
+        for field, (tag, css_class) in fields.items():
+            element = soup.find(tag, {'class': css_class})
+            result[field] = element.text.strip() if element else ''
+        return result
+
+
+class _StopParsing(Exception):
+    pass
+
+
+class _TargetedParser(HTMLParser):
+    """
+    Collects the text of the first element matching each field and stops
+    feeding as soon as every field has been closed, so the long tail of a
+    LinkedIn page (similar jobs, footer, scripts) is never tokenized.
+    """
+
+    def __init__(self, fields: FieldSpec):
+        super().__init__(convert_charrefs=True)
+        self.pending = dict(fields)
+        # field -> [tag, open same-tag depth, text parts]
+        self.active: Dict[str, list] = {}
+        self.values: Dict[str, str] = {}
+        self.preserve_depth = 0
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_ELEMENTS:
+            return
+        if tag in PRESERVE_WHITESPACE_TAGS:
+            self.preserve_depth += 1
+        elif tag in NON_TEXT_TAGS:
+            self.skip_depth += 1
+        for capture in self.active.values():
+            if capture[0] == tag:
+                capture[1] += 1
+
+        if not self.pending:
+            return
+        classes = None
+        for field, (target_tag, css_class) in list(self.pending.items()):
+            if tag != target_tag:
+                continue
+            if classes is None:
+                classes = (dict(attrs).get('class') or '').split()
+            if css_class in classes:
+                del self.pending[field]
+                self.active[field] = [tag, 1, []]
+
+    def handle_startendtag(self, tag, attrs):
+        # Self-closing tags never hold text, only the depth bookkeeping matters
+        pass
+
+    def handle_endtag(self, tag):
+        if tag in PRESERVE_WHITESPACE_TAGS and self.preserve_depth:
+            self.preserve_depth -= 1
+        elif tag in NON_TEXT_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+        for field, capture in list(self.active.items()):
+            if capture[0] != tag:
+                continue
+            capture[1] -= 1
+            if capture[1] == 0:
+                self.values[field] = ''.join(capture[2]).strip()
+                del self.active[field]
+
+        if not self.pending and not self.active:
+            raise _StopParsing
+
+    def handle_data(self, data):
+        if not self.active or self.skip_depth:
+            return
+        if not self.preserve_depth:
+            data = _collapse_blank(data)
+        for capture in self.active.values():
+            capture[2].append(data)
+
+
+class StreamingExtractor(HtmlExtractor):
+    """Single forward pass over the HTML that stops once all fields are found"""
+
+    name = 'streaming'
+
+    def extract(self, html: str, fields: FieldSpec) -> Dict[str, str]:
+        parser = _TargetedParser(fields)
+        try:
+            parser.feed(html)
+            parser.close()
+        except _StopParsing:
+            pass
+        # Elements left open at EOF behave like BeautifulSoup's implicit close
+        for field, capture in parser.active.items():
+            parser.values[field] = ''.join(capture[2]).strip()
+        return {field: parser.values.get(field, '') for field in fields}
+
+
+class LxmlExtractor(HtmlExtractor):
+    """libxml2 parse with one XPath lookup per field"""
+
+    name = 'lxml'
+
+    def __init__(self):
+        from lxml import html as lxml_html
+        self._fromstring = lxml_html.fromstring
+        self._queries: Dict[Tuple[str, str], str] = {}
+
+    def _query(self, tag: str, css_class: str) -> str:
+        key = (tag, css_class)
+        if key not in self._queries:
+            self._queries[key] = (
+                f"(//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')])[1]"
+            )
+        return self._queries[key]
+
+    @classmethod
+    def _collect(cls, node, parts: list, preserve: bool):
+        preserve = preserve or node.tag in PRESERVE_WHITESPACE_TAGS
+        # Comments and processing instructions have a non-string tag; only their tail is text
+        if isinstance(node.tag, str) and node.tag not in NON_TEXT_TAGS and node.text:
+            parts.append(node.text if preserve else _collapse_blank(node.text))
+        for child in node:
+            cls._collect(child, parts, preserve)
+            if child.tail:
+                parts.append(child.tail if preserve else _collapse_blank(child.tail))
+
+    @classmethod
+    def _text(cls, element) -> str:
+        parts = []
+        cls._collect(element, parts, False)
+        return ''.join(parts).strip()
+
+    def extract(self, html: str, fields: FieldSpec) -> Dict[str, str]:
+        if not html.strip():
+            return {field: '' for field in fields}
+        root = self._fromstring(html)
+        result = {}
+        for field, (tag, css_class) in fields.items():
+            matches = root.xpath(self._query(tag, css_class))
+            result[field] = self._text(matches[0]) if matches else ''
+        return result
+
+
+EXTRACTOR_BACKENDS = {
+    'bs4': BeautifulSoupExtractor,
+    'streaming': StreamingExtractor,
+}
+
+try:
+    import lxml  # noqa: F401
+    EXTRACTOR_BACKENDS['lxml'] = LxmlExtractor
+except ImportError:
+    pass
+
+
+def available_extractors() -> List[str]:
+    return list(EXTRACTOR_BACKENDS)
+
+
+def get_extractor(name: str = 'streaming') -> HtmlExtractor:
+    """Create an extractor by name; lxml is only registered when it is installed"""
+    try:
+        backend = EXTRACTOR_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown or unavailable HTML extractor: {name}")
+    return backend()
+
+
+job_html_extractor = get_extractor(os.getenv('JOB_HTML_EXTRACTOR', 'streaming'))
@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from loguru import logger
+
+from services.cache import CacheBackend, get_cache_backend
+
+# Fetchers return the parsed posting, None when the posting does not exist
+# (cached negatively) and raise on transient failures (not cached)
+PostingFetcher = Callable[[], Optional[dict]]
+
+
+class JobPostingCache:
+    """
+    Cache of parsed LinkedIn job postings keyed by source and job id. The
+    guest API, the public job page and the authenticated Jobs API each
+    return their own description and fields, so every source caches its own
+    copy rather than one caller's shape being served to the others.
+
+    An entry is served as-is while younger than `fresh_ttl`. Between
+    `fresh_ttl` and `fresh_ttl + stale_ttl` it is still served, but a single
+    background refresh is started (stale-while-revalidate). Postings that
+    came back 404 are remembered for `negative_ttl` so dead links don't get
+    scraped on every request. Concurrent misses for the same id share one
+    fetch.
+    """
+
+    def __init__(self, backend: CacheBackend, fresh_ttl: float = 21600, stale_ttl: float = 86400,
+                 negative_ttl: float = 600, revalidate_workers: int = 2):
+        self.backend = backend
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self._revalidator = ThreadPoolExecutor(max_workers=revalidate_workers, thread_name_prefix='job-cache')
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._revalidating = set()
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.fetch_errors = 0
+
+    @staticmethod
+    def _key(source: str, job_id: str) -> str:
+        return f"job:{source}:{job_id}"
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _store(self, key: str, posting: Optional[dict]):
+        if posting is None:
+            entry = {'posting': None, 'fetched_at': time.time()}
+            self.backend.set(key, entry, ttl=self.negative_ttl)
+        else:
+            entry = {'posting': dict(posting), 'fetched_at': time.time()}
+            self.backend.set(key, entry, ttl=self.fresh_ttl + self.stale_ttl)
+
+    def _fetch(self, key: str, fetch: PostingFetcher) -> Optional[dict]:
+        try:
+            posting = fetch()
+        except Exception:
+            self._count('fetch_errors')
+            raise
+        self._store(key, posting)
+        return posting
+
+    def _revalidate(self, key: str, fetch: PostingFetcher):
+        try:
+            self._fetch(key, fetch)
+            self._count('revalidations')
+        except Exception as e:
+            # Keep serving the stale copy until it expires
+            logger.warning(f"Failed to revalidate {key}: {str(e)}")
+        finally:
+            with self._lock:
+                self._revalidating.discard(key)
+
+    def _schedule_revalidation(self, key: str, fetch: PostingFetcher):
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+        self._revalidator.submit(self._revalidate, key, fetch)
+
+    def _lookup(self, key: str, fetch: PostingFetcher):
+        """Return (found, posting) from the cache, scheduling a refresh when stale"""
+        entry = self.backend.get(key)
+        if entry is None:
+            return False, None
+
+        if entry['posting'] is None:
+            self._count('negative_hits')
+            return True, None
+
+        if time.time() - entry['fetched_at'] >= self.fresh_ttl:
+            self._count('stale_hits')
+            self._schedule_revalidation(key, fetch)
+        else:
+            self._count('fresh_hits')
+        return True, dict(entry['posting'])
+
+    def get_or_fetch(self, source: str, job_id: str, fetch: PostingFetcher) -> Optional[dict]:
+        """Return the posting `source` cached for `job_id`, fetching it with `fetch` on a miss"""
+        key = self._key(source, job_id)
+        found, posting = self._lookup(key, fetch)
+        if found:
+            return posting
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            # Another caller may have filled the entry while we waited
+            found, posting = self._lookup(key, fetch)
+            if found:
+                return posting
+            self._count('misses')
+            try:
+                posting = self._fetch(key, fetch)
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+        return dict(posting) if posting is not None else None
+
+    def invalidate(self, source: str, job_id: str):
+        self.backend.delete(self._key(source, job_id))
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.fresh_hits + self.stale_hits + self.negative_hits
+            lookups = hits + self.misses
+            return {
+                'fresh_hits': self.fresh_hits,
+                'stale_hits': self.stale_hits,
+                'negative_hits': self.negative_hits,
+                'misses': self.misses,
+                'revalidations': self.revalidations,
+                'fetch_errors': self.fetch_errors,
+                'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+                'store': self.backend.stats()
+            }
+
+    def shutdown(self):
+        self._revalidator.shutdown(wait=False, cancel_futures=True)
+
+
+job_posting_cache = JobPostingCache(
+    get_cache_backend(
+        os.getenv('JOB_CACHE_BACKEND', 'memory'),
+        max_entries=int(os.getenv('JOB_CACHE_SIZE', 2048)),
+        default_ttl=None
+    ),
+    fresh_ttl=float(os.getenv('JOB_CACHE_TTL', 21600)),
+    stale_ttl=float(os.getenv('JOB_CACHE_STALE_TTL', 86400)),
+    negative_ttl=float(os.getenv('JOB_CACHE_NEGATIVE_TTL', 600))
+)
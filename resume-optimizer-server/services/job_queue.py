@@ -0,0 +1,168 @@
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException
+from loguru import logger
+
+TERMINAL_STATUSES = ('completed', 'failed')
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue cannot accept more work"""
+
+
+@dataclass
+class OptimizationJob:
+    id: str
+    user_id: str
+    status: str = 'queued'
+    stage: str = 'queued'
+    progress: int = 0
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    runner: Optional[Callable] = field(default=None, repr=False)
+    changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def to_dict(self) -> dict:
+        data = {
+            'job_id': self.id,
+            'status': self.status,
+            'stage': self.stage,
+            'progress': self.progress,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
+        if self.result is not None:
+            data['result'] = self.result
+        if self.error is not None:
+            data['error'] = self.error
+        return data
+
+    def _touch(self):
+        self.updated_at = time.time()
+        # Wake up any watchers, then arm a fresh event for the next change
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class OptimizationJobQueue:
+    """
+    Bounded in-process job queue for resume optimizations.
+
+    A fixed number of worker tasks pull jobs off an asyncio.Queue, so at most
+    `max_workers` pipelines run at once and at most `max_queue_size` wait for a
+    slot. Finished jobs are kept for `job_ttl` seconds for status polling.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue_size: int = 100, job_ttl: int = 3600):
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.job_ttl = job_ttl
+        self.jobs: Dict[str, OptimizationJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers = []
+
+    async def start(self):
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(self.max_workers)
+        ]
+        logger.info(f"Optimization queue started with {self.max_workers} workers")
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def submit(self, job_id: str, user_id: str,
+               runner: Callable[[OptimizationJob], Awaitable[dict]]) -> OptimizationJob:
+        """Enqueue a job; `runner` receives the job so it can report progress"""
+        if self._queue is None:
+            raise RuntimeError("Optimization queue is not running")
+
+        self._evict_expired()
+        job = OptimizationJob(id=job_id, user_id=user_id, runner=runner)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError("Optimization queue is full")
+
+        self.jobs[job_id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[OptimizationJob]:
+        return self.jobs.get(job_id)
+
+    def stats(self) -> dict:
+        return {
+            'workers': len(self._workers),
+            'queued': self._queue.qsize() if self._queue else 0,
+            'processing': sum(1 for job in self.jobs.values() if job.status == 'processing')
+        }
+
+    async def update(self, job: OptimizationJob, stage: str, progress: int):
+        job.stage = stage
+        job.progress = progress
+        job._touch()
+
+    async def watch(self, job: OptimizationJob) -> AsyncIterator[dict]:
+        """Yield a snapshot of the job every time it changes, ending at a terminal status"""
+        while True:
+            changed = job.changed
+            yield job.to_dict()
+            if job.status in TERMINAL_STATUSES:
+                return
+            await changed.wait()
+
+    async def _worker(self, index: int):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: OptimizationJob):
+        job.status = 'processing'
+        job.stage = 'started'
+        job._touch()
+        try:
+            job.result = await job.runner(job)
+            job.status = 'completed'
+            job.stage = 'completed'
+            job.progress = 100
+        except HTTPException as e:
+            job.status = 'failed'
+            job.error = str(e.detail)
+        except Exception as e:
+            logger.error(f"Optimization job {job.id} failed: {str(e)}")
+            job.status = 'failed'
+            job.error = str(e)
+        finally:
+            job.runner = None
+            job._touch()
+
+    def _evict_expired(self):
+        cutoff = time.time() - self.job_ttl
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.status in TERMINAL_STATUSES and job.updated_at < cutoff
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+
+optimization_queue = OptimizationJobQueue(
+    max_workers=int(os.getenv('OPTIMIZE_WORKERS', 4)),
+    max_queue_size=int(os.getenv('OPTIMIZE_QUEUE_SIZE', 100)),
+    job_ttl=int(os.getenv('OPTIMIZE_JOB_TTL', 3600))
+)
@@ -1,7 +1,21 @@
-from typing import Dict
+from typing import AsyncIterator, Dict, List, Union
+import asyncio
+import os
 import re
-from bs4 import BeautifulSoup
-import requests
+from services.http_client import scraping_client
+from services.job_posting_cache import job_posting_cache
+from services.job_html_extractor import GUEST_POSTING_FIELDS, job_html_extractor
+
+JOB_POSTING_URL = 'https://www.linkedin.com/jobs-guest/jobs/api/jobPosting/{job_id}'
+JOB_VIEW_URL = 'https://www.linkedin.com/jobs/view/{job_id}'
+SEARCH_URL = 'https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search'
+JOB_ID_PATTERN = re.compile(r'urn:li:jobPosting:(\d+)')
+
+# Upper bound on concurrent LinkedIn calls for one batch; the HTTP client's
+# per-host limit still applies across batches
+SCRAPE_CONCURRENCY = int(os.getenv('SCRAPE_CONCURRENCY', 8))
+# Guest search pages stop returning results well before this offset
+MAX_SEARCH_OFFSET = 1000
 
 class LinkedInJobScraper:
     def __init__(self):
@@ -21,33 +35,127 @@ class LinkedInJobScraper:
         try:
             # Extract job ID from URL
             job_id = self.extract_job_id(job_url)
-            
-            # Get job details
-            url = f'https://www.linkedin.com/jobs-guest/jobs/api/jobPosting/{job_id}'
-            response = requests.get(url, headers=self.headers)
-            
-            if response.status_code != 200:
-                print(f"Failed to get job details: Status code {response.status_code}")
+            return self.get_job_details_by_id(job_id, job_url)
+        except Exception as e:
+            print(f"Error getting job details: {str(e)}")
+            return None
+
+    def scrape_job_by_url(self, job_url: str) -> Dict:
+        """Scrape a single job posting from its LinkedIn URL"""
+        return self.get_job_details(job_url)
+
+    def get_job_details_by_id(self, job_id: str, job_url: str = None) -> Dict:
+        """Get job details for a LinkedIn job id, served from the job posting cache when possible"""
+        try:
+            posting = job_posting_cache.get_or_fetch('guest', job_id, lambda: self.fetch_job_posting(job_id))
+            if posting is None:
+                print(f"Job {job_id} not found")
                 return None
-                
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract job details
-            title = soup.find('h1', {'class': 'top-card-layout__title'})
-            company = soup.find('a', {'class': 'topcard__org-name-link'})
-            location = soup.find('span', {'class': 'topcard__flavor--bullet'})
-            description = soup.find('div', {'class': 'description__text'})
-            
-            job_details = {
-                'title': title.text.strip() if title else '',
-                'company': company.text.strip() if company else '',
-                'location': location.text.strip() if location else '',
-                'description': description.text.strip() if description else '',
-                'job_url': job_url
-            }
-            
-            return job_details
-            
+
+            posting['job_url'] = job_url or JOB_VIEW_URL.format(job_id=job_id)
+            return posting
+
         except Exception as e:
             print(f"Error getting job details: {str(e)}")
             return None
+
+    def fetch_job_posting(self, job_id: str) -> Dict:
+        """
+        Scrape and parse a job posting from LinkedIn. Returns None when the
+        posting does not exist and raises on any other failure.
+        """
+        url = JOB_POSTING_URL.format(job_id=job_id)
+        response = scraping_client.get(url, headers=self.headers)
+
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise Exception(f"Failed to get job details: Status code {response.status_code}")
+
+        # Extract job details
+        return {'job_id': job_id, **job_html_extractor.extract(response.text, GUEST_POSTING_FIELDS)}
+
+    def search_job_ids(self, query: Union[str, Dict], start: int = 0) -> List[str]:
+        """
+        Return the job ids on one page of LinkedIn guest search results.
+        `query` is either a keyword string or a dict with `keywords` and
+        optionally `location`.
+        """
+        if isinstance(query, dict):
+            params = {'keywords': query.get('keywords', ''), 'location': query.get('location', '')}
+        else:
+            params = {'keywords': str(query)}
+        params['start'] = start
+
+        try:
+            response = scraping_client.get(SEARCH_URL, headers=self.headers, params=params)
+            if response.status_code != 200:
+                print(f"Failed to search jobs for {params}: Status code {response.status_code}")
+                return []
+            # Each card repeats its URN, keep the first occurrence in page order
+            return list(dict.fromkeys(JOB_ID_PATTERN.findall(response.text)))
+        except Exception as e:
+            print(f"Error searching jobs: {str(e)}")
+            return []
+
+    async def iter_jobs(self, search_queries: list, max_jobs: int = 25,
+                        concurrency: int = SCRAPE_CONCURRENCY) -> AsyncIterator[Dict]:
+        """
+        Scrape jobs for several search queries concurrently and yield each
+        job's details as soon as it has been fetched.
+
+        Search pages and job detail fetches share one budget of `concurrency`
+        in-flight requests. Job ids are de-duplicated across queries and at
+        most `max_jobs` distinct jobs are fetched.
+        """
+        budget = asyncio.Semaphore(concurrency)
+        seen = set()
+        detail_tasks = set()
+        results: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def fetch(func, *args):
+            async with budget:
+                return await scraping_client.run(func, *args)
+
+        async def fetch_details(job_id: str):
+            await results.put(await fetch(self.get_job_details_by_id, job_id))
+
+        async def search(query):
+            start = 0
+            while len(seen) < max_jobs and start < MAX_SEARCH_OFFSET:
+                job_ids = await fetch(self.search_job_ids, query, start)
+                if not job_ids:
+                    break
+                for job_id in job_ids:
+                    if len(seen) >= max_jobs:
+                        break
+                    if job_id not in seen:
+                        seen.add(job_id)
+                        detail_tasks.add(asyncio.create_task(fetch_details(job_id)))
+                start += len(job_ids)
+
+        async def run():
+            try:
+                await asyncio.gather(*(search(query) for query in search_queries), return_exceptions=True)
+                await asyncio.gather(*detail_tasks, return_exceptions=True)
+            finally:
+                await results.put(done)
+
+        runner = asyncio.create_task(run())
+        try:
+            while True:
+                job = await results.get()
+                if job is done:
+                    break
+                if job is not None:
+                    yield job
+        finally:
+            # Stop outstanding fetches if the consumer goes away early
+            runner.cancel()
+            for task in detail_tasks:
+                task.cancel()
+
+    async def scrape_jobs(self, search_queries: list, max_jobs: int = 25) -> List[Dict]:
+        """Scrape jobs for the given search queries and return them all at once"""
+        return [job async for job in self.iter_jobs(search_queries, max_jobs)]
@@ -2,34 +2,28 @@ import os
 import openai
 from typing import Dict
 import re
+import asyncio
+import time
+from loguru import logger
+from services.cache import content_hash, get_cache_backend, normalize_text
 
-class OpenAIOptimizer:
-   def __init__(self):
-      self.api_key = os.getenv("OPENAI_API_KEY")
-      if self.api_key:
-            openai.api_key = self.api_key
+OPTIMIZATION_MODEL = "gpt-4o-mini"
 
-   async def optimize(self, resume_text: str, job_description: str, 
-                     job_title: str, company: str, 
-                     custom_instructions: str = None) -> Dict:
-      try:
-            if not self.api_key:
-               raise ValueError("OpenAI API key not configured")
-   
-            # Construct the prompt
-            prompt = self._construct_prompt(
-               resume_text, 
-               job_description, 
-               job_title, 
-               company, 
-               custom_instructions
-            )
+# Bump whenever the prompts change so cached completions are not reused
+PROMPT_VERSION = "2025-01-v1"
 
-            # Call OpenAI API
-            response = openai.ChatCompletion.create(
-               model="gpt-4o-mini",
-               messages=[
-                  {"role": "system", "content": """You are a professional career advisor that helps optimize resumes and prepare candidates for job opportunities. Your task is to create an ATS-friendly resume that SPECIFICALLY targets this job position.
+# Content-addressed cache of completions, shared by every optimizer instance
+optimization_cache = get_cache_backend(
+   os.getenv("OPTIMIZATION_CACHE_BACKEND", "memory"),
+   max_entries=int(os.getenv("OPTIMIZATION_CACHE_SIZE", 512)),
+   default_ttl=int(os.getenv("OPTIMIZATION_CACHE_TTL", 86400))
+)
+_inflight_completions = {}
+
+SECTION_MARKER = re.compile(r'\[SECTION:\s*([^\]]+)\]')
+SECTION_MARKER_PREFIX = "[SECTION:"
+
+OPTIMIZATION_SYSTEM_PROMPT = """You are a professional career advisor that helps optimize resumes and prepare candidates for job opportunities. Your task is to create an ATS-friendly resume that SPECIFICALLY targets this job position.
 
          CRITICAL - ABSOLUTELY REQUIRED RULES:
          1. JOB MATCHING (HIGHEST PRIORITY):
@@ -40,14 +34,13 @@ class OpenAIOptimizer:
             !! Use similar terminology as the job description
             !! Highlight experiences that directly relate to job requirements
             !! PLEASE DO NOT FORGET TO ADD THE CANDIDATE TITLE AFTER THE NAME eg Software Engineer, Product Manager, etc !! 
-            !! Make sure to add *** for Titles of the sections and ** for smaller titles and * for bold text inside the sections !!
             !! Ensure technical skills match what's asked in the job
-            - Summarize concisely: Reduce each role's responsibilities into two strong bullet points.  
-            - Prioritize impact: Focus on the most significant contributions and achievements.  
-            - Use action verbs: Ensure each bullet starts with a strong action verb.  
-            - Maintain structure: Keep the formatting clean and consistent.  
-            Output Format for Experience Section:  
-            [Job Title] – Company name if there is one, otherwise leave blank it is critical !!DO NOT WRITE THE COMPANY NAME IF THERE IS NOT ONE!! – [Dates]**  
+            - **Summarize concisely**: Reduce each role's responsibilities into two strong bullet points.  
+            - **Prioritize impact**: Focus on the most significant contributions and achievements.  
+            - **Use action verbs**: Ensure each bullet starts with a strong action verb.  
+            - **Maintain structure**: Keep the formatting clean and consistent.  
+            **Output Format for Experience Section:**  
+            **[Job Title] – Company name if there is one, otherwise leave blank it is critical !!DO NOT WRITE THE COMPANY NAME IF THERE IS NOT ONE!! – [Dates]**  
 
 
          2. SECTION ORGANIZATION (STRICT ORDER):
@@ -144,59 +137,32 @@ class OpenAIOptimizer:
          6. Analysis sections use EXACT format with [SECTION:NAME] markers
 
          ‼️ IMPORTANT: Show the COMPLETE response with both parts clearly separated.
-         """},
-                  {"role": "user", "content": prompt}
-               ],
-               temperature=0.7,
-               max_tokens=2000
-            )
-
-            
-            # Parse the response
-            return self._parse_response(response.choices[0].message.content)
-
-      except Exception as e:
-            raise Exception(f"Failed to optimize resume with OpenAI: {str(e)}")
+         """
 
-  
-   def _parse_response(self, response: str) -> Dict:
-      # Split into resume and analysis parts
-      parts = response.split('PART 2: DETAILED ANALYSIS')
-      
-      # Get the resume part
-      resume_part = parts[0].split('PART 1: OPTIMIZED RESUME')[-1].strip()
-      
-      # Get the analysis part
-      analysis_part = parts[1].strip() if len(parts) > 1 else ""
-      
-      return {
-            "optimized_resume": resume_part,
-            "analysis": analysis_part
-      }
+class OpenAIOptimizer:
+   def __init__(self):
+      self.api_key = os.getenv("OPENAI_API_KEY")
+      if self.api_key:
+            openai.api_key = self.api_key
 
-   def generate_with_openai(self, job_title, company, resume_text, job_description):
-      """Generate optimization suggestions using OpenAI"""
+   async def optimize(self, resume_text: str, job_description: str, 
+                     job_title: str, company: str, 
+                     custom_instructions: str = None) -> Dict:
       try:
-         print("[OpenAI] Sending request to OpenAI API...")
-
-         # Ensure we're using the job description
-         if not job_description:
-            raise ValueError("Job description is required")
-
-         optimization_prompt = f"""
-         Please optimize this resume for the following job description:
-
-         Job Description:
-         {job_description}
-
-         Original Resume:
-         {resume_text}
-
-         Please optimize this resume and provide improvement suggestions. Format your response in clear sections as follows:
-         [Rest of your existing prompt...]
-         """
+            if not self.api_key:
+               raise ValueError("OpenAI API key not configured")
+   
+            # Construct the prompt
+            prompt = self._construct_prompt(
+               resume_text, 
+               job_description, 
+               job_title, 
+               company, 
+               custom_instructions
+            )
 
-         response = openai.ChatCompletion.create(
+            # Call OpenAI API
+            response = openai.ChatCompletion.create(
                model="gpt-4o-mini",
                messages=[
                   {"role": "system", "content": """You are a professional career advisor that helps optimize resumes and prepare candidates for job opportunities. Your task is to create an ATS-friendly resume that SPECIFICALLY targets this job position.
@@ -210,13 +176,14 @@ class OpenAIOptimizer:
             !! Use similar terminology as the job description
             !! Highlight experiences that directly relate to job requirements
             !! PLEASE DO NOT FORGET TO ADD THE CANDIDATE TITLE AFTER THE NAME eg Software Engineer, Product Manager, etc !! 
+            !! Make sure to add *** for Titles of the sections and ** for smaller titles and * for bold text inside the sections !!
             !! Ensure technical skills match what's asked in the job
-            - **Summarize concisely**: Reduce each role's responsibilities into two strong bullet points.  
-            - **Prioritize impact**: Focus on the most significant contributions and achievements.  
-            - **Use action verbs**: Ensure each bullet starts with a strong action verb.  
-            - **Maintain structure**: Keep the formatting clean and consistent.  
-            **Output Format for Experience Section:**  
-            **[Job Title] – Company name if there is one, otherwise leave blank it is critical !!DO NOT WRITE THE COMPANY NAME IF THERE IS NOT ONE!! – [Dates]**  
+            - Summarize concisely: Reduce each role's responsibilities into two strong bullet points.  
+            - Prioritize impact: Focus on the most significant contributions and achievements.  
+            - Use action verbs: Ensure each bullet starts with a strong action verb.  
+            - Maintain structure: Keep the formatting clean and consistent.  
+            Output Format for Experience Section:  
+            [Job Title] – Company name if there is one, otherwise leave blank it is critical !!DO NOT WRITE THE COMPANY NAME IF THERE IS NOT ONE!! – [Dates]**  
 
 
          2. SECTION ORGANIZATION (STRICT ORDER):
@@ -314,28 +281,181 @@ class OpenAIOptimizer:
 
          ‼️ IMPORTANT: Show the COMPLETE response with both parts clearly separated.
          """},
-                  {"role": "user", "content": optimization_prompt}
+                  {"role": "user", "content": prompt}
                ],
                temperature=0.7,
                max_tokens=2000
-         )
-         
-         print("[OpenAI] Successfully received response")
-         print("\n[OpenAI] Response content:")
-         print("=" * 80)
-         print(response.choices[0].message.content)
-         print("=" * 80)
+            )
+
+            
+            # Parse the response
+            return self._parse_response(response.choices[0].message.content)
+
+      except Exception as e:
+            raise Exception(f"Failed to optimize resume with OpenAI: {str(e)}")
+
+  
+   def _parse_response(self, response: str) -> Dict:
+      # Split into resume and analysis parts
+      parts = response.split('PART 2: DETAILED ANALYSIS')
+      
+      # Get the resume part
+      resume_part = parts[0].split('PART 1: OPTIMIZED RESUME')[-1].strip()
+      
+      # Get the analysis part
+      analysis_part = parts[1].strip() if len(parts) > 1 else ""
+      
+      return {
+            "optimized_resume": resume_part,
+            "analysis": analysis_part
+      }
+
+   def _optimization_request(self, resume_text, job_description) -> Dict:
+      """Build the chat completion arguments for the resume optimization call"""
+      optimization_prompt = f"""
+         Please optimize this resume for the following job description:
+
+         Job Description:
+         {job_description}
+
+         Original Resume:
+         {resume_text}
+
+         Please optimize this resume and provide improvement suggestions. Format your response in clear sections as follows:
+         [Rest of your existing prompt...]
+         """
+
+      return {
+         "model": OPTIMIZATION_MODEL,
+         "messages": [
+            {"role": "system", "content": OPTIMIZATION_SYSTEM_PROMPT},
+            {"role": "user", "content": optimization_prompt}
+         ],
+         "temperature": 0.7,
+         "max_tokens": 2000
+      }
+
+   def _completion_cache_key(self, kind: str, request: Dict, resume_text, job_description,
+                             job_title=None, company=None) -> str:
+      """Content-addressed key: normalized inputs plus everything that shapes the completion"""
+      return content_hash(
+         kind,
+         PROMPT_VERSION,
+         request["model"],
+         request["temperature"],
+         request["max_tokens"],
+         normalize_text(resume_text),
+         normalize_text(job_description),
+         job_title,
+         company
+      )
+
+   async def _acached_completion(self, cache_key: str, request: Dict):
+      """
+      Return (content, cached) for a chat completion. Identical requests are served
+      from the optimization cache, and a request that is already in flight (e.g. a
+      double click) waits for the first call instead of paying for a second one.
+      """
+      content = optimization_cache.get(cache_key)
+      if content is not None:
+         return content, True
+
+      pending = _inflight_completions.get(cache_key)
+      if pending is not None:
+         return await asyncio.shield(pending), True
+
+      future = asyncio.get_running_loop().create_future()
+      # Nobody may be waiting on the future, so mark failures as retrieved
+      future.add_done_callback(lambda f: f.cancelled() or f.exception())
+      _inflight_completions[cache_key] = future
+      try:
+         response = await openai.ChatCompletion.acreate(**request)
+         content = response.choices[0].message.content
+         optimization_cache.set(cache_key, content)
+         future.set_result(content)
+         return content, False
+      except asyncio.CancelledError:
+         future.cancel()
+         raise
+      except Exception as e:
+         future.set_exception(e)
+         raise
+      finally:
+         _inflight_completions.pop(cache_key, None)
+
+   def generate_with_openai(self, job_title, company, resume_text, job_description):
+      """Generate optimization suggestions using OpenAI"""
+      try:
+         print("[OpenAI] Sending request to OpenAI API...")
+
+         # Ensure we're using the job description
+         if not job_description:
+            raise ValueError("Job description is required")
+
+         request = self._optimization_request(resume_text, job_description)
+         cache_key = self._completion_cache_key('optimization', request, resume_text, job_description)
+         cached = optimization_cache.get(cache_key)
+         if cached is not None:
+            logger.debug("Returning cached optimization")
+            return cached
+
+         response = openai.ChatCompletion.create(**request)
          
+         logger.debug("Received optimization response")
+
+         optimization_cache.set(cache_key, response.choices[0].message.content)
          return response.choices[0].message.content
          
       except Exception as e:
          print(f"[OpenAI ERROR] Error generating optimization suggestions: {str(e)}")
          raise
 
+   async def agenerate_with_openai(self, job_title, company, resume_text, job_description):
+      """
+      Async variant of generate_with_openai that does not block the event loop.
+      Returns (content, cached).
+      """
+      try:
+         if not job_description:
+            raise ValueError("Job description is required")
+
+         request = self._optimization_request(resume_text, job_description)
+         cache_key = self._completion_cache_key('optimization', request, resume_text, job_description)
+         return await self._acached_completion(cache_key, request)
+
+      except Exception as e:
+         print(f"[OpenAI ERROR] Error generating optimization suggestions: {str(e)}")
+         raise
+
+
+   async def astream_with_openai(self, job_title, company, resume_text, job_description):
+      """
+      Stream the optimization completion, yielding (delta, cached) as tokens arrive.
+      A cached result is yielded in one piece; a completed stream is added to the cache.
+      """
+      if not job_description:
+         raise ValueError("Job description is required")
+
+      request = self._optimization_request(resume_text, job_description)
+      cache_key = self._completion_cache_key('optimization', request, resume_text, job_description)
+      cached = optimization_cache.get(cache_key)
+      if cached is not None:
+         yield cached, True
+         return
+
+      parts = []
+      async for chunk in await openai.ChatCompletion.acreate(stream=True, **request):
+         delta = chunk.choices[0].delta.get("content")
+         if delta:
+            parts.append(delta)
+            yield delta, False
+
+      optimization_cache.set(cache_key, "".join(parts))
+
    def split_ai_response(self, response):
       """Split OpenAI response into resume and analysis parts"""
       # Find all sections using regex
-      sections = re.split(r'\[SECTION:\s*([^\]]+)\]', response)
+      sections = SECTION_MARKER.split(response)
       
       if len(sections) > 1:
          # First part is the resume content
@@ -357,13 +477,9 @@ class OpenAIOptimizer:
       
       return resume_content, analysis
 
-   def generate_cover_letter(self, resume_text: str, job_description: str, job_title: str, company: str) -> str:
-        """Generate a cover letter using the resume and job details"""
-        try:
-            if not self.api_key:
-                raise ValueError("OpenAI API key not configured")
-
-            prompt = f"""
+   def _cover_letter_request(self, resume_text: str, job_description: str, job_title: str, company: str) -> Dict:
+      """Build the chat completion arguments for the cover letter call"""
+      prompt = f"""
             Generate a professional cover letter for the {job_title} position at {company}. 
             Use the following job description and resume to create a tailored letter.
             Please write the cover letter in the detected language of the job description.
@@ -416,19 +532,147 @@ class OpenAIOptimizer:
             The letter should be compelling, concise, and focused entirely on the value the candidate brings to this specific role.
             """
 
-            response = openai.ChatCompletion.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert career advisor specializing in creating compelling cover letters."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1000
+      return {
+         "model": OPTIMIZATION_MODEL,
+         "messages": [
+            {"role": "system", "content": "You are an expert career advisor specializing in creating compelling cover letters."},
+            {"role": "user", "content": prompt}
+         ],
+         "temperature": 0.7,
+         "max_tokens": 1000
+      }
+
+   def generate_cover_letter(self, resume_text: str, job_description: str, job_title: str, company: str) -> str:
+        """Generate a cover letter using the resume and job details"""
+        try:
+            if not self.api_key:
+                raise ValueError("OpenAI API key not configured")
+
+            request = self._cover_letter_request(resume_text, job_description, job_title, company)
+            cache_key = self._completion_cache_key(
+                'cover_letter', request, resume_text, job_description, job_title, company
             )
+            cached = optimization_cache.get(cache_key)
+            if cached is not None:
+                return cached.strip()
+
+            response = openai.ChatCompletion.create(**request)
 
-            print("[OpenAI Cover Letter] Successfully received response ", response.choices[0].message.content.strip())
+            logger.debug("Received cover letter response")
 
+            optimization_cache.set(cache_key, response.choices[0].message.content)
             return response.choices[0].message.content.strip()
 
         except Exception as e:
             raise Exception(f"Failed to generate cover letter: {str(e)}")
+
+   async def agenerate_cover_letter(self, resume_text: str, job_description: str, job_title: str, company: str):
+        """Async variant of generate_cover_letter. Returns (content, cached)."""
+        try:
+            if not self.api_key:
+                raise ValueError("OpenAI API key not configured")
+
+            request = self._cover_letter_request(resume_text, job_description, job_title, company)
+            cache_key = self._completion_cache_key(
+                'cover_letter', request, resume_text, job_description, job_title, company
+            )
+            content, cached = await self._acached_completion(cache_key, request)
+            return content.strip(), cached
+
+        except Exception as e:
+            raise Exception(f"Failed to generate cover letter: {str(e)}")
+
+   async def generate_resume_and_cover_letter(self, job_title, company, resume_text, job_description):
+      """
+      Run the optimization and cover letter completions concurrently.
+
+      Returns (optimization_result, cover_letter, timings) where timings holds the
+      duration of each call and the overall wall time in seconds, plus `cached`
+      when both results came from the optimization cache. If either call fails
+      the other one is cancelled and the error is re-raised.
+      """
+      timings = {}
+
+      async def timed(name, coro):
+         started = time.perf_counter()
+         try:
+            return await coro
+         finally:
+            timings[name] = round(time.perf_counter() - started, 3)
+
+      started = time.perf_counter()
+      optimization_task = asyncio.create_task(timed('optimization', self.agenerate_with_openai(
+         job_title, company, resume_text, job_description
+      )))
+      cover_letter_task = asyncio.create_task(timed('cover_letter', self.agenerate_cover_letter(
+         resume_text, job_description, job_title, company
+      )))
+      tasks = [optimization_task, cover_letter_task]
+
+      try:
+         done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+         for task in done:
+            if task.exception():
+               raise task.exception()
+      finally:
+         # Also covers the caller being cancelled (client disconnect, shutdown)
+         for task in tasks:
+            if not task.done():
+               task.cancel()
+         await asyncio.gather(*tasks, return_exceptions=True)
+
+      optimization_result, optimization_cached = optimization_task.result()
+      cover_letter, cover_letter_cached = cover_letter_task.result()
+
+      timings['total'] = round(time.perf_counter() - started, 3)
+      timings['cached'] = optimization_cached and cover_letter_cached
+      logger.info(f"Completions finished: {timings}")
+
+      return optimization_result, cover_letter, timings
+
+class SectionStreamSplitter:
+   """
+   Incrementally split a streamed completion at the [SECTION:...] markers that
+   split_ai_response parses. feed() returns (section, text) pairs where section is
+   None for resume text and the section name for analysis text. Text that may be
+   the start of a marker is held back until the next delta arrives.
+   """
+
+   def __init__(self):
+      self.section = None
+      self._buffer = ""
+
+   def feed(self, delta: str):
+      self._buffer += delta
+      events = []
+
+      match = SECTION_MARKER.search(self._buffer)
+      while match:
+         before = self._buffer[:match.start()]
+         if before:
+            events.append((self.section, before))
+         self.section = match.group(1).strip()
+         self._buffer = self._buffer[match.end():]
+         match = SECTION_MARKER.search(self._buffer)
+
+      hold = self._held_back_from()
+      if hold:
+         events.append((self.section, self._buffer[:hold]))
+         self._buffer = self._buffer[hold:]
+      return events
+
+   def flush(self):
+      events = [(self.section, self._buffer)] if self._buffer else []
+      self._buffer = ""
+      return events
+
+   def _held_back_from(self) -> int:
+      # An opened but unterminated marker
+      start = self._buffer.find(SECTION_MARKER_PREFIX)
+      if start != -1:
+         return start
+      # A trailing fragment such as "[SEC"
+      start = self._buffer.rfind("[")
+      if start != -1 and SECTION_MARKER_PREFIX.startswith(self._buffer[start:]):
+         return start
+      return len(self._buffer)
@@ -0,0 +1,343 @@
+import asyncio
+import datetime
+import re
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Optional, Tuple
+
+from fastapi import HTTPException
+from loguru import logger
+
+from services.blocking_io import run_blocking
+from services.credit_ledger import CreditReservation, credit_ledger
+from services.http_client import scraping_client
+from services.linkedin_scraper import LinkedInJobScraper as JobScraper
+from services.openai_optimizer import OpenAIOptimizer, SectionStreamSplitter
+from services.pdf_generator import PDFGenerator
+from services.pdf_render_service import pdf_renderer
+from services.resume_text_cache import resume_text_cache
+from services.resume_text_extractor import resume_text_extractor
+from services.supabase_client import supabase
+from services.upload_ingest import IngestedUpload
+
+# Progress callback signature: (stage, percent)
+ProgressCallback = Callable[[str, int], Awaitable[None]]
+
+
+@dataclass
+class OptimizationRequest:
+    """Everything the pipeline needs once the HTTP request has been read"""
+    user_id: str
+    filename: str
+    resume_file: IngestedUpload
+    job_url: Optional[str] = None
+    job_description: Optional[str] = None
+    credit_reservation: Optional[CreditReservation] = None
+
+
+def safe_resume_title(filename: str) -> str:
+    """Generate a storage-safe title from the uploaded filename"""
+    return re.sub(r'[^a-zA-Z0-9.-]', '_', filename)
+
+
+def create_processing_resume(request: OptimizationRequest) -> str:
+    """Insert a placeholder resume row in the 'processing' state and return its id"""
+    result = supabase.execute_sync(
+        supabase.table('resumes')
+        .insert({
+            'user_id': request.user_id,
+            'title': safe_resume_title(request.filename),
+            'job_url': request.job_url,
+            'status': 'processing'
+        })
+    )
+
+    if not result.data:
+        raise Exception("Failed to create resume record")
+
+    return result.data[0]['id']
+
+
+def mark_resume_failed(resume_id: str, user_id: str):
+    """Flag a processing resume row as failed so status lookups stop reporting progress"""
+    try:
+        supabase.execute_sync(
+            supabase.table('resumes')
+            .update({'status': 'failed'})
+            .eq('id', resume_id)
+            .eq('user_id', user_id)
+        )
+    except Exception as e:
+        logger.warning(f"Failed to mark resume {resume_id} as failed: {str(e)}")
+
+
+async def _report(progress: Optional[ProgressCallback], stage: str, percent: int):
+    if progress:
+        await progress(stage, percent)
+
+
+@dataclass
+class OptimizationInputs:
+    """Job details and resume text gathered before calling OpenAI"""
+    job_title: Optional[str]
+    company: Optional[str]
+    job_description: Optional[str]
+    resume_text: str
+
+
+async def prepare_inputs(
+    request: OptimizationRequest,
+    progress: Optional[ProgressCallback] = None
+) -> OptimizationInputs:
+    """Scrape the job posting (when a LinkedIn URL is given) and extract the resume text"""
+    job_title = None
+    company = None
+    job_description = request.job_description
+
+    # Get job details
+    if request.job_url and 'linkedin.com' in request.job_url:
+        await _report(progress, 'scraping', 10)
+        try:
+            scraper = JobScraper()
+            job_details = await scraping_client.run(scraper.extract_job_details, request.job_url)
+            if job_details:
+                job_title = job_details.get('job_title')
+                company = job_details.get('company')
+                job_description = job_details.get('job_description')
+        except Exception as e:
+            logger.warning(f"Error extracting job details: {str(e)}")
+
+    # Extract text from the PDF, DOCX or text upload, unless this exact file was
+    # seen before; the spooled upload is not needed past this point
+    await _report(progress, 'extracting', 20)
+    pdf_generator = PDFGenerator()
+    upload = request.resume_file
+    try:
+        resume_text = await run_blocking(
+            resume_text_cache.get_or_extract,
+            upload.sha256,
+            lambda: pdf_generator.clean_text(resume_text_extractor.extract(upload))
+        )
+    finally:
+        upload.close()
+    if not resume_text:
+        raise HTTPException(status_code=400, detail=f"Failed to extract text from {upload.format.upper()} resume")
+
+    return OptimizationInputs(job_title, company, job_description, resume_text)
+
+
+async def store_results(
+    request: OptimizationRequest,
+    inputs: OptimizationInputs,
+    resume_content: str,
+    analysis: str,
+    cover_letter: str,
+    cached: bool = False,
+    resume_id: Optional[str] = None
+) -> str:
+    """
+    Persist the optimized resume (completing the 'processing' row when resume_id is
+    given), record the job application and settle the reserved credit. Returns the resume id.
+    """
+    resume_data = {
+        'user_id': request.user_id,
+        'title': safe_resume_title(request.filename),
+        'job_url': request.job_url,
+        'content': resume_content,
+        'analysis': analysis,
+        'cover_letter': cover_letter,
+        'status': 'completed'
+    }
+
+    if resume_id:
+        resume_result = await supabase.execute(
+            supabase.table('resumes')
+            .update(resume_data)
+            .eq('id', resume_id)
+            .eq('user_id', request.user_id)
+        )
+    else:
+        resume_result = await supabase.execute(
+            supabase.table('resumes').insert(resume_data)
+        )
+
+    if not resume_result.data:
+        raise Exception("Failed to create resume record")
+
+    resume_id = resume_result.data[0]['id']
+
+    # Create job application if we have job details
+    if inputs.job_description:
+        try:
+            job_data = {
+                'user_id': request.user_id,
+                'resume_id': resume_id,
+                'job_title': inputs.job_title or 'Untitled Position',
+                'company': inputs.company or 'Unknown Company',
+                'job_description': inputs.job_description,
+                'job_url': request.job_url,
+                'status': 'pending'
+            }
+
+            await supabase.execute(
+                supabase.table('job_applications').insert(job_data)
+            )
+
+        except Exception as job_error:
+            logger.warning(f"Error creating job application: {str(job_error)}")
+
+    # Since optimization was successful, keep the reserved credit. Cached results
+    # are resubmissions of an optimization already paid for, so those are refunded.
+    if request.credit_reservation is not None:
+        if cached:
+            await credit_ledger.refund(request.credit_reservation)
+        else:
+            await credit_ledger.commit(request.credit_reservation)
+
+    return resume_id
+
+
+async def release_credit(request: OptimizationRequest):
+    """Refund the credit reserved for a request that did not complete"""
+    await credit_ledger.refund(request.credit_reservation)
+
+
+async def run_optimization(
+    request: OptimizationRequest,
+    resume_id: Optional[str] = None,
+    progress: Optional[ProgressCallback] = None,
+    include_pdf: bool = False
+) -> dict:
+    """
+    Run the full optimization pipeline: scrape the job posting, extract the resume
+    text, generate the optimized resume and cover letter, render the PDF and store
+    the results. When resume_id is given the existing 'processing' row is completed
+    instead of inserting a new one.
+
+    The result points at the PDF through `pdf_url` (served from the rendered-PDF
+    cache); the raw bytes are only added under `pdf_data` with include_pdf.
+    """
+    started = time.perf_counter()
+    try:
+        inputs = await prepare_inputs(request, progress)
+
+        # Get optimization suggestions and the cover letter in parallel
+        await _report(progress, 'optimizing', 30)
+        openai_optimizer = OpenAIOptimizer()
+        optimization_result, cover_letter, timings = await openai_optimizer.generate_resume_and_cover_letter(
+            inputs.job_title, inputs.company, inputs.resume_text, inputs.job_description
+        )
+        logger.info(f"OpenAI timings: {timings}")
+
+        # Split the result into resume content and analysis
+        resume_content, analysis = openai_optimizer.split_ai_response(optimization_result)
+
+        # Create PDF from optimized resume content only
+        await _report(progress, 'rendering', 80)
+        # Goes through the rendered-PDF cache so the first download is already warm
+        pdf_data, pdf_etag = await pdf_renderer.render_cached('resume', resume_content)
+
+        # Store the resume content in the resumes table
+        await _report(progress, 'saving', 90)
+        resume_id = await store_results(
+            request, inputs, resume_content, analysis, cover_letter,
+            cached=timings.get('cached'), resume_id=resume_id
+        )
+
+        logger.info(f"Optimization for resume {resume_id} finished in {time.perf_counter() - started:.2f}s")
+
+        result = {
+            'success': True,
+            'pdf_url': f"/api/resumes/{resume_id}/download",
+            'pdf_etag': pdf_etag,
+            'pdf_size': len(pdf_data),
+            'analysis': analysis,
+            'resume_id': resume_id,
+            'title': safe_resume_title(request.filename),
+            'created_at': datetime.datetime.now().isoformat(),
+            'job_url': request.job_url,
+            'status': 'completed',
+            'timings': timings
+        }
+        if include_pdf:
+            result['pdf_data'] = pdf_data
+        return result
+
+    except HTTPException:
+        await release_credit(request)
+        raise
+    except Exception as e:
+        logger.error(f"Error in optimization process: {str(e)}")
+        await release_credit(request)
+        raise HTTPException(status_code=500, detail=f"Optimization failed: {str(e)}")
+
+
+async def stream_optimization(request: OptimizationRequest) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Streaming variant of run_optimization. Yields (event, payload) pairs:
+    'resume' and 'analysis' deltas as OpenAI produces them, then a single 'done'
+    event carrying the stored resume id. The cover letter is generated alongside
+    the stream and the PDF is rendered on download rather than inline.
+
+    The reserved credit is refunded if the stream fails or the client goes away
+    before the result is stored.
+    """
+    started = time.perf_counter()
+    cover_letter_task = None
+    try:
+        inputs = await prepare_inputs(request)
+        openai_optimizer = OpenAIOptimizer()
+
+        cover_letter_task = asyncio.create_task(openai_optimizer.agenerate_cover_letter(
+            inputs.resume_text, inputs.job_description, inputs.job_title, inputs.company
+        ))
+        splitter = SectionStreamSplitter()
+        parts = []
+        optimization_cached = False
+        first_token_at = None
+
+        async for delta, cached in openai_optimizer.astream_with_openai(
+            inputs.job_title, inputs.company, inputs.resume_text, inputs.job_description
+        ):
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            optimization_cached = cached
+            parts.append(delta)
+            for section, text in splitter.feed(delta):
+                yield _section_event(section, text)
+
+        for section, text in splitter.flush():
+            yield _section_event(section, text)
+
+        resume_content, analysis = openai_optimizer.split_ai_response("".join(parts))
+        cover_letter, cover_letter_cached = await cover_letter_task
+
+        resume_id = await store_results(
+            request, inputs, resume_content, analysis, cover_letter,
+            cached=optimization_cached and cover_letter_cached
+        )
+    finally:
+        if cover_letter_task is not None and not cover_letter_task.done():
+            cover_letter_task.cancel()
+        await release_credit(request)
+
+    logger.info(
+        f"Streamed optimization for resume {resume_id}: first token after "
+        f"{(first_token_at or time.perf_counter()) - started:.2f}s, total {time.perf_counter() - started:.2f}s"
+    )
+
+    yield 'done', {
+        'success': True,
+        'resume_id': resume_id,
+        'analysis': analysis,
+        'title': safe_resume_title(request.filename),
+        'created_at': datetime.datetime.now().isoformat(),
+        'job_url': request.job_url,
+        'status': 'completed'
+    }
+
+
+def _section_event(section: Optional[str], text: str) -> Tuple[str, dict]:
+    if section is None:
+        return 'resume', {'delta': text}
+    return 'analysis', {'section': section, 'delta': text}
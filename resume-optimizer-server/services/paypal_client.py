@@ -0,0 +1,206 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+import httpx
+from loguru import logger
+
+
+# verify-webhook-signature field -> header PayPal sends it in
+WEBHOOK_SIGNATURE_HEADERS = {
+    'auth_algo': 'paypal-auth-algo',
+    'cert_url': 'paypal-cert-url',
+    'transmission_id': 'paypal-transmission-id',
+    'transmission_sig': 'paypal-transmission-sig',
+    'transmission_time': 'paypal-transmission-time'
+}
+
+
+class PayPalError(Exception):
+    """Raised when PayPal credentials are missing or a token cannot be obtained"""
+
+
+class PayPalClient:
+    """
+    Shared PayPal REST client.
+
+    All calls go through one pooled `httpx.AsyncClient`, so repeated requests
+    reuse keep-alive TLS connections instead of opening a client per call.
+
+    The OAuth access token is cached for its `expires_in`. Once it is within
+    `refresh_ahead` seconds of expiry, callers keep using it while a single
+    background refresh fetches the next one; only a missing or expired token
+    makes callers wait, and concurrent waiters share that one token request.
+    A 401 drops the cached token and retries the call once with a fresh one.
+    """
+
+    def __init__(self, api_url: Optional[str], client_id: Optional[str], client_secret: Optional[str],
+                 timeout: float = 15.0, pool_size: int = 10, refresh_ahead: float = 300.0,
+                 expiry_margin: float = 30.0):
+        self.api_url = (api_url or '').rstrip('/')
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.refresh_ahead = refresh_ahead
+        self.expiry_margin = expiry_margin
+        self._client: Optional[httpx.AsyncClient] = None
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+        self._refreshing: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+        self.token_requests = 0
+        self.token_hits = 0
+        self.token_waits = 0
+        self.background_refreshes = 0
+        self.token_errors = 0
+        self.api_requests = 0
+        self.api_errors = 0
+        self.unauthorized_retries = 0
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.api_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+                headers={'Accept': 'application/json'}
+            )
+        return self._client
+
+    async def _fetch_token(self) -> str:
+        if not self.client_id or not self.client_secret:
+            raise PayPalError("Missing PayPal client ID or secret in environment variables.")
+
+        self._count('token_requests')
+        response = await self.client.post(
+            '/v1/oauth2/token',
+            auth=(self.client_id, self.client_secret),
+            headers={'Content-Type': 'application/x-www-form-urlencoded'},
+            content='grant_type=client_credentials'
+        )
+        if response.status_code != 200:
+            raise PayPalError(f"Failed to generate token: {response.status_code}, {response.text}")
+
+        payload = response.json()
+        token = payload.get('access_token')
+        if not token:
+            raise PayPalError("PayPal token response did not include an access token")
+        fetched_at = time.monotonic()
+        expires_in = float(payload.get('expires_in', 0))
+        self._token = token
+        self._expires_at = fetched_at + max(expires_in - self.expiry_margin, 0)
+        self._refresh_at = fetched_at + max(expires_in - self.refresh_ahead, 0)
+        return token
+
+    def _on_refreshed(self, task: asyncio.Task):
+        self._refreshing = None
+        if not task.cancelled() and task.exception() is not None:
+            self._count('token_errors')
+            logger.warning(f"PayPal token refresh failed: {str(task.exception())}")
+
+    def _start_refresh(self) -> asyncio.Task:
+        """The running token request, starting one if none is in flight"""
+        if self._refreshing is None:
+            self._refreshing = asyncio.ensure_future(self._fetch_token())
+            self._refreshing.add_done_callback(self._on_refreshed)
+        return self._refreshing
+
+    async def access_token(self) -> str:
+        now = time.monotonic()
+        if self._token and now < self._expires_at:
+            if now >= self._refresh_at:
+                if self._refreshing is None:
+                    self._count('background_refreshes')
+                self._start_refresh()
+            self._count('token_hits')
+            return self._token
+
+        self._count('token_waits')
+        return await asyncio.shield(self._start_refresh())
+
+    def invalidate_token(self, token: str):
+        # Only drop the token that was rejected, not one a concurrent refresh just stored
+        if self._token == token:
+            self._token = None
+            self._expires_at = self._refresh_at = 0.0
+
+    async def request(self, method: str, path: str, access_token: Optional[str] = None, **kwargs) -> httpx.Response:
+        """
+        Call the PayPal API with the cached app token. `access_token` overrides
+        it for calls made on behalf of a buyer token from the frontend.
+        """
+        headers = {'Content-Type': 'application/json', **kwargs.pop('headers', {})}
+        for attempt in range(2):
+            token = access_token or await self.access_token()
+            self._count('api_requests')
+            try:
+                response = await self.client.request(
+                    method, path, headers={**headers, 'Authorization': f'Bearer {token}'}, **kwargs
+                )
+            except httpx.HTTPError:
+                self._count('api_errors')
+                raise
+            if response.status_code != 401 or access_token or attempt:
+                return response
+            self._count('unauthorized_retries')
+            self.invalidate_token(token)
+        return response
+
+    async def get_subscription(self, subscription_id: str) -> httpx.Response:
+        return await self.request('GET', f'/v1/billing/subscriptions/{subscription_id}')
+
+    async def cancel_subscription(self, subscription_id: str, reason: str) -> httpx.Response:
+        return await self.request('POST', f'/v1/billing/subscriptions/{subscription_id}/cancel', json={'reason': reason})
+
+    async def verify_webhook_signature(self, webhook_id: str, headers, body: bytes) -> bool:
+        """Ask PayPal whether `body` was signed for our webhook, given the delivery's headers"""
+        fields = {name: headers.get(header) for name, header in WEBHOOK_SIGNATURE_HEADERS.items()}
+        if not all(fields.values()):
+            return False
+        fields['webhook_id'] = webhook_id
+        # Splice in the raw event: re-serialising the parsed JSON can change its
+        # bytes and make a genuine signature fail to verify
+        payload = json.dumps(fields)[:-1].encode() + b', "webhook_event": ' + body + b'}'
+        response = await self.request('POST', '/v1/notifications/verify-webhook-signature', content=payload)
+        return response.status_code == 200 and response.json().get('verification_status') == 'SUCCESS'
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'token_cached': self._token is not None and time.monotonic() < self._expires_at,
+                'token_expires_in': round(max(self._expires_at - time.monotonic(), 0), 1),
+                'token_requests': self.token_requests,
+                'token_hits': self.token_hits,
+                'token_waits': self.token_waits,
+                'background_refreshes': self.background_refreshes,
+                'token_errors': self.token_errors,
+                'api_requests': self.api_requests,
+                'api_errors': self.api_errors,
+                'unauthorized_retries': self.unauthorized_retries
+            }
+
+    async def aclose(self):
+        if self._client is not None:
+            logger.info("Closing PayPal HTTP client")
+            await self._client.aclose()
+            self._client = None
+
+
+paypal_client = PayPalClient(
+    api_url=os.getenv('PAYPAL_API_URL'),
+    client_id=os.getenv('PAYPAL_CLIENT_ID'),
+    client_secret=os.getenv('PAYPAL_CLIENT_SECRET'),
+    timeout=float(os.getenv('PAYPAL_TIMEOUT', 15)),
+    pool_size=int(os.getenv('PAYPAL_POOL_SIZE', 10)),
+    refresh_ahead=float(os.getenv('PAYPAL_TOKEN_REFRESH_AHEAD', 300))
+)
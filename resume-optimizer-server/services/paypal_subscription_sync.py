@@ -0,0 +1,214 @@
+import asyncio
+import datetime
+import os
+import threading
+from typing import Optional
+
+from fastapi import HTTPException
+from loguru import logger
+
+from services.account_cache import account_cache
+from services.paypal_client import paypal_client
+from services.supabase_client import supabase
+
+SUBSCRIPTION_EVENT_PREFIX = 'BILLING.SUBSCRIPTION.'
+
+# PayPal status -> subscriptions.status; pending states leave our status alone
+PAYPAL_STATUSES = {
+    'ACTIVE': 'active',
+    'SUSPENDED': 'suspended',
+    'CANCELLED': 'cancelled',
+    'EXPIRED': 'expired'
+}
+INACTIVE_STATUSES = ('suspended', 'cancelled', 'expired')
+
+
+class WebhookVerificationError(HTTPException):
+    def __init__(self, detail: str = "Invalid PayPal webhook signature"):
+        super().__init__(status_code=400, detail=detail)
+
+
+class PayPalSubscriptionSync:
+    """
+    Keeps the subscriptions table in step with PayPal so reads never have to
+    ask PayPal themselves.
+
+    Webhook deliveries are verified with PayPal, claimed by event id in
+    paypal_webhook_events (redeliveries are acknowledged without being applied
+    again) and applied to the subscription with the matching
+    paypal_subscription_id. Each row remembers the PayPal time of the status
+    it holds, so events arriving out of order cannot roll it back.
+
+    Webhooks can be lost, so a background reconciler also walks active and
+    suspended PayPal subscriptions, least recently checked first, and applies
+    whatever PayPal currently reports.
+    """
+
+    def __init__(self, webhook_id: Optional[str], reconcile_interval: float = 900, reconcile_batch: int = 50,
+                 reconcile_max_age: float = 21600):
+        self.webhook_id = webhook_id
+        self.reconcile_interval = reconcile_interval
+        self.reconcile_batch = reconcile_batch
+        self.reconcile_max_age = reconcile_max_age
+        self._reconciler: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+        self.events_processed = 0
+        self.events_duplicate = 0
+        self.events_ignored = 0
+        self.events_failed = 0
+        self.signature_failures = 0
+        self.reconciled = 0
+        self.reconcile_changes = 0
+        self.reconcile_errors = 0
+
+    def _count(self, counter: str, amount: int = 1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    async def verify(self, headers, body: bytes):
+        if not self.webhook_id:
+            raise HTTPException(status_code=503, detail="PayPal webhooks are not configured")
+        if not await paypal_client.verify_webhook_signature(self.webhook_id, headers, body):
+            self._count('signature_failures')
+            raise WebhookVerificationError()
+
+    async def apply_resource(self, resource: dict, status_at: Optional[str] = None) -> int:
+        """
+        Store a PayPal subscription resource on its row unless the row already
+        holds a newer state. Returns the number of rows updated.
+        """
+        now = datetime.datetime.utcnow().isoformat()
+        update = {
+            'paypal_resource': resource,
+            'paypal_status_at': status_at or resource.get('status_update_time') or now,
+            'updated_at': now
+        }
+        status = PAYPAL_STATUSES.get(str(resource.get('status', '')).upper())
+        if status:
+            update['status'] = status
+            if status in INACTIVE_STATUSES:
+                update['cancelled_at'] = now
+
+        result = await supabase.execute(
+            supabase.table('subscriptions')
+            .update(update)
+            .eq('paypal_subscription_id', resource['id'])
+            .lt('paypal_status_at', update['paypal_status_at'])
+        )
+        for row in result.data or []:
+            account_cache.invalidate('subscription', row['user_id'])
+        return len(result.data or [])
+
+    async def handle_event(self, event: dict) -> str:
+        """Apply one verified webhook event; returns 'processed', 'duplicate' or 'ignored'"""
+        event_type = event.get('event_type', '')
+        resource = event.get('resource') or {}
+        if not event_type.startswith(SUBSCRIPTION_EVENT_PREFIX) or not resource.get('id'):
+            self._count('events_ignored')
+            return 'ignored'
+
+        # Claim the event id; an empty result means it was delivered before
+        claim = await supabase.execute(
+            supabase.table('paypal_webhook_events').upsert({
+                'event_id': event['id'],
+                'event_type': event_type,
+                'resource_id': resource['id']
+            }, ignore_duplicates=True)
+        )
+        if not claim.data:
+            self._count('events_duplicate')
+            return 'duplicate'
+
+        try:
+            await self.apply_resource(resource, resource.get('status_update_time') or event.get('create_time'))
+        except Exception:
+            # Release the claim so PayPal's retry of this delivery is applied
+            self._count('events_failed')
+            await supabase.execute(
+                supabase.table('paypal_webhook_events').delete().eq('event_id', event['id'])
+            )
+            raise
+        self._count('events_processed')
+        return 'processed'
+
+    async def reconcile_once(self) -> int:
+        """Check the least recently synced subscriptions against PayPal; returns how many were checked"""
+        rows = await supabase.execute(
+            supabase.table('subscriptions')
+            .select('id, paypal_subscription_id, paypal_synced_at')
+            .in_('status', ['active', 'suspended'])
+            .neq('paypal_subscription_id', '')
+            .order('paypal_synced_at', nullsfirst=True)
+            .limit(self.reconcile_batch)
+        )
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cutoff = now - datetime.timedelta(seconds=self.reconcile_max_age)
+        checked = 0
+        for row in rows.data or []:
+            synced_at = row.get('paypal_synced_at')
+            if synced_at and datetime.datetime.fromisoformat(synced_at) > cutoff:
+                break
+            try:
+                response = await paypal_client.get_subscription(row['paypal_subscription_id'])
+                if response.status_code == 200:
+                    self._count('reconcile_changes', await self.apply_resource(response.json()))
+                else:
+                    logger.warning(
+                        f"PayPal returned {response.status_code} for subscription {row['paypal_subscription_id']}"
+                    )
+                await supabase.execute(
+                    supabase.table('subscriptions')
+                    .update({'paypal_synced_at': now.isoformat()})
+                    .eq('id', row['id'])
+                )
+                checked += 1
+            except Exception as e:
+                self._count('reconcile_errors')
+                logger.warning(f"Failed to reconcile subscription {row['id']}: {str(e)}")
+        self._count('reconciled', checked)
+        return checked
+
+    async def _reconcile(self):
+        while True:
+            try:
+                await self.reconcile_once()
+            except Exception as e:
+                self._count('reconcile_errors')
+                logger.warning(f"PayPal subscription reconciliation failed: {str(e)}")
+            await asyncio.sleep(self.reconcile_interval)
+
+    def start(self):
+        # Without API credentials there is nothing to reconcile against
+        if not paypal_client.client_id:
+            return
+        if self.reconcile_interval > 0 and self._reconciler is None:
+            self._reconciler = asyncio.create_task(self._reconcile())
+
+    async def stop(self):
+        if self._reconciler is None:
+            return
+        self._reconciler.cancel()
+        await asyncio.gather(self._reconciler, return_exceptions=True)
+        self._reconciler = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'webhook_configured': bool(self.webhook_id),
+                'events_processed': self.events_processed,
+                'events_duplicate': self.events_duplicate,
+                'events_ignored': self.events_ignored,
+                'events_failed': self.events_failed,
+                'signature_failures': self.signature_failures,
+                'reconciled': self.reconciled,
+                'reconcile_changes': self.reconcile_changes,
+                'reconcile_errors': self.reconcile_errors
+            }
+
+
+paypal_subscription_sync = PayPalSubscriptionSync(
+    webhook_id=os.getenv('PAYPAL_WEBHOOK_ID'),
+    reconcile_interval=float(os.getenv('PAYPAL_RECONCILE_INTERVAL', 900)),
+    reconcile_batch=int(os.getenv('PAYPAL_RECONCILE_BATCH', 50)),
+    reconcile_max_age=float(os.getenv('PAYPAL_RECONCILE_MAX_AGE', 21600))
+)
@@ -1,250 +1,54 @@
 from loguru import logger
-from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, ListFlowable, ListItem
-from reportlab.lib.units import inch
 import os
-import pdfplumber
 import uuid
 import io
-import re
 from datetime import datetime
 import logging
-import PyPDF2
 from fastapi import UploadFile
+from services.pdf_templates import template_registry
+from services.pdf_text_extractor import pdf_text_extractor
+from services.resume_markup import NAME, SECTION, SUBHEADING, parse_resume_markup
+from services.upload_ingest import IngestedUpload, upload_ingestor
 
-class PDFGenerator:
-    def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
-
-    def _setup_custom_styles(self):
-        """Set up all custom styles for the PDF"""
-        # Define modern color scheme
-        self.colors = {
-            'primary': colors.HexColor('#1a365d'),    # Deep blue
-            'secondary': colors.HexColor('#1b3857'),  # Medium blue
-            'accent': colors.HexColor('#4299e1'),     # Light blue
-            'text': colors.HexColor('#2d3748'),       # Dark gray
-            'subtext': colors.HexColor('#718096')     # Medium gray
-        }
-
-        # Remove existing styles if they exist
-        style_names = ['Name', 'JobTitle', 'ContactInfo', 'SectionHeading', 'NormalText', 
-                      'BulletText', 'CompanyName', 'BoldText']
-        for style_name in style_names:
-            if style_name in self.styles:
-                del self.styles[style_name]
-
-        # Name style - centered
-        self.styles.add(ParagraphStyle(
-            name='Name',
-            parent=self.styles['Heading1'],
-            fontSize=20,
-            spaceAfter=12,
-            textColor=self.colors['primary'],
-            fontName='Helvetica-Bold',
-            alignment=1  # Center alignment
-        ))
-
-        # Job Title style
-        self.styles.add(ParagraphStyle(
-            name='JobTitle',
-            parent=self.styles['Normal'],
-            fontSize=12,
-            spaceAfter=10,
-            textColor=self.colors['secondary'],
-            fontName='Helvetica-Bold',
-            alignment=1
-        ))
-
-        # Contact info style
-        self.styles.add(ParagraphStyle(
-            name='ContactInfo',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=3,
-            fontName='Helvetica',
-            textColor=self.colors['secondary'],
-            alignment=1
-        ))
-
-        # Section Heading style (for ***TITLE***)
-        self.styles.add(ParagraphStyle(
-            name='SectionHeading',
-            parent=self.styles['Heading2'],
-            fontSize=12,
-            spaceBefore=12,
-            spaceAfter=4,
-            textColor=self.colors['primary'],
-            fontName='Helvetica-Bold'
-        ))
-
-        # Sub Heading style (for **Title**)
-        self.styles.add(ParagraphStyle(
-            name='SubHeading',
-            parent=self.styles['Normal'],
-            fontSize=11,
-            spaceBefore=6,
-            spaceAfter=4,
-            textColor=self.colors['secondary'],
-            fontName='Helvetica-Bold'
-        ))
-
-        # Bold Text style (for *text*)
-        self.styles.add(ParagraphStyle(
-            name='BoldText',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=4,
-            fontName='Helvetica-Bold',
-            textColor=self.colors['text']
-        ))
-
-        # Normal text style
-        self.styles.add(ParagraphStyle(
-            name='NormalText',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=4,
-            fontName='Helvetica'
-        ))
-
-        # Bullet point style
-        self.styles.add(ParagraphStyle(
-            name='BulletText',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=2,
-            fontName='Helvetica',
-            leading=12,
-            leftIndent=20
-        ))
-
-    def _is_section_header(self, line, previous_line="", next_line=""):
-        """
-        Determine if a line is a section header based on its characteristics and context.
-        """
-        line = line.strip()
-        if not line:
-            return False
-            
-        # Skip obvious non-headers
-        if line.startswith('•') or line.startswith('-') or ':' in line:
-            return False
-        
-        # Check length (most section headers are 1-4 words)
-        words = line.split()
-        if len(words) > 4:
-            return False
-            
-        # Check formatting characteristics
-        is_all_caps = line.isupper()
-        is_title_case = line.istitle()
-        
-        # Check context
-        next_line = next_line.strip()
-        previous_line = previous_line.strip()
-        
-        # Headers often have different formatting than surrounding text
-        followed_by_bullet = next_line.startswith('•') or next_line.startswith('-')
-        preceded_by_space = not previous_line
-        
-        # Scoring system for header likelihood
-        score = 0
-        if is_all_caps:
-            score += 2
-        if is_title_case:
-            score += 1
-        if followed_by_bullet:
-            score += 2
-        if preceded_by_space:
-            score += 1
-        if len(words) <= 2:
-            score += 1
-            
-        return score >= 3
-
-    def _process_bold_text(self, text):
-        """Process bold text markers in the content"""
-        # Handle **text** format
-        text = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', text)
-        # Handle __text__ format
-        text = re.sub(r'__(.*?)__', r'<b>\1</b>', text)
-        return text
-
-    def _process_text_formatting(self, line: str) -> tuple[str, str]:
-        """Process text formatting and return the processed text and appropriate style name"""
-        
-        line = line.strip()
-        
-        # Handle section titles (***TITLE***)
-        if line.startswith('***') and line.endswith('***'):
-            title = line[3:-3].strip()  # Remove *** from both ends
-            return title, 'SectionHeading'
-        
-        # Handle sub-titles (**Title**)
-        if line.startswith('**') and line.endswith('**'):
-            subtitle = line[2:-2].strip()  # Remove ** from both ends
-            return subtitle, 'SubHeading'
-        
-        # Handle bold text (*text*)
-        if '*' in line:
-            # Find all text between * and replace with just the text
-            line = re.sub(r'\*(.*?)\*', r'\1', line)
-            return line, 'BoldText'
-        
-        return line, 'NormalText'
+_HEADING_STYLES = {NAME: 'Name', SECTION: 'SectionHeading', SUBHEADING: 'SubHeading'}
 
-    def create_pdf_from_text(self, text):
+class PDFGenerator:
+    def __init__(self, theme: str = None):
+        # Styles come from the process-wide template registry instead of being rebuilt per instance
+        self.template = template_registry.resume(theme)
+        self.styles = self.template.styles
+        self.colors = self.template.colors
+
+    @staticmethod
+    def _block_style(block) -> str:
+        """Paragraph style for a parsed resume block"""
+        # Lines carrying *emphasis* markers are set bold as a whole
+        return _HEADING_STYLES.get(block.kind) or ('BoldText' if block.markup else 'NormalText')
+
+    def create_pdf_from_text(self, text, theme: str = None):
         buffer = io.BytesIO()
         try:
             # Log the input text length for debugging
             logger.info(f"Creating PDF from text of length: {len(text)}")
-            
-            doc = SimpleDocTemplate(
-                buffer,
-                pagesize=letter,
-                leftMargin=0.75*inch,
-                rightMargin=0.75*inch,
-                topMargin=0.75*inch,
-                bottomMargin=0.75*inch
-            )
+
+            template = template_registry.resume(theme) if theme else self.template
+            styles = template.styles
+            doc = SimpleDocTemplate(buffer, **template.doc_kwargs())
             
             story = []
-            lines = text.split('\n')
-            is_first_content = True
+            document = parse_resume_markup(text)
             
-            # Log number of lines being processed
-            logger.info(f"Processing {len(lines)} lines")
+            # Log number of blocks being processed
+            logger.info(f"Processing {len(document.blocks)} blocks")
             
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Skip separator lines and age
-                if (line.startswith('---') or 
-                    line.startswith('===') or 
-                    line == '---' or 
-                    re.match(r'^\d+\s*yo\s*$', line, re.IGNORECASE)):
-                    continue
-                    
-                # Process the line formatting
-                processed_text, style_name = self._process_text_formatting(line)
-                
-                # Handle first line (name) specially
-                if is_first_content:
-                    story.append(Paragraph(processed_text, self.styles['Name']))
-                    is_first_content = False
-                    continue
-                
-                # Add the processed text with appropriate style
-                story.append(Paragraph(processed_text, self.styles[style_name]))
+            for block in document.blocks:
+                style_name = self._block_style(block)
+                story.append(Paragraph(block.text, styles[style_name]))
                 
                 # Add extra space after sections
-                if style_name == 'SectionHeading':
+                if block.kind == SECTION:
                     story.append(Spacer(1, 8))
             
             # Log before building the PDF
@@ -284,13 +88,22 @@ class PDFGenerator:
         return '\n'.join(cleaned_lines)
 
     async def extract_text_from_pdf(self, file_storage: UploadFile) -> str:
+        with await upload_ingestor.ingest(file_storage, formats=('pdf',)) as upload:
+            return self.extract_text_from_upload(upload)
+
+    def extract_text_from_upload(self, upload: IngestedUpload) -> str:
+        """Extract text from an ingested upload without reading it into a bytes object"""
+        with upload.open() as stream:
+            return self.extract_text_from_stream(stream)
+
+    def extract_text_from_bytes(self, content: bytes) -> str:
+        """Extract text from raw PDF bytes"""
+        return self.extract_text_from_stream(content)
+
+    def extract_text_from_stream(self, stream) -> str:
+        """Extract text from PDF bytes or a seekable binary stream (BytesIO, mmap, file)"""
         try:
-            pdf_bytes = io.BytesIO(await file_storage.read())
-            pdf_reader = PyPDF2.PdfReader(pdf_bytes)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-            return text
+            return pdf_text_extractor.extract(stream)
         except Exception as e:
             logging.error(f"PDF extraction error: {str(e)}")
             raise ValueError(f"Failed to extract text from PDF: {str(e)}")
@@ -339,25 +152,9 @@ class PDFGenerator:
         try:
             buffer = io.BytesIO()
             
-            doc = SimpleDocTemplate(
-                buffer,
-                pagesize=letter,
-                leftMargin=1*inch,
-                rightMargin=1*inch,
-                topMargin=1*inch,
-                bottomMargin=1*inch
-            )
-            
-            styles = getSampleStyleSheet()
-            normal_style = ParagraphStyle(
-                'CoverLetterBody',
-                parent=styles['Normal'],
-                fontSize=12,
-                fontName='Helvetica',
-                leading=16,
-                spaceBefore=12,
-                spaceAfter=12
-            )
+            template = template_registry.cover_letter
+            doc = SimpleDocTemplate(buffer, **template.doc_kwargs())
+            normal_style = template.styles['CoverLetterBody']
             
             story = []
             paragraphs = text.strip().split('\n\n')
@@ -0,0 +1,288 @@
+import asyncio
+import math
+import multiprocessing
+import os
+import statistics
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from loguru import logger
+
+from services.blocking_io import run_blocking
+from services.cache import CacheBackend, DiskCache, content_hash
+from services.pdf_generator import PDFGenerator
+from services.pdf_templates import template_registry
+
+# Bump when PDFGenerator output changes so cached PDFs get re-rendered
+RENDER_VERSION = '1'
+
+RENDER_KINDS = ('resume', 'cover_letter')
+
+# One generator per worker process; styles come from the shared template registry
+_worker_generator: Optional[PDFGenerator] = None
+
+
+def _init_worker():
+    global _worker_generator
+    _worker_generator = PDFGenerator()
+
+
+def _render(kind: str, text: str, theme: Optional[str] = None) -> Tuple[bytes, float, float]:
+    """Runs inside a worker: returns (pdf, wall-clock start, render seconds)"""
+    global _worker_generator
+    if _worker_generator is None:
+        _init_worker()
+    started_at = time.time()
+    started = time.perf_counter()
+    if kind == 'resume':
+        pdf_data = _worker_generator.create_pdf_from_text(text, theme=theme)
+    else:
+        pdf_data = _worker_generator.create_cover_letter_pdf(text)
+    return pdf_data, started_at, time.perf_counter() - started
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _resolve_theme(kind: str, theme: Optional[str]) -> Optional[str]:
+    """Resume renders always carry a concrete theme name; cover letters have none"""
+    if kind != 'resume':
+        return None
+    return template_registry.resume(theme).name
+
+
+def rendered_pdf_key(kind: str, text: str, theme: Optional[str] = None) -> str:
+    return content_hash('pdf', RENDER_VERSION, kind, _resolve_theme(kind, theme), text)
+
+
+class RenderQueueFullError(HTTPException):
+    """503 with a Retry-After hint, raised when the render queue is saturated"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=503,
+            detail="PDF rendering is busy, please retry shortly",
+            headers={'Retry-After': str(retry_after)}
+        )
+
+
+class PDFRenderService:
+    """
+    Renders resume and cover-letter PDFs on a pool of worker processes.
+
+    ReportLab's `doc.build` is CPU-bound, so running it on threads still
+    serialises on the GIL; separate processes let rendering scale with cores.
+    At most `max_pending` renders may be queued or running; beyond that
+    callers get a RenderQueueFullError (503 + Retry-After) instead of piling
+    up. A render that times out keeps its slot until the worker actually
+    finishes, so abandoned renders still count against `max_pending`. With
+    `max_workers=0` renders fall back to the blocking I/O thread pool.
+
+    `render_cached` keys rendered PDFs by a hash of the text, so repeat
+    downloads are served from `cache` without touching ReportLab and can be
+    answered with a 304 via the matching ETag.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 8, render_timeout: float = 60.0,
+                 start_method: Optional[str] = None, sample_size: int = 200,
+                 cache: Optional[CacheBackend] = None):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.render_timeout = render_timeout
+        self.start_method = start_method
+        self.cache = cache
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._inflight = {}
+        self.pending = 0
+        self.completed = 0
+        self.errors = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._render_ms = deque(maxlen=sample_size)
+        self._queue_ms = deque(maxlen=sample_size)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            context = multiprocessing.get_context(self.start_method) if self.start_method else None
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=context,
+                initializer=_init_worker
+            )
+        return self._executor
+
+    async def start(self):
+        """Spin the worker processes up so the first render does not pay for it"""
+        if self.max_workers <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        pids = await asyncio.gather(*(loop.run_in_executor(executor, _ping) for _ in range(self.max_workers)))
+        logger.info(f"PDF render pool started with {len(set(pids))} worker processes")
+
+    def _release_slot(self, future: asyncio.Future):
+        self.pending -= 1
+        # Nobody awaits a render abandoned on timeout, so mark its failure as retrieved
+        if not future.cancelled():
+            future.exception()
+
+    def _retry_after(self) -> int:
+        """Rough seconds until a slot frees up, from recent render times"""
+        average = statistics.fmean(self._render_ms) / 1000 if self._render_ms else 1.0
+        waves = self.pending / max(self.max_workers, 1)
+        return max(1, math.ceil(average * waves))
+
+    async def render(self, kind: str, text: str, theme: Optional[str] = None) -> bytes:
+        if kind not in RENDER_KINDS:
+            raise ValueError(f"Unknown render kind: {kind}")
+        theme = _resolve_theme(kind, theme)
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise RenderQueueFullError(self._retry_after())
+
+        self.pending += 1
+        submitted_at = time.time()
+        future = None
+        try:
+            if self.max_workers <= 0:
+                pdf_data, started_at, render_seconds = await run_blocking(_render, kind, text, theme)
+            else:
+                loop = asyncio.get_running_loop()
+                executor = self._get_executor()
+                future = loop.run_in_executor(executor, _render, kind, text, theme)
+                future.add_done_callback(self._release_slot)
+                # Shielded so a timeout stops the wait but not the slot, which is
+                # only released once the worker is done with the render
+                pdf_data, started_at, render_seconds = await asyncio.wait_for(
+                    asyncio.shield(future), self.render_timeout
+                )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self.errors += 1
+            logger.error(f"Rendering {kind} PDF timed out after {self.render_timeout}s")
+            raise
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); replace the pool so later renders can proceed
+            self.errors += 1
+            logger.error("PDF render pool broke, restarting it")
+            if self._executor is executor:
+                self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            if future is None:
+                self.pending -= 1
+
+        if not pdf_data:
+            self.errors += 1
+            raise ValueError(f"Rendering {kind} PDF produced no output")
+
+        self.completed += 1
+        self._queue_ms.append(max(started_at - submitted_at, 0.0) * 1000)
+        self._render_ms.append(render_seconds * 1000)
+        return pdf_data
+
+    @staticmethod
+    def etag(kind: str, text: str, theme: Optional[str] = None) -> str:
+        return f'"{rendered_pdf_key(kind, text, theme)}"'
+
+    async def render_cached(self, kind: str, text: str, theme: Optional[str] = None) -> Tuple[bytes, str]:
+        """
+        Return (pdf, etag), rendering only when the PDF for this exact text is
+        not cached yet. Concurrent requests for the same PDF share one render.
+        """
+        key = rendered_pdf_key(kind, text, theme)
+        etag = f'"{key}"'
+        if self.cache is None:
+            return await self.render(kind, text, theme), etag
+
+        pdf_data = await run_blocking(self.cache.get, key)
+        if pdf_data is not None:
+            return pdf_data, etag
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending), etag
+
+        future = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting on the future, so mark failures as retrieved
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            pdf_data = await self.render(kind, text, theme)
+            try:
+                await run_blocking(self.cache.set, key, pdf_data)
+            except Exception as e:
+                logger.warning(f"Failed to cache rendered PDF: {str(e)}")
+            future.set_result(pdf_data)
+            return pdf_data, etag
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def render_resume(self, text: str, theme: Optional[str] = None) -> bytes:
+        return await self.render('resume', text, theme)
+
+    async def render_cover_letter(self, text: str) -> bytes:
+        return await self.render('cover_letter', text)
+
+    @staticmethod
+    def _percentile(samples, fraction: float) -> float:
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 2)
+
+    def stats(self) -> dict:
+        return {
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'pending': self.pending,
+            'completed': self.completed,
+            'errors': self.errors,
+            'rejected': self.rejected,
+            'timeouts': self.timeouts,
+            'render_ms_p50': self._percentile(self._render_ms, 0.5),
+            'render_ms_p95': self._percentile(self._render_ms, 0.95),
+            'queue_ms_p50': self._percentile(self._queue_ms, 0.5),
+            'queue_ms_p95': self._percentile(self._queue_ms, 0.95),
+            'cache': self.cache.stats() if self.cache is not None else None
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            logger.info("Shutting down PDF render pool")
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+# A relative PDF_CACHE_DIR is taken from the server directory, not the working directory
+_pdf_cache_dir = Path(__file__).resolve().parent.parent / os.getenv('PDF_CACHE_DIR', '.pdf_cache')
+
+_render_workers = int(os.getenv('PDF_RENDER_WORKERS', os.cpu_count() or 2))
+
+pdf_renderer = PDFRenderService(
+    max_workers=_render_workers,
+    max_pending=int(os.getenv('PDF_RENDER_MAX_PENDING', max(_render_workers, 1) * 4)),
+    render_timeout=float(os.getenv('PDF_RENDER_TIMEOUT', 60)),
+    start_method=os.getenv('PDF_RENDER_START_METHOD') or None,
+    cache=DiskCache(
+        directory=str(_pdf_cache_dir),
+        max_bytes=int(os.getenv('PDF_CACHE_MAX_MB', 512)) * 1024 * 1024,
+        default_ttl=float(os.getenv('PDF_CACHE_TTL', 30 * 86400))
+    )
+)
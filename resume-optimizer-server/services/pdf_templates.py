@@ -0,0 +1,243 @@
+import os
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+
+# Only read while building templates, never handed out
+_SAMPLE_STYLES = getSampleStyleSheet()
+
+
+@dataclass(frozen=True)
+class ResumeTheme:
+    """Visual parameters of a resume theme; styles are derived from these"""
+    name: str
+    label: str
+    primary: str
+    secondary: str
+    accent: str
+    text: str
+    subtext: str
+    font: str = 'Helvetica'
+    bold_font: str = 'Helvetica-Bold'
+    base_size: float = 10
+    name_size: float = 20
+    heading_size: float = 12
+    margin: float = 0.75
+
+
+@dataclass(frozen=True)
+class PDFTemplate:
+    """
+    Page geometry plus a read-only name -> ParagraphStyle mapping. Templates
+    are built once and shared by every render in the process, so the styles
+    must be treated as immutable.
+    """
+    name: str
+    styles: Mapping[str, ParagraphStyle]
+    colors: Mapping[str, colors.Color]
+    pagesize: Tuple[float, float]
+    margins: Tuple[float, float, float, float]  # left, right, top, bottom in points
+
+    def doc_kwargs(self) -> dict:
+        left, right, top, bottom = self.margins
+        return {
+            'pagesize': self.pagesize,
+            'leftMargin': left,
+            'rightMargin': right,
+            'topMargin': top,
+            'bottomMargin': bottom
+        }
+
+
+THEMES: Dict[str, ResumeTheme] = {
+    theme.name: theme for theme in (
+        ResumeTheme(
+            name='classic',
+            label='Classic',
+            primary='#1a365d',    # Deep blue
+            secondary='#1b3857',  # Medium blue
+            accent='#4299e1',     # Light blue
+            text='#2d3748',       # Dark gray
+            subtext='#718096'     # Medium gray
+        ),
+        ResumeTheme(
+            name='modern',
+            label='Modern',
+            primary='#0f766e',
+            secondary='#134e4a',
+            accent='#14b8a6',
+            text='#1f2937',
+            subtext='#6b7280',
+            name_size=22,
+            margin=0.7
+        ),
+        ResumeTheme(
+            name='minimal',
+            label='Minimal',
+            primary='#111111',
+            secondary='#333333',
+            accent='#555555',
+            text='#222222',
+            subtext='#777777',
+            font='Times-Roman',
+            bold_font='Times-Bold',
+            base_size=10.5,
+            name_size=18,
+            heading_size=11.5,
+            margin=0.9
+        ),
+    )
+}
+
+DEFAULT_THEME = os.getenv('PDF_DEFAULT_THEME', 'classic')
+
+
+def build_resume_template(theme: ResumeTheme) -> PDFTemplate:
+    palette = {
+        'primary': colors.HexColor(theme.primary),
+        'secondary': colors.HexColor(theme.secondary),
+        'accent': colors.HexColor(theme.accent),
+        'text': colors.HexColor(theme.text),
+        'subtext': colors.HexColor(theme.subtext)
+    }
+    normal = _SAMPLE_STYLES['Normal']
+    styles = [
+        # Name - centered
+        ParagraphStyle(
+            name='Name',
+            parent=_SAMPLE_STYLES['Heading1'],
+            fontSize=theme.name_size,
+            spaceAfter=12,
+            textColor=palette['primary'],
+            fontName=theme.bold_font,
+            alignment=1
+        ),
+        ParagraphStyle(
+            name='JobTitle',
+            parent=normal,
+            fontSize=theme.heading_size,
+            spaceAfter=10,
+            textColor=palette['secondary'],
+            fontName=theme.bold_font,
+            alignment=1
+        ),
+        ParagraphStyle(
+            name='ContactInfo',
+            parent=normal,
+            fontSize=theme.base_size,
+            spaceAfter=3,
+            fontName=theme.font,
+            textColor=palette['secondary'],
+            alignment=1
+        ),
+        # ***TITLE***
+        ParagraphStyle(
+            name='SectionHeading',
+            parent=_SAMPLE_STYLES['Heading2'],
+            fontSize=theme.heading_size,
+            spaceBefore=12,
+            spaceAfter=4,
+            textColor=palette['primary'],
+            fontName=theme.bold_font
+        ),
+        # **Title**
+        ParagraphStyle(
+            name='SubHeading',
+            parent=normal,
+            fontSize=theme.base_size + 1,
+            spaceBefore=6,
+            spaceAfter=4,
+            textColor=palette['secondary'],
+            fontName=theme.bold_font
+        ),
+        # *text*
+        ParagraphStyle(
+            name='BoldText',
+            parent=normal,
+            fontSize=theme.base_size,
+            spaceAfter=4,
+            fontName=theme.bold_font,
+            textColor=palette['text']
+        ),
+        ParagraphStyle(
+            name='NormalText',
+            parent=normal,
+            fontSize=theme.base_size,
+            spaceAfter=4,
+            fontName=theme.font
+        ),
+        ParagraphStyle(
+            name='BulletText',
+            parent=normal,
+            fontSize=theme.base_size,
+            spaceAfter=2,
+            fontName=theme.font,
+            leading=theme.base_size + 2,
+            leftIndent=20
+        ),
+    ]
+    margin = theme.margin * inch
+    return PDFTemplate(
+        name=theme.name,
+        styles=MappingProxyType({style.name: style for style in styles}),
+        colors=MappingProxyType(palette),
+        pagesize=letter,
+        margins=(margin, margin, margin, margin)
+    )
+
+
+def build_cover_letter_template() -> PDFTemplate:
+    body = ParagraphStyle(
+        'CoverLetterBody',
+        parent=_SAMPLE_STYLES['Normal'],
+        fontSize=12,
+        fontName='Helvetica',
+        leading=16,
+        spaceBefore=12,
+        spaceAfter=12
+    )
+    return PDFTemplate(
+        name='cover_letter',
+        styles=MappingProxyType({body.name: body}),
+        colors=MappingProxyType({}),
+        pagesize=letter,
+        margins=(1 * inch, 1 * inch, 1 * inch, 1 * inch)
+    )
+
+
+class TemplateRegistry:
+    """All resume themes and the cover-letter template, compiled once per process"""
+
+    def __init__(self, themes: Mapping[str, ResumeTheme], default_theme: str = 'classic'):
+        if default_theme not in themes:
+            raise ValueError(f"Unknown default PDF theme: {default_theme}")
+        self.default_theme = default_theme
+        self._themes = MappingProxyType(dict(themes))
+        self._resume_templates = MappingProxyType(
+            {name: build_resume_template(theme) for name, theme in themes.items()}
+        )
+        self.cover_letter = build_cover_letter_template()
+
+    def has_theme(self, name: str) -> bool:
+        return name in self._resume_templates
+
+    def resume(self, theme: Optional[str] = None) -> PDFTemplate:
+        name = theme or self.default_theme
+        try:
+            return self._resume_templates[name]
+        except KeyError:
+            raise ValueError(f"Unknown PDF theme: {name}")
+
+    def themes(self) -> List[dict]:
+        return [
+            {'name': theme.name, 'label': theme.label, 'default': theme.name == self.default_theme}
+            for theme in self._themes.values()
+        ]
+
+
+template_registry = TemplateRegistry(THEMES, DEFAULT_THEME)
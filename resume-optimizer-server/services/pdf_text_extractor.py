@@ -0,0 +1,296 @@
+import asyncio
+import io
+import math
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, BinaryIO, List, Optional, Union
+
+import pdfplumber
+import PyPDF2
+from loguru import logger
+
+# bytes, or a seekable binary stream such as BytesIO or an mmap of the upload
+PdfSource = Union[bytes, BinaryIO]
+
+
+class PdfTextBackend:
+    """
+    One PDF library. Documents are opened once per process and read page by
+    page, so a worker only has to parse the pages it was given.
+    """
+    name = ''
+
+    def open(self, source: PdfSource) -> Any:
+        raise NotImplementedError
+
+    def page_count(self, document) -> int:
+        raise NotImplementedError
+
+    def page_text(self, document, index: int) -> str:
+        raise NotImplementedError
+
+    def close(self, document):
+        pass
+
+
+class PyPDF2Backend(PdfTextBackend):
+    name = 'pypdf2'
+
+    def open(self, source: PdfSource):
+        return PyPDF2.PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+    def page_count(self, document) -> int:
+        return len(document.pages)
+
+    def page_text(self, document, index: int) -> str:
+        return document.pages[index].extract_text() or ''
+
+
+class PdfplumberBackend(PdfTextBackend):
+    """Layout-aware (pdfminer), noticeably slower than PyPDF2"""
+    name = 'pdfplumber'
+
+    def open(self, source: PdfSource):
+        return pdfplumber.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+    def page_count(self, document) -> int:
+        return len(document.pages)
+
+    def page_text(self, document, index: int) -> str:
+        page = document.pages[index]
+        try:
+            return page.extract_text() or ''
+        finally:
+            # pdfplumber caches every parsed layout object on the page
+            page.flush_cache()
+
+    def close(self, document):
+        document.close()
+
+
+class PdfiumBackend(PdfTextBackend):
+    """PDFium bindings; only registered when pypdfium2 is installed"""
+    name = 'pdfium'
+
+    def open(self, source: PdfSource):
+        if not isinstance(source, bytes):
+            source.seek(0)
+            source = source.read()
+        return pypdfium2.PdfDocument(source)
+
+    def page_count(self, document) -> int:
+        return len(document)
+
+    def page_text(self, document, index: int) -> str:
+        page = document[index]
+        textpage = page.get_textpage()
+        try:
+            return textpage.get_text_range()
+        finally:
+            textpage.close()
+            page.close()
+
+    def close(self, document):
+        document.close()
+
+
+PDF_TEXT_BACKENDS = {
+    'pypdf2': PyPDF2Backend,
+    'pdfplumber': PdfplumberBackend,
+}
+
+try:
+    import pypdfium2
+    PDF_TEXT_BACKENDS['pdfium'] = PdfiumBackend
+except ImportError:
+    pass
+
+
+def available_backends() -> List[str]:
+    return list(PDF_TEXT_BACKENDS)
+
+
+def get_backend(name: str = 'pypdf2') -> PdfTextBackend:
+    """Create a backend by name; pdfium is only registered when it is installed"""
+    try:
+        backend = PDF_TEXT_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown or unavailable PDF text backend: {name}")
+    return backend()
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _extract_pages(backend_name: str, data: bytes, start: int, stop: int) -> List[str]:
+    """Runs inside a worker: text of pages [start, stop)"""
+    backend = get_backend(backend_name)
+    document = backend.open(data)
+    try:
+        return [backend.page_text(document, index) for index in range(start, stop)]
+    finally:
+        backend.close(document)
+
+
+class PDFTextExtractor:
+    """
+    Extracts the text of an uploaded PDF with the configured backend.
+
+    Documents with fewer than `parallel_min_pages` pages (almost every resume)
+    are read in the calling thread straight from the stream. Longer ones are
+    split into page ranges that run on a process pool, since text extraction
+    is CPU-bound pure Python and threads would serialise on the GIL. Page
+    texts are joined with `separator` rather than concatenated one by one.
+
+    The pool is started with `start_method` ('spawn' by default): extraction
+    is called from I/O pool threads, and forking a process that already runs
+    threads can leave the child stuck on a lock held at fork time. A parallel
+    extraction that takes longer than `timeout` seconds is abandoned and the
+    pool replaced, so a pathological PDF cannot hold the calling thread.
+    """
+
+    def __init__(self, backend: str = 'pypdf2', max_workers: int = 2, parallel_min_pages: int = 8,
+                 start_method: Optional[str] = 'spawn', timeout: float = 60.0, sample_size: int = 200):
+        self.backend = get_backend(backend)
+        self.max_workers = max_workers
+        self.parallel_min_pages = parallel_min_pages
+        self.start_method = start_method
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.documents = 0
+        self.pages = 0
+        self.parallel_documents = 0
+        self.errors = 0
+        self.timeouts = 0
+        self._extract_ms = deque(maxlen=sample_size)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                context = multiprocessing.get_context(self.start_method) if self.start_method else None
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor):
+        """Shut a broken or stuck pool down; the next parallel extraction starts a fresh one"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def start(self):
+        """Spin the worker processes up at startup so the first long PDF does not pay for it"""
+        if self.max_workers <= 1:
+            return
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        pids = await asyncio.gather(*(loop.run_in_executor(executor, _ping) for _ in range(self.max_workers)))
+        logger.info(f"PDF text extraction pool started with {len(set(pids))} worker processes")
+
+    def _page_ranges(self, page_count: int) -> List[range]:
+        size = math.ceil(page_count / self.max_workers)
+        return [range(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+    def _extract_parallel(self, executor: ProcessPoolExecutor, source: PdfSource, page_count: int) -> List[str]:
+        if isinstance(source, bytes):
+            data = source
+        else:
+            source.seek(0)
+            data = source.read()
+        futures = [
+            executor.submit(_extract_pages, self.backend.name, data, pages.start, pages.stop)
+            for pages in self._page_ranges(page_count)
+        ]
+        deadline = time.monotonic() + self.timeout
+        try:
+            return [
+                text
+                for future in futures
+                for text in future.result(timeout=max(deadline - time.monotonic(), 0))
+            ]
+        except FutureTimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            logger.error(f"PDF text extraction timed out after {self.timeout}s, restarting the pool")
+            self._discard_executor(executor)
+            raise TimeoutError(f"PDF text extraction timed out after {self.timeout}s")
+
+    def extract_pages(self, source: PdfSource) -> List[str]:
+        """Text of every page, in order"""
+        started = time.perf_counter()
+        try:
+            document = self.backend.open(source)
+            try:
+                page_count = self.backend.page_count(document)
+                parallel = self.max_workers > 1 and page_count >= self.parallel_min_pages
+                if parallel:
+                    executor = self._get_executor()
+                    try:
+                        pages = self._extract_parallel(executor, source, page_count)
+                    except BrokenProcessPool:
+                        # A worker died; replace the pool and finish this document here
+                        logger.error("PDF text extraction pool broke, restarting it")
+                        self._discard_executor(executor)
+                        parallel = False
+                if not parallel:
+                    pages = [self.backend.page_text(document, index) for index in range(page_count)]
+            finally:
+                self.backend.close(document)
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+
+        with self._lock:
+            self.documents += 1
+            self.pages += page_count
+            self.parallel_documents += parallel
+            self._extract_ms.append((time.perf_counter() - started) * 1000)
+        return pages
+
+    def extract(self, source: PdfSource, separator: str = '\n') -> str:
+        return separator.join(self.extract_pages(source))
+
+    @staticmethod
+    def _percentile(samples, fraction: float) -> float:
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 2)
+
+    def stats(self) -> dict:
+        return {
+            'backend': self.backend.name,
+            'max_workers': self.max_workers,
+            'parallel_min_pages': self.parallel_min_pages,
+            'documents': self.documents,
+            'pages': self.pages,
+            'parallel_documents': self.parallel_documents,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'extract_ms_p50': self._percentile(self._extract_ms, 0.5),
+            'extract_ms_p95': self._percentile(self._extract_ms, 0.95)
+        }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            logger.info("Shutting down PDF text extraction pool")
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+pdf_text_extractor = PDFTextExtractor(
+    backend=os.getenv('PDF_TEXT_BACKEND', 'pypdf2'),
+    max_workers=int(os.getenv('PDF_EXTRACT_WORKERS', os.cpu_count() or 2)),
+    parallel_min_pages=int(os.getenv('PDF_EXTRACT_PARALLEL_MIN_PAGES', 8)),
+    start_method=os.getenv('PDF_EXTRACT_START_METHOD') or 'spawn',
+    timeout=float(os.getenv('PDF_EXTRACT_TIMEOUT', 60))
+)
@@ -0,0 +1,176 @@
+"""
+Tokenizer and document model for the resume markup produced by the
+optimization prompt:
+
+    ***SECTION***        section heading
+    **Subheading**       subheading (role, degree, ...)
+    • item / - item      bullet
+    some *bold* words    inline emphasis
+
+The first content line is the candidate's name. Separator lines (`---`,
+`===`) and age lines such as `32 yo` are dropped. Parsing is a single
+forward pass over the text; renderers (PDF, HTML, ...) walk the resulting
+ResumeDocument instead of re-interpreting the markup themselves.
+"""
+import html
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+NAME = 'name'
+SECTION = 'section'
+SUBHEADING = 'subheading'
+BULLET = 'bullet'
+PARAGRAPH = 'paragraph'
+
+BULLET_MARKERS = ('•', '-', '–', '▪', '◦')
+
+_EMPHASIS = re.compile(r'\*(.*?)\*')
+_AGE_LINE = re.compile(r'\d+\s*yo\s*', re.IGNORECASE)
+
+
+class Span(NamedTuple):
+    text: str
+    bold: bool = False
+
+
+class Block(NamedTuple):
+    """
+    One logical line of the resume. `text` is the display text with markup
+    removed and the bullet marker (glyph plus following whitespace) kept in
+    front; `markup` holds the source text when it carried `*` emphasis, so
+    the spans are only tokenized for renderers that ask for them.
+    """
+    kind: str
+    text: str
+    marker: str = ''
+    markup: str = ''
+
+    @property
+    def bold_markup(self) -> bool:
+        return bool(self.markup)
+
+    @property
+    def content(self) -> str:
+        """Text without the bullet marker"""
+        return self.text[len(self.marker):]
+
+    @property
+    def spans(self) -> Tuple[Span, ...]:
+        if self.markup:
+            return _inline_spans(self.markup)
+        content = self.content
+        return (Span(content),) if content else ()
+
+
+class ResumeDocument(NamedTuple):
+    blocks: Tuple[Block, ...]
+
+    @property
+    def name(self) -> Optional[str]:
+        if self.blocks and self.blocks[0].kind == NAME:
+            return self.blocks[0].text
+        return None
+
+    def sections(self) -> List[Tuple[Optional[Block], List[Block]]]:
+        """Group blocks under their section heading; the header part has heading None"""
+        grouped: List[Tuple[Optional[Block], List[Block]]] = [(None, [])]
+        for block in self.blocks:
+            if block.kind == SECTION:
+                grouped.append((block, []))
+            else:
+                grouped[-1][1].append(block)
+        return grouped
+
+
+def _inline_spans(text: str) -> Tuple[Span, ...]:
+    """Split `*bold*` runs out of a line; an unmatched `*` stays literal"""
+    spans = []
+    position = 0
+    for match in _EMPHASIS.finditer(text):
+        if match.start() > position:
+            spans.append(Span(text[position:match.start()]))
+        if match.group(1):
+            spans.append(Span(match.group(1), bold=True))
+        position = match.end()
+    if position < len(text):
+        spans.append(Span(text[position:]))
+    return tuple(spans)
+
+
+def parse_resume_markup(text: str) -> ResumeDocument:
+    """Tokenize resume markup into a ResumeDocument in one pass over the lines"""
+    blocks = []
+    append = blocks.append
+    # Block(...) goes through a Python-level __new__; build the tuples directly
+    new = tuple.__new__
+    for raw_line in text.split('\n'):
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        first = line[0]
+        if first == '*':
+            if line.startswith('***') and line.endswith('***'):
+                append(new(Block, (SECTION, line[3:-3].strip(), '', '')))
+                continue
+            if line.startswith('**') and line.endswith('**'):
+                append(new(Block, (SUBHEADING, line[2:-2].strip(), '', '')))
+                continue
+        # Separator lines and the age line
+        elif first == '-' or first == '=':
+            if line.startswith('---') or line.startswith('==='):
+                continue
+        elif first.isdigit() and _AGE_LINE.fullmatch(line):
+            continue
+
+        marker = ''
+        kind = PARAGRAPH
+        if first in BULLET_MARKERS:
+            body = line[1:].lstrip()
+            marker = line[:len(line) - len(body)]
+            kind = BULLET
+        else:
+            body = line
+        if '*' in body:
+            append(new(Block, (kind, marker + _EMPHASIS.sub(r'\1', body), marker, body)))
+        else:
+            append(new(Block, (kind, line, marker, '')))
+
+    # The first content line is the candidate's name, whatever its markup
+    if blocks:
+        first_block = blocks[0]
+        blocks[0] = Block(NAME, first_block.text, '', '' if first_block.marker else first_block.markup)
+    return ResumeDocument(tuple(blocks))
+
+
+def render_html(document: ResumeDocument) -> str:
+    """Render a ResumeDocument as a simple HTML fragment, e.g. for previews"""
+    def inline(block: Block) -> str:
+        return ''.join(
+            f"<strong>{html.escape(span.text)}</strong>" if span.bold else html.escape(span.text)
+            for span in block.spans
+        )
+
+    parts = []
+    in_list = False
+    for block in document.blocks:
+        if block.kind == BULLET and not in_list:
+            parts.append('<ul>')
+            in_list = True
+        elif block.kind != BULLET and in_list:
+            parts.append('</ul>')
+            in_list = False
+
+        if block.kind == NAME:
+            parts.append(f"<h1>{inline(block)}</h1>")
+        elif block.kind == SECTION:
+            parts.append(f"<h2>{inline(block)}</h2>")
+        elif block.kind == SUBHEADING:
+            parts.append(f"<h3>{inline(block)}</h3>")
+        elif block.kind == BULLET:
+            parts.append(f"<li>{inline(block)}</li>")
+        else:
+            parts.append(f"<p>{inline(block)}</p>")
+    if in_list:
+        parts.append('</ul>')
+    return '\n'.join(parts)
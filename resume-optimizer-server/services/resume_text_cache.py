@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from loguru import logger
+
+from services.cache import CacheBackend, get_cache_backend
+from services.pdf_text_extractor import pdf_text_extractor
+from services.supabase_client import supabase
+
+# Bump when clean_text or the extraction output changes so old texts are not reused
+TEXT_CACHE_VERSION = '1'
+
+
+class ResumeTextCache:
+    """
+    Cleaned resume text keyed by the SHA-256 of the uploaded file.
+
+    The same PDF is typically uploaded for many job applications, so repeat
+    uploads skip PDF parsing entirely. Entries live in a local LRU `backend`;
+    with `persist` they are also written to the `table` Supabase table, which
+    other workers and restarts fall back to on a local miss. Concurrent misses
+    for the same upload share one extraction.
+
+    Each entry remembers how long its extraction took, so hits can report the
+    parsing time they saved.
+    """
+
+    def __init__(self, backend: CacheBackend, extractor: str, persist: bool = False,
+                 table: str = 'resume_text_cache'):
+        self.backend = backend
+        self.extractor = extractor
+        self.persist = persist
+        self.table = table
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self.hits = 0
+        self.remote_hits = 0
+        self.misses = 0
+        self.persist_errors = 0
+        self.saved_ms = 0.0
+
+    def _key(self, sha256: str) -> str:
+        return f"resume_text:{TEXT_CACHE_VERSION}:{self.extractor}:{sha256}"
+
+    def _count(self, counter: str, amount=1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def _load_remote(self, sha256: str) -> Optional[dict]:
+        try:
+            response = supabase.execute_sync(
+                supabase.table(self.table)
+                .select('text, extract_ms')
+                .eq('sha256', sha256)
+                .eq('extractor', self.extractor)
+                .eq('version', TEXT_CACHE_VERSION)
+                .limit(1)
+            )
+        except Exception as e:
+            self._count('persist_errors')
+            logger.warning(f"Failed to read cached resume text: {str(e)}")
+            return None
+        return response.data[0] if response.data else None
+
+    def _save_remote(self, sha256: str, entry: dict):
+        try:
+            supabase.execute_sync(
+                supabase.table(self.table).upsert({
+                    'sha256': sha256,
+                    'extractor': self.extractor,
+                    'version': TEXT_CACHE_VERSION,
+                    'text': entry['text'],
+                    'extract_ms': entry['extract_ms']
+                })
+            )
+        except Exception as e:
+            self._count('persist_errors')
+            logger.warning(f"Failed to persist resume text: {str(e)}")
+
+    def _lookup(self, sha256: str) -> Optional[str]:
+        entry = self.backend.get(self._key(sha256))
+        if entry is not None:
+            self._count('hits')
+        elif self.persist:
+            entry = self._load_remote(sha256)
+            if entry is not None:
+                self._count('remote_hits')
+                self.backend.set(self._key(sha256), entry)
+        if entry is None:
+            return None
+        self._count('saved_ms', entry['extract_ms'])
+        return entry['text']
+
+    def get_or_extract(self, sha256: str, extract: Callable[[], str]) -> str:
+        """Return the cleaned text for the upload with this digest, extracting it on a miss"""
+        text = self._lookup(sha256)
+        if text is not None:
+            return text
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(sha256, threading.Lock())
+        with key_lock:
+            # Another caller may have extracted it while we waited
+            text = self._lookup(sha256)
+            if text is not None:
+                return text
+            self._count('misses')
+            try:
+                started = time.perf_counter()
+                text = extract()
+                entry = {'text': text, 'extract_ms': round((time.perf_counter() - started) * 1000, 2)}
+                # Empty text means extraction failed (e.g. a scanned PDF); let the caller reject it uncached
+                if text:
+                    self.backend.set(self._key(sha256), entry)
+            finally:
+                with self._lock:
+                    self._key_locks.pop(sha256, None)
+
+        if text and self.persist:
+            self._save_remote(sha256, entry)
+        return text
+
+    def invalidate(self, sha256: str):
+        self.backend.delete(self._key(sha256))
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.hits + self.remote_hits
+            lookups = hits + self.misses
+            return {
+                'extractor': self.extractor,
+                'persist': self.persist,
+                'hits': self.hits,
+                'remote_hits': self.remote_hits,
+                'misses': self.misses,
+                'persist_errors': self.persist_errors,
+                'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+                'saved_ms': round(self.saved_ms, 2),
+                'store': self.backend.stats()
+            }
+
+
+resume_text_cache = ResumeTextCache(
+    get_cache_backend(
+        os.getenv('RESUME_TEXT_CACHE_BACKEND', 'memory'),
+        max_entries=int(os.getenv('RESUME_TEXT_CACHE_SIZE', 1024)),
+        default_ttl=float(os.getenv('RESUME_TEXT_CACHE_TTL', 7 * 86400))
+    ),
+    extractor=pdf_text_extractor.backend.name,
+    persist=os.getenv('RESUME_TEXT_CACHE_PERSIST', 'false').lower() == 'true'
+)
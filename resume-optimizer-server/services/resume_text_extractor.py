@@ -0,0 +1,118 @@
+import threading
+import time
+import zipfile
+from collections import deque
+from typing import BinaryIO, Dict
+from xml.etree.ElementTree import iterparse
+
+from services.pdf_text_extractor import pdf_text_extractor
+from services.upload_ingest import IngestedUpload, UnsupportedUploadError
+
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+DOCX_DOCUMENT = 'word/document.xml'
+
+
+def extract_docx_text(stream: BinaryIO) -> str:
+    """
+    Paragraph text of a DOCX, one line per paragraph (table cells included).
+
+    Streams word/document.xml out of the zip with iterparse and clears each
+    paragraph once it is read, so memory stays flat instead of building the
+    whole DOM the way python-docx does.
+    """
+    try:
+        archive = zipfile.ZipFile(stream)
+    except zipfile.BadZipFile:
+        raise UnsupportedUploadError("Resume file is not a valid DOCX document")
+    with archive:
+        if DOCX_DOCUMENT not in archive.namelist():
+            raise UnsupportedUploadError("Resume file is a zip archive but not a DOCX document")
+
+        lines = []
+        # Text boxes nest paragraphs inside paragraphs, so keep one buffer per open <w:p>
+        open_paragraphs = []
+        with archive.open(DOCX_DOCUMENT) as xml:
+            for event, element in iterparse(xml, events=('start', 'end')):
+                tag = element.tag
+                if event == 'start':
+                    if tag == f'{WORD_NS}p':
+                        open_paragraphs.append([])
+                    continue
+                if not open_paragraphs:
+                    continue
+                if tag == f'{WORD_NS}t':
+                    open_paragraphs[-1].append(element.text or '')
+                elif tag == f'{WORD_NS}tab':
+                    open_paragraphs[-1].append('\t')
+                elif tag in (f'{WORD_NS}br', f'{WORD_NS}cr'):
+                    open_paragraphs[-1].append('\n')
+                elif tag == f'{WORD_NS}p':
+                    lines.append(''.join(open_paragraphs.pop()))
+                    element.clear()
+    return '\n'.join(lines)
+
+
+def extract_plain_text(stream: BinaryIO) -> str:
+    # utf-8-sig drops the BOM Windows editors like to prepend
+    return stream.read().decode('utf-8-sig', errors='replace')
+
+
+class ResumeTextExtractor:
+    """
+    Turns an ingested upload into text according to its sniffed format:
+    PDFs go through the configured PDF text backend, DOCX files through the
+    streaming paragraph parser and plain text is decoded as UTF-8. Timings
+    are kept per format.
+    """
+
+    def __init__(self, sample_size: int = 200):
+        self._handlers = {
+            'pdf': pdf_text_extractor.extract,
+            'docx': extract_docx_text,
+            'txt': extract_plain_text,
+        }
+        self._lock = threading.Lock()
+        self.documents: Dict[str, int] = {name: 0 for name in self._handlers}
+        self.errors: Dict[str, int] = {name: 0 for name in self._handlers}
+        self._extract_ms: Dict[str, deque] = {name: deque(maxlen=sample_size) for name in self._handlers}
+
+    def extract(self, upload: IngestedUpload) -> str:
+        try:
+            handler = self._handlers[upload.format]
+        except KeyError:
+            raise UnsupportedUploadError()
+
+        started = time.perf_counter()
+        try:
+            with upload.open() as stream:
+                text = handler(stream)
+        except Exception:
+            with self._lock:
+                self.errors[upload.format] += 1
+            raise
+        with self._lock:
+            self.documents[upload.format] += 1
+            self._extract_ms[upload.format].append((time.perf_counter() - started) * 1000)
+        return text
+
+    @staticmethod
+    def _percentile(samples, fraction: float) -> float:
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 2)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                name: {
+                    'documents': self.documents[name],
+                    'errors': self.errors[name],
+                    'extract_ms_p50': self._percentile(self._extract_ms[name], 0.5),
+                    'extract_ms_p95': self._percentile(self._extract_ms[name], 0.95)
+                }
+                for name in self._handlers
+            }
+
+
+resume_text_extractor = ResumeTextExtractor()
@@ -1,7 +1,15 @@
 import os
+import threading
+import time
 from dotenv import load_dotenv
 from supabase import create_client, Client
+from supabase.lib.client_options import ClientOptions
+from postgrest.utils import SyncClient
 from pathlib import Path
+import httpx
+from loguru import logger
+
+from services.blocking_io import BlockingIOPool
 
 # Load environment variables from the root directory's .env file
 env_path = Path(__file__).resolve().parent.parent / '.env'
@@ -14,4 +22,166 @@ supabase_key = os.getenv('SUPABASE_KEY')
 if not supabase_url or not supabase_key:
     raise ValueError(f"Supabase URL and key must be set in environment variables. Looking for .env at: {env_path}")
 
-supabase: Client = create_client(supabase_url, supabase_key)
+
+class PoolExhaustedError(Exception):
+    """Raised when no Supabase connection slot frees up in time"""
+
+
+class SupabaseDatabase:
+    """
+    Application-scoped Supabase data-access layer.
+
+    Owns the single supabase-py client for the process and swaps its PostgREST
+    session for a keep-alive httpx pool of `pool_size` connections with connect
+    and read timeouts. Queries run through `execute` (async, offloaded to a
+    thread pool of the same size owned by this class) or `execute_sync`; both
+    bound concurrency to the pool size and record in-use, waiting and error
+    counts for the metrics endpoint.
+
+    The client is created lazily (or by `startup`) so importing route modules
+    no longer pays for a connection setup each.
+    """
+
+    def __init__(self, url: str, key: str, pool_size: int = 10, timeout: float = 10.0,
+                 connect_timeout: float = 5.0, acquire_timeout: float = 30.0,
+                 keepalive_expiry: float = 30.0):
+        self.url = url
+        self.key = key
+        self.pool_size = pool_size
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.acquire_timeout = acquire_timeout
+        self.keepalive_expiry = keepalive_expiry
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        # Waiting for a slot happens on these threads, not on the shared io_pool
+        self._executor = BlockingIOPool(max_workers=pool_size, thread_name_prefix='supabase')
+        self._stats_lock = threading.Lock()
+        self.in_use = 0
+        self.waiting = 0
+        self.completed = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.total_query_time = 0.0
+
+    @property
+    def client(self) -> Client:
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+
+    def _create_client(self) -> Client:
+        client = create_client(self.url, self.key, options=ClientOptions(
+            postgrest_client_timeout=self.timeout,
+            storage_client_timeout=int(self.timeout.read)
+        ))
+
+        # Replace the default PostgREST session with a bounded keep-alive pool
+        default_session = client.postgrest.session
+        client.postgrest.session = SyncClient(
+            base_url=default_session.base_url,
+            headers=default_session.headers,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size,
+                keepalive_expiry=self.keepalive_expiry
+            )
+        )
+        default_session.close()
+        logger.info(f"Supabase client created with a pool of {self.pool_size} connections")
+        return client
+
+    # Pass-throughs so callers keep using the familiar supabase-py entry points
+    def table(self, table_name: str):
+        return self.client.table(table_name)
+
+    def rpc(self, fn: str, params: dict):
+        return self.client.rpc(fn, params)
+
+    @property
+    def storage(self):
+        return self.client.storage
+
+    @property
+    def auth(self):
+        return self.client.auth
+
+    def execute_sync(self, query):
+        """Execute a PostgREST query builder, waiting for a free connection slot"""
+        with self._stats_lock:
+            self.waiting += 1
+        acquired = self._slots.acquire(timeout=self.acquire_timeout)
+        with self._stats_lock:
+            self.waiting -= 1
+            if not acquired:
+                self.errors += 1
+            else:
+                self.in_use += 1
+        if not acquired:
+            raise PoolExhaustedError("Timed out waiting for a Supabase connection")
+
+        started = time.perf_counter()
+        try:
+            return query.execute()
+        except httpx.TimeoutException:
+            with self._stats_lock:
+                self.timeouts += 1
+                self.errors += 1
+            raise
+        except Exception:
+            with self._stats_lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._stats_lock:
+                self.in_use -= 1
+                self.completed += 1
+                self.total_query_time += time.perf_counter() - started
+            self._slots.release()
+
+    async def execute(self, query):
+        """Async wrapper around execute_sync that keeps the event loop free"""
+        return await self._executor.run(self.execute_sync, query)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                'pool_size': self.pool_size,
+                'in_use': self.in_use,
+                'waiting': self.waiting,
+                'completed': self.completed,
+                'errors': self.errors,
+                'timeouts': self.timeouts,
+                'avg_query_ms': round(self.total_query_time / self.completed * 1000, 2) if self.completed else 0.0,
+                'executor': self._executor.stats()
+            }
+
+    def startup(self):
+        """Create the client eagerly so the first request does not pay for it"""
+        self.client
+
+    def shutdown(self):
+        self._executor.shutdown()
+        if self._client is None:
+            return
+        logger.info("Closing Supabase connections")
+        for session in (self._client.postgrest.session, getattr(self._client.storage, '_client', None)):
+            try:
+                if session is not None:
+                    session.close()
+            except Exception as e:
+                logger.warning(f"Error closing Supabase session: {str(e)}")
+        self._client = None
+
+
+supabase = SupabaseDatabase(
+    supabase_url,
+    supabase_key,
+    pool_size=int(os.getenv('SUPABASE_POOL_SIZE', 10)),
+    timeout=float(os.getenv('SUPABASE_TIMEOUT', 10)),
+    connect_timeout=float(os.getenv('SUPABASE_CONNECT_TIMEOUT', 5)),
+    acquire_timeout=float(os.getenv('SUPABASE_POOL_ACQUIRE_TIMEOUT', 30))
+)
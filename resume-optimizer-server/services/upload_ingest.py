@@ -0,0 +1,299 @@
+import codecs
+import hashlib
+import io
+import mmap
+import os
+import re
+import tempfile
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+from loguru import logger
+
+from services.blocking_io import run_blocking
+
+PDF_MAGIC = b'%PDF-'
+# The PDF spec lets the header start anywhere in the first 1024 bytes
+PDF_HEADER_WINDOW = 1024
+ZIP_MAGIC = b'PK\x03\x04'
+OLE_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+RESUME_FORMATS = ('pdf', 'docx', 'txt')
+
+# Control characters a plain-text resume may contain
+TEXT_CONTROL_CHARS = frozenset('\t\r\n\f')
+MARKUP_TAG = re.compile(r'<[^<>]{1,200}>')
+# Above this share of tag characters a text upload is markup, not a resume
+MAX_MARKUP_RATIO = 0.3
+
+
+def _is_plain_text(text: str) -> bool:
+    """
+    Printable prose: no control characters besides tab, CR, LF and form feed,
+    and not an HTML/XML, JSON or RTF document with a text-like header
+    """
+    if any(unicodedata.category(c) == 'Cc' and c not in TEXT_CONTROL_CHARS for c in text):
+        return False
+    stripped = text.lstrip('\ufeff \t\r\n\f')
+    if stripped.startswith(('<', '{\\rtf')):
+        return False
+    if stripped[:1] in ('{', '[') and stripped[1:].lstrip()[:1] in ('"', '{', '[', ']', '}'):
+        return False
+    tagged = sum(len(tag) for tag in MARKUP_TAG.findall(stripped))
+    return not stripped or tagged / len(stripped) <= MAX_MARKUP_RATIO
+
+
+def sniff_format(head: bytes) -> Optional[str]:
+    """
+    Guess an upload's format from its first bytes: 'pdf', 'docx' (any zip;
+    the DOCX extractor checks for word/document.xml), 'doc' (legacy OLE
+    Word), 'txt' (printable UTF-8 prose, see `_is_plain_text`) or None.
+    """
+    if not head:
+        return None
+    if PDF_MAGIC in head[:PDF_HEADER_WINDOW]:
+        return 'pdf'
+    if head.startswith(ZIP_MAGIC):
+        return 'docx'
+    if head.startswith(OLE_MAGIC):
+        return 'doc'
+    try:
+        # Incremental so a multi-byte character cut off at the end of the head is fine
+        text = codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+    except UnicodeDecodeError:
+        return None
+    return 'txt' if _is_plain_text(text) else None
+
+
+class UploadTooLargeError(HTTPException):
+    def __init__(self, max_bytes: int):
+        super().__init__(
+            status_code=413,
+            detail=f"Resume file is too large, the limit is {max_bytes // (1024 * 1024)} MB"
+        )
+
+
+class UnsupportedUploadError(HTTPException):
+    def __init__(self, detail: str = "Resume file must be a PDF, DOCX or plain-text document"):
+        super().__init__(status_code=415, detail=detail)
+
+
+class MappedReader(io.RawIOBase):
+    """
+    Read-only, seekable file object over an mmap. A bare mmap has read/seek
+    but not the rest of the io API (zipfile needs seekable()), and reads here
+    slice the mapping directly rather than going through a buffer.
+    """
+
+    def __init__(self, view: mmap.mmap):
+        self._view = view
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = len(self._view) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        self._position = position
+        return position
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        end = len(self._view) if size is None or size < 0 else self._position + size
+        data = self._view[self._position:end]
+        self._position += len(data)
+        return data
+
+    def readall(self) -> bytes:
+        return self.read()
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+class IngestedUpload:
+    """
+    An upload copied into a spooled temp file owned by the app, so it outlives
+    the request (async jobs read it after the response went out). Small files
+    stay in memory; larger ones roll over to disk and are memory-mapped for
+    parsing instead of being read into a bytes object.
+    """
+
+    def __init__(self, filename: str, spool: tempfile.SpooledTemporaryFile, size: int, sha256: str,
+                 format: str = 'pdf'):
+        self.filename = filename
+        self.size = size
+        # Sniffed from the content, not the filename: one of RESUME_FORMATS
+        self.format = format
+        # Hex digest of the content, computed while streaming it in
+        self.sha256 = sha256
+        self._spool = spool
+
+    @property
+    def on_disk(self) -> bool:
+        return self._spool._rolled
+
+    @contextmanager
+    def open(self) -> Iterator[BinaryIO]:
+        """Seekable, read-only view of the upload for parsers"""
+        if not self.on_disk:
+            # The spool's own BytesIO; wrapping its buffer in a new one would copy it
+            stream = self._spool._file
+            stream.seek(0)
+            yield stream
+            return
+        if self.size == 0:
+            yield io.BytesIO(b'')
+            return
+        with mmap.mmap(self._spool.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            with MappedReader(view) as reader:
+                yield reader
+
+    def read_bytes(self) -> bytes:
+        self._spool.seek(0)
+        return self._spool.read()
+
+    def close(self):
+        self._spool.close()
+
+    def __enter__(self) -> 'IngestedUpload':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class UploadIngestor:
+    """
+    Streams UploadFile contents in `chunk_size` pieces into a spooled temp
+    file, keeping up to `spool_bytes` in memory. Uploads over `max_bytes` are
+    rejected with 413 as soon as the limit is crossed. The format is sniffed
+    from the first 1 KB, and anything outside `formats` is rejected with 415
+    before the rest is read.
+    """
+
+    def __init__(self, max_bytes: int = 10 * 1024 * 1024, spool_bytes: int = 1024 * 1024,
+                 chunk_size: int = 64 * 1024):
+        self.max_bytes = max_bytes
+        self.spool_bytes = spool_bytes
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self.uploads = 0
+        self.bytes_ingested = 0
+        self.spooled_to_disk = 0
+        self.rejected_too_large = 0
+        self.rejected_type = 0
+        self.seconds = 0.0
+
+    def check_content_length(self, content_length: Optional[str]):
+        """Reject a request up front when its declared body cannot fit under the limit"""
+        try:
+            declared = int(content_length) if content_length else None
+        except ValueError:
+            return
+        # Leave room for the multipart boundaries and the other form fields
+        if declared is not None and declared > self.max_bytes + 64 * 1024:
+            with self._lock:
+                self.rejected_too_large += 1
+            raise UploadTooLargeError(self.max_bytes)
+
+    def _reject(self, spool, error: HTTPException, counter: str):
+        spool.close()
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+        raise error
+
+    def _check_format(self, spool, head: bytes, formats: Tuple[str, ...]) -> str:
+        format = sniff_format(head)
+        if format not in formats:
+            if format == 'doc':
+                error = UnsupportedUploadError("Legacy .doc files are not supported, please upload a DOCX or PDF")
+            elif formats == ('pdf',):
+                error = UnsupportedUploadError("Resume file is not a PDF")
+            else:
+                error = UnsupportedUploadError()
+            self._reject(spool, error, 'rejected_type')
+        return format
+
+    async def ingest(self, upload: UploadFile, formats: Tuple[str, ...] = RESUME_FORMATS) -> IngestedUpload:
+        started = time.perf_counter()
+        spool = tempfile.SpooledTemporaryFile(max_size=self.spool_bytes, prefix='upload-')
+        size = 0
+        head = b''
+        format = None
+        digest = hashlib.sha256()
+        try:
+            while True:
+                chunk = await upload.read(self.chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > self.max_bytes:
+                    self._reject(spool, UploadTooLargeError(self.max_bytes), 'rejected_too_large')
+                if len(head) < PDF_HEADER_WINDOW:
+                    head += chunk[:PDF_HEADER_WINDOW - len(head)]
+                    if len(head) >= PDF_HEADER_WINDOW:
+                        format = self._check_format(spool, head, formats)
+                digest.update(chunk)
+                if spool._rolled or spool.tell() + len(chunk) > self.spool_bytes:
+                    await run_blocking(spool.write, chunk)
+                else:
+                    spool.write(chunk)
+        except BaseException:
+            spool.close()
+            raise
+
+        if format is None:
+            format = self._check_format(spool, head, formats)
+        if spool._rolled:
+            # mmap only sees what has reached the file
+            await run_blocking(spool.flush)
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.uploads += 1
+            self.bytes_ingested += size
+            self.seconds += elapsed
+            if spool._rolled:
+                self.spooled_to_disk += 1
+        logger.info(f"Ingested {format} upload {upload.filename} ({size} bytes) in {elapsed * 1000:.1f}ms")
+        return IngestedUpload(upload.filename, spool, size, digest.hexdigest(), format)
+
+    def stats(self) -> dict:
+        return {
+            'max_bytes': self.max_bytes,
+            'spool_bytes': self.spool_bytes,
+            'uploads': self.uploads,
+            'bytes_ingested': self.bytes_ingested,
+            'spooled_to_disk': self.spooled_to_disk,
+            'rejected_too_large': self.rejected_too_large,
+            'rejected_type': self.rejected_type,
+            'throughput_mb_s': round(self.bytes_ingested / self.seconds / (1024 * 1024), 2) if self.seconds else 0.0
+        }
+
+
+upload_ingestor = UploadIngestor(
+    max_bytes=int(os.getenv('UPLOAD_MAX_MB', 10)) * 1024 * 1024,
+    spool_bytes=int(os.getenv('UPLOAD_SPOOL_KB', 1024)) * 1024,
+    chunk_size=int(os.getenv('UPLOAD_CHUNK_KB', 64)) * 1024
+)